@@ -7,6 +7,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_async_session_user
 from app.models.users import User
+from app.services.user import UserService
 
 SECRET = "SECRET"
 
@@ -17,6 +18,8 @@ class UserManager(IntegerIDMixin, BaseUserManager[User, int]):
 
     async def on_after_register(self, user: User, request: Optional[Request] = None):
         print(f"User {user.id} has registered.")
+        # Id мог попасть в кэш профилей как отсутствующий
+        await UserService.invalidate_profiles(user.id)
 
     async def create(
         self,
@@ -0,0 +1,45 @@
+from fastapi import APIRouter, Depends, FastAPI
+from fastapi_users import FastAPIUsers
+
+from app.auth.auth import auth_backend
+from app.auth.manager import get_user_manager
+from app.auth.schemas import UserRead, UserCreate
+from app.models.users import User
+
+fastapi_users = FastAPIUsers[User, int](
+    get_user_manager,
+    [auth_backend],
+)
+
+current_user = fastapi_users.current_user()
+
+router = APIRouter()
+
+
+@router.get("/protected-route")
+def protected_route(user: User = Depends(current_user)):
+    return f"Hello, {user.username}"
+
+
+@router.get("/unprotected-route")
+def unprotected_route():
+    return f"Hello, anonym"
+
+
+def register_auth_routers(app: FastAPI) -> FastAPI:
+    """
+    Регистрация роутов авторизации и регистрации (fastapi-users)
+    """
+    app.include_router(
+        fastapi_users.get_auth_router(auth_backend),
+        prefix="/auth/jwt",
+        tags=["auth"],
+    )
+    app.include_router(
+        fastapi_users.get_register_router(UserRead, UserCreate),
+        prefix="/auth",
+        tags=["auth"],
+    )
+    app.include_router(router)
+
+    return app
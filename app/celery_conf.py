@@ -1,6 +1,10 @@
 import os
 
 from celery import Celery
+from celery.schedules import crontab
+from celery.signals import worker_process_init
+
+from app.config import TWEET_PURGE_INTERVAL
 
 celery_app = Celery(
     'main',
@@ -12,3 +16,30 @@ celery_app.autodiscover_tasks()
 celery_app.conf.hostname = 'localhost'
 celery_app.conf.broker_connection_retry_on_startup = True
 celery_app.conf.task_track_started = True
+celery_app.conf.beat_schedule = {
+    # Секции твитов создаются заранее, чтобы новые строки не попадали в tweets_default
+    "maintain-tweet-partitions": {
+        "task": "app.services.tasks.maintain_tweet_partitions",
+        "schedule": crontab(hour=3, minute=0),
+    },
+    # Лайки удалённых твитов (сами твиты скрываются сразу при удалении)
+    "purge-deleted-tweets": {
+        "task": "app.services.tasks.purge_deleted_tweets",
+        "schedule": TWEET_PURGE_INTERVAL,
+    },
+}
+
+
+@worker_process_init.connect
+def init_worker_tracing(**kwargs):
+    """
+    Настройка логирования и трассировки в процессе воркера (после fork, чтобы
+    у процесса был свой поток записи логов): задачи продолжают трассировку
+    запроса к API, из которого они были отправлены
+    """
+    from app.utils.log import setup_logging
+    from app.utils.tracing import connect_celery_tracing, setup_tracing
+
+    setup_logging()
+    setup_tracing()
+    connect_celery_tracing()
@@ -4,8 +4,186 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Режим отладки FastAPI (трассировки ошибок в ответах) - только для разработки
+DEBUG = os.environ.get("DEBUG", "false").lower() == "true"
+
 DB_HOST = os.environ.get("DB_HOST")
 DB_PORT = os.environ.get("DB_PORT")
 DB_NAME = os.environ.get("DB_NAME")
 DB_USER = os.environ.get("DB_USER")
 DB_PASS = os.environ.get("DB_PASS")
+
+# Настройки пула соединений с БД
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_CACHE_SIZE = int(os.environ.get("DB_STATEMENT_CACHE_SIZE", 100))
+# Сколько соединений каждого пула (основная БД и реплики) открывать при запуске
+# воркера, до приёма запросов (0 - без прогрева)
+DB_POOL_WARMUP = int(os.environ.get("DB_POOL_WARMUP", 2))
+
+# Реплики для чтения в формате "host:port" через запятую (пусто - реплик нет).
+# Для локальной проверки можно указать адрес основной БД: чтения пойдут через
+# отдельный пул соединений
+DB_REPLICA_HOSTS = [
+    host.strip()
+    for host in os.environ.get("DB_REPLICA_HOSTS", "").split(",")
+    if host.strip()
+]
+# Стратегия выбора реплики: round_robin | least_loaded
+DB_REPLICA_STRATEGY = os.environ.get("DB_REPLICA_STRATEGY", "round_robin")
+# Время (в секундах) после изменения данных, в течение которого чтения клиента
+# обслуживаются основной БД (окно хранится в Redis кэша - общее для всех воркеров)
+DB_READ_YOUR_WRITES_SECONDS = float(os.environ.get("DB_READ_YOUR_WRITES_SECONDS", 5))
+
+# Помесячные секции таблицы tweets: сколько месяцев создавать заранее,
+# через сколько месяцев отсоединять секции в архив (0 - не архивировать)
+TWEETS_PARTITIONS_AHEAD = int(os.environ.get("TWEETS_PARTITIONS_AHEAD", 3))
+TWEETS_ARCHIVE_AFTER_MONTHS = int(os.environ.get("TWEETS_ARCHIVE_AFTER_MONTHS", 0))
+TWEETS_ARCHIVE_SCHEMA = os.environ.get("TWEETS_ARCHIVE_SCHEMA", "tweets_archive")
+
+# Очистка удалённых твитов: сколько лайков удалять одной транзакцией
+# и период запуска задачи очистки (секунды)
+TWEET_PURGE_BATCH_SIZE = int(os.environ.get("TWEET_PURGE_BATCH_SIZE", 5000))
+TWEET_PURGE_INTERVAL = int(os.environ.get("TWEET_PURGE_INTERVAL", 60))
+
+# Лента: количество выводимых твитов и "горячее" окно (в днях), которое
+# просматривается в первую очередь
+FEED_LIMIT = int(os.environ.get("FEED_LIMIT", 100))
+FEED_HOT_DAYS = int(os.environ.get("FEED_HOT_DAYS", 30))
+# Способ сборки ленты: rows - строки из БД сериализуются в приложении,
+# json - готовый JSON-документ собирается в БД одним запросом
+FEED_ENGINE = os.environ.get("FEED_ENGINE", "rows")
+# Ранжированная лента (GET /api/tweets?ranked=true): сколько последних твитов
+# оценивается, веса свежести, скорости набора лайков и близости к автору,
+# периоды полураспада этих составляющих (секунды)
+FEED_RANK_CANDIDATES = int(os.environ.get("FEED_RANK_CANDIDATES", 500))
+FEED_RANK_RECENCY_WEIGHT = float(os.environ.get("FEED_RANK_RECENCY_WEIGHT", 1.0))
+FEED_RANK_VELOCITY_WEIGHT = float(os.environ.get("FEED_RANK_VELOCITY_WEIGHT", 0.5))
+FEED_RANK_AFFINITY_WEIGHT = float(os.environ.get("FEED_RANK_AFFINITY_WEIGHT", 0.3))
+FEED_RANK_RECENCY_HALF_LIFE = float(os.environ.get("FEED_RANK_RECENCY_HALF_LIFE", 6 * 3600))
+FEED_RANK_VELOCITY_HALF_LIFE = float(os.environ.get("FEED_RANK_VELOCITY_HALF_LIFE", 2 * 3600))
+FEED_RANK_AFFINITY_HALF_LIFE = float(os.environ.get("FEED_RANK_AFFINITY_HALF_LIFE", 30 * 86400))
+
+# Поиск твитов: размер страницы по умолчанию и максимальный, "горячее" окно
+# (в днях), результаты из которого ранжируются и выводятся первыми (0 - без окна)
+SEARCH_LIMIT = int(os.environ.get("SEARCH_LIMIT", 20))
+SEARCH_MAX_LIMIT = int(os.environ.get("SEARCH_MAX_LIMIT", 100))
+SEARCH_HOT_DAYS = int(os.environ.get("SEARCH_HOT_DAYS", 30))
+
+# Твиты с хэштегом и упоминания: размер страницы по умолчанию и максимальный
+TIMELINE_LIMIT = int(os.environ.get("TIMELINE_LIMIT", 20))
+TIMELINE_MAX_LIMIT = int(os.environ.get("TIMELINE_MAX_LIMIT", 100))
+
+# Тренды: окна по TRENDS_WINDOW_SECONDS (хранятся последние TRENDS_WINDOWS),
+# вклад окна умножается на TRENDS_DECAY за каждое окно возраста. Память на поток:
+# TRENDS_WINDOWS * (TRENDS_SKETCH_WIDTH * TRENDS_SKETCH_DEPTH * 4 байт + TRENDS_TOP_K ключей)
+TRENDS_WINDOW_SECONDS = int(os.environ.get("TRENDS_WINDOW_SECONDS", 300))
+TRENDS_WINDOWS = int(os.environ.get("TRENDS_WINDOWS", 12))
+TRENDS_DECAY = float(os.environ.get("TRENDS_DECAY", 0.7))
+TRENDS_SKETCH_WIDTH = int(os.environ.get("TRENDS_SKETCH_WIDTH", 2048))
+TRENDS_SKETCH_DEPTH = int(os.environ.get("TRENDS_SKETCH_DEPTH", 4))
+TRENDS_TOP_K = int(os.environ.get("TRENDS_TOP_K", 100))
+# Период слияния событий процесса с общим снимком в Redis (секунды),
+# время кэширования ответа и количество трендов в ответе
+TRENDS_FLUSH_INTERVAL = float(os.environ.get("TRENDS_FLUSH_INTERVAL", 10))
+TRENDS_CACHE_TTL = int(os.environ.get("TRENDS_CACHE_TTL", 30))
+TRENDS_LIMIT = int(os.environ.get("TRENDS_LIMIT", 10))
+
+# Ограничение частоты запросов на запись (token bucket в Redis, при недоступности
+# Redis - в памяти процесса): политики "запросов/секунд" - ёмкость корзины и время
+# её полного восстановления, отдельно на пользователя (api-key) и на IP
+# (пусто - без ограничения), максимум корзин в памяти процесса.
+# IP клиента берётся из X-Forwarded-For только от адресов SERVER_FORWARDED_ALLOW_IPS,
+# иначе все запросы через балансировщик попадают в одну корзину по его адресу
+RATE_LIMIT_ENABLED = os.environ.get("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_TWEET_USER = os.environ.get("RATE_LIMIT_TWEET_USER", "30/60")
+RATE_LIMIT_TWEET_IP = os.environ.get("RATE_LIMIT_TWEET_IP", "120/60")
+RATE_LIMIT_LIKE_USER = os.environ.get("RATE_LIMIT_LIKE_USER", "120/60")
+RATE_LIMIT_LIKE_IP = os.environ.get("RATE_LIMIT_LIKE_IP", "600/60")
+RATE_LIMIT_FOLLOW_USER = os.environ.get("RATE_LIMIT_FOLLOW_USER", "60/60")
+RATE_LIMIT_FOLLOW_IP = os.environ.get("RATE_LIMIT_FOLLOW_IP", "300/60")
+RATE_LIMIT_SIGNUP_IP = os.environ.get("RATE_LIMIT_SIGNUP_IP", "5/600")
+RATE_LIMIT_LOCAL_MAX_KEYS = int(os.environ.get("RATE_LIMIT_LOCAL_MAX_KEYS", 10000))
+
+# Ключи идемпотентности (заголовок Idempotency-Key у POST-запросов): время
+# хранения ответа в секундах (0 - отключено), время, после которого
+# незавершённый запрос с тем же ключом считается прерванным (повторы ждут
+# его результат не дольше), и максимум ответов в памяти процесса без Redis
+IDEMPOTENCY_TTL = int(os.environ.get("IDEMPOTENCY_TTL", 86400))
+IDEMPOTENCY_LOCK_TIMEOUT = float(os.environ.get("IDEMPOTENCY_LOCK_TIMEOUT", 10))
+IDEMPOTENCY_LOCAL_MAX_KEYS = int(os.environ.get("IDEMPOTENCY_LOCAL_MAX_KEYS", 10000))
+
+# Отладка SQL: заголовки X-DB-Query-Count / X-DB-Query-Time в ответах и
+# предупреждение в лог, если запрос к API выполнил больше QUERY_WARN_THRESHOLD
+# SQL-запросов (0 - не предупреждать)
+QUERY_DEBUG = os.environ.get("QUERY_DEBUG", "false").lower() == "true"
+QUERY_WARN_THRESHOLD = int(os.environ.get("QUERY_WARN_THRESHOLD", 0))
+
+# Сбор метрик Prometheus (эндпоинт /metrics) и каталог файлов метрик для
+# нескольких воркеров (python -m app.server при SERVER_WORKERS != 1 создаёт
+# временный каталог, если не задан; каталог очищается при запуске сервера)
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "true").lower() == "true"
+PROMETHEUS_MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR", "")
+
+# Трассировка: экспортёр спанов none | console | memory | file | otlp
+# (otlp требует пакета opentelemetry-exporter-otlp), файл для экспортёра file
+# и название сервиса в трассировках
+TRACING_EXPORTER = os.environ.get("TRACING_EXPORTER", "none")
+TRACING_FILE = os.environ.get("TRACING_FILE", "traces.jsonl")
+TRACING_SERVICE_NAME = os.environ.get("TRACING_SERVICE_NAME", "naptwitter")
+
+# Сжатие ответов (gzip, brotli - при установленном пакете brotli):
+# минимальный размер ответа в байтах (0 - сжатие отключено) и уровни сжатия
+COMPRESSION_MINIMUM_SIZE = int(os.environ.get("COMPRESSION_MINIMUM_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", 4))
+
+# Выгрузка данных пользователя: количество строк, читаемых из курсора БД за раз
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", 1000))
+
+# Кэш ответов: Redis (L2, пустое значение - только кэш в памяти процесса),
+# размер и время жизни записей кэша в памяти (L1), коэффициент вероятностного
+# досрочного обновления (0 - отключено), время ожидания результата при
+# объединении одинаковых запросов и канал Redis для сброса L1 в других процессах
+CACHE_REDIS_URL = os.environ.get("CACHE_REDIS_URL", "redis://localhost")
+CACHE_PREFIX = os.environ.get("CACHE_PREFIX", "fastapi-cache")
+CACHE_L1_MAX_ITEMS = int(os.environ.get("CACHE_L1_MAX_ITEMS", 1024))
+CACHE_L1_TTL = float(os.environ.get("CACHE_L1_TTL", 5))
+CACHE_EARLY_REFRESH_BETA = float(os.environ.get("CACHE_EARLY_REFRESH_BETA", 1))
+CACHE_COALESCE_TIMEOUT = float(os.environ.get("CACHE_COALESCE_TIMEOUT", 5))
+CACHE_INVALIDATION_CHANNEL = os.environ.get("CACHE_INVALIDATION_CHANNEL", "cache-invalidation")
+
+# Кэш профилей пользователей (GET /api/users/{user_id}): время жизни записи
+# и отрицательной записи (пользователь не найден), в секундах
+PROFILE_CACHE_TTL = int(os.environ.get("PROFILE_CACHE_TTL", 60))
+PROFILE_NEGATIVE_TTL = int(os.environ.get("PROFILE_NEGATIVE_TTL", 30))
+
+# Кэш метаданных твитов (автор, дата создания) для лайков и удаления, в секундах
+TWEET_META_TTL = int(os.environ.get("TWEET_META_TTL", 3600))
+
+# Логирование: минимальный уровень, доля записываемых сообщений по уровням
+# (например, DEBUG=0.01 - каждое сотое отладочное сообщение), вывод в JSON
+# и размер очереди неблокирующего приёмника (при переполнении сообщения отбрасываются)
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO")
+LOG_SAMPLING = os.environ.get("LOG_SAMPLING", "DEBUG=0.1")
+LOG_JSON = os.environ.get("LOG_JSON", "false").lower() == "true"
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", 10000))
+
+# Сервер приложения (python -m app.server): адрес, количество воркеров
+# (0 - по числу доступных ядер), очередь входящих соединений, время жизни
+# keep-alive соединения (больше тайм-аута балансировщика, чтобы он не получал
+# закрытые соединения), время на завершение запросов после SIGTERM,
+# журнал запросов uvicorn и адреса прокси/балансировщиков через запятую,
+# которым доверяются заголовки X-Forwarded-For / X-Forwarded-Proto ("*" - любым;
+# от этого зависит IP клиента в ограничении частоты запросов)
+SERVER_HOST = os.environ.get("SERVER_HOST", "0.0.0.0")
+SERVER_PORT = int(os.environ.get("SERVER_PORT", 8000))
+SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", 0))
+SERVER_BACKLOG = int(os.environ.get("SERVER_BACKLOG", 2048))
+SERVER_KEEPALIVE_TIMEOUT = int(os.environ.get("SERVER_KEEPALIVE_TIMEOUT", 65))
+SERVER_GRACEFUL_TIMEOUT = int(os.environ.get("SERVER_GRACEFUL_TIMEOUT", 30))
+SERVER_ACCESS_LOG = os.environ.get("SERVER_ACCESS_LOG", "false").lower() == "true"
+SERVER_FORWARDED_ALLOW_IPS = os.environ.get("SERVER_FORWARDED_ALLOW_IPS", "127.0.0.1")
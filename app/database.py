@@ -1,13 +1,41 @@
-from fastapi import Depends
+import asyncio
+
+from fastapi import Depends, Request
 from fastapi_users_db_sqlalchemy import SQLAlchemyUserDatabase
-from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
-from sqlalchemy import MetaData
+from sqlalchemy.pool import NullPool
+from sqlalchemy import MetaData, create_engine
+from functools import lru_cache
+from loguru import logger
 from typing import AsyncGenerator
 
-from app.config import DB_USER, DB_PASS, DB_HOST, DB_PORT, DB_NAME
+from app.config import (
+    DB_USER,
+    DB_PASS,
+    DB_HOST,
+    DB_PORT,
+    DB_NAME,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_POOL_WARMUP,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_REPLICA_HOSTS,
+    DB_REPLICA_STRATEGY,
+    DB_READ_YOUR_WRITES_SECONDS,
+    CACHE_PREFIX,
+)
+from app.utils.cache import cache_backend
+from app.utils.pool import MeteredQueuePool
+from app.utils.replica import Replica, ReplicaRouter
 
 DATABASE_URL = f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# Синхронное подключение для фоновых задач Celery
+DATABASE_URL_SYNC = f"postgresql+psycopg2://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
 
 class Base(DeclarativeBase):
@@ -16,12 +44,113 @@ class Base(DeclarativeBase):
 
 metadata = MetaData()
 
-engine = create_async_engine(DATABASE_URL)
+engine_options = dict(
+    poolclass=MeteredQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+    connect_args={
+        # Кэш подготовленных выражений asyncpg и адаптера SQLAlchemy
+        "statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+        "prepared_statement_cache_size": DB_STATEMENT_CACHE_SIZE,
+    },
+)
+
+engine = create_async_engine(DATABASE_URL, **engine_options)
 
 async_session_maker = async_sessionmaker(
     engine, expire_on_commit=False, class_=AsyncSession
 )
 
+replica_engines = [
+    create_async_engine(
+        f"postgresql+asyncpg://{DB_USER}:{DB_PASS}@{host}/{DB_NAME}", **engine_options
+    )
+    for host in DB_REPLICA_HOSTS
+]
+
+replica_router = ReplicaRouter(
+    primary=async_session_maker,
+    replicas=[
+        Replica(
+            session_maker=async_sessionmaker(
+                replica_engine, expire_on_commit=False, class_=AsyncSession
+            ),
+            load=lambda e=replica_engine: e.sync_engine.pool.checkedout(),
+        )
+        for replica_engine in replica_engines
+    ],
+    strategy=DB_REPLICA_STRATEGY,
+    read_your_writes_seconds=DB_READ_YOUR_WRITES_SECONDS,
+    redis=lambda: cache_backend.redis,
+    key_prefix=CACHE_PREFIX,
+)
+
+
+async def warm_up_engine(current_engine: AsyncEngine, connections: int) -> int:
+    """
+    Открытие соединений пула заранее: первые запросы не ждут подключения
+    к БД и инициализации диалекта SQLAlchemy
+    :param current_engine: движок
+    :param connections: количество соединений (не больше размера пула)
+    :return: количество открытых соединений
+    """
+    connections = min(connections, current_engine.pool.size())
+
+    if connections <= 0:
+        return 0
+
+    # Первое соединение открывается отдельно: при нём SQLAlchemy определяет
+    # версию сервера и настройки диалекта
+    opened = [await current_engine.connect()]
+    results = await asyncio.gather(
+        *(current_engine.connect() for _ in range(connections - 1)), return_exceptions=True
+    )
+    opened += [result for result in results if not isinstance(result, BaseException)]
+
+    # Соединения возвращаются в пул и остаются открытыми
+    for connection in opened:
+        await connection.close()
+
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    return len(opened)
+
+
+async def warm_up_engines(connections: int = DB_POOL_WARMUP) -> None:
+    """
+    Прогрев пулов основной БД и реплик при запуске приложения. Ошибка подключения
+    не останавливает запуск: соединения будут открыты при первых запросах
+    """
+    for current_engine in (engine, *replica_engines):
+        try:
+            opened = await warm_up_engine(current_engine, connections)
+        except Exception as exc:
+            logger.warning("Не удалось прогреть пул {}: {}", current_engine.url.host, exc)
+            continue
+
+        logger.info("Пул {}: открыто соединений: {}", current_engine.url.host, opened)
+
+
+async def dispose_engines() -> None:
+    """
+    Закрытие соединений всех пулов (при остановке приложения)
+    """
+    for current_engine in (engine, *replica_engines):
+        await current_engine.dispose()
+
+
+@lru_cache
+def get_sync_engine() -> Engine:
+    """
+    Синхронный движок для фоновых задач (создаётся при первом обращении)
+    """
+    return create_engine(DATABASE_URL_SYNC, poolclass=NullPool)
+
 
 async def get_async_session_user() -> AsyncGenerator[AsyncSession, None]:
     async with async_session_maker() as session:
@@ -33,3 +162,11 @@ async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
         yield session
 
 
+async def get_async_session_read(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Сессия для эндпоинтов, которые только читают данные (может быть привязана к реплике)
+    """
+    session_maker = await replica_router.session_maker_for(request)
+
+    async with session_maker() as session:
+        yield session
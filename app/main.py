@@ -1,63 +1,104 @@
-from fastapi import FastAPI, Depends
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+from fastapi import FastAPI
 from fastapi_cache import FastAPICache
-from fastapi_cache.backends.redis import RedisBackend
-from fastapi_users import FastAPIUsers
+from sqlalchemy.orm import configure_mappers
 
-from redis import asyncio as aioredis
 from app.urls import register_routers
 from app.utils.exeptions import CustomApiException, custom_api_exception_handler
-from app.auth.auth import auth_backend
-
-from app.auth.manager import get_user_manager
-from app.auth.schemas import UserRead, UserCreate
-from app.models.users import User
-
-app = FastAPI(title="app", debug=True)
+from app.auth.routes import register_auth_routers
+from app.config import (
+    CACHE_PREFIX,
+    COMPRESSION_BROTLI_QUALITY,
+    COMPRESSION_GZIP_LEVEL,
+    COMPRESSION_MINIMUM_SIZE,
+    DEBUG,
+    IDEMPOTENCY_TTL,
+    METRICS_ENABLED,
+    QUERY_DEBUG,
+    QUERY_WARN_THRESHOLD,
+    TRACING_EXPORTER,
+)
+from app.database import dispose_engines, replica_router, warm_up_engines
+from app.utils.cache import cache_backend
+from app.utils.compression import CompressionMiddleware
+from app.utils.idempotency import IdempotencyMiddleware
+from app.utils.log import setup_logging
+from app.utils.metrics import PrometheusMiddleware, mark_process_dead
+from app.utils.queries import QueryCountMiddleware
+from app.utils.replica import ReadYourWritesMiddleware
+from app.utils.tracing import TracingMiddleware, setup_tracing
+from app.utils.trends import trend_tracker
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """
+    Запуск и остановка воркера: пулы соединений с БД и Redis прогреваются
+    до того, как воркер начнёт принимать запросы
+    """
+    # Связи моделей настраиваются SQLAlchemy при первом запросе, если не сделать это заранее
+    configure_mappers()
+    await warm_up_engines()
+    await cache_backend.start()
+    FastAPICache.init(cache_backend, prefix=CACHE_PREFIX)
+    await trend_tracker.start()
+
+    yield
+
+    await trend_tracker.stop()
+    await cache_backend.stop()
+    await dispose_engines()
+    mark_process_dead()
 
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="app", debug=True)
+    """
+    Сборка приложения (для запуска: uvicorn --factory app.main:create_app)
+    """
+    setup_logging()
+
+    app = FastAPI(title="app", debug=DEBUG, lifespan=lifespan)
     register_routers(app)
+    register_auth_routers(app)
 
     app.add_exception_handler(CustomApiException, custom_api_exception_handler)
-    return app
-
+    # Внутри ReadYourWritesMiddleware: повторно выданный ответ тоже отмечает запись
+    if IDEMPOTENCY_TTL:
+        app.add_middleware(IdempotencyMiddleware)
 
-register_routers(app)
+    app.add_middleware(ReadYourWritesMiddleware, router=replica_router)
 
-app.add_exception_handler(CustomApiException, custom_api_exception_handler)
+    if COMPRESSION_MINIMUM_SIZE:
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=COMPRESSION_MINIMUM_SIZE,
+            gzip_level=COMPRESSION_GZIP_LEVEL,
+            brotli_quality=COMPRESSION_BROTLI_QUALITY,
+        )
 
-fastapi_users = FastAPIUsers[User, int](
-    get_user_manager,
-    [auth_backend],
-)
-
-app.include_router(
-    fastapi_users.get_auth_router(auth_backend),
-    prefix="/auth/jwt",
-    tags=["auth"],
-)
+    if QUERY_DEBUG:
+        app.add_middleware(QueryCountMiddleware, warn_threshold=QUERY_WARN_THRESHOLD)
 
-app.include_router(
-    fastapi_users.get_register_router(UserRead, UserCreate),
-    prefix="/auth",
-    tags=["auth"],
-)
+    if TRACING_EXPORTER != "none":
+        setup_tracing()
+        app.add_middleware(TracingMiddleware)
 
-current_user = fastapi_users.current_user()
+    if METRICS_ENABLED:
+        app.add_middleware(PrometheusMiddleware)
 
-
-@app.get("/protected-route")
-def protected_route(user: User = Depends(current_user)):
-    return f"Hello, {user.username}"
+    return app
 
 
-@app.get("/unprotected-route")
-def unprotected_route():
-    return f"Hello, anonym"
+def __getattr__(name: str) -> FastAPI:
+    """
+    Приложение для запуска по пути app.main:app и для тестов: собирается при первом
+    обращении, поэтому при запуске через --factory сборка не выполняется дважды
+    """
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
+    app = globals()["app"] = create_app()
 
-@app.on_event("startup")
-async def startup_event():
-    redis = aioredis.from_url("redis://localhost", encoding="utf8", decode_responses=True)
-    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+    return app
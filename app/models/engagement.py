@@ -0,0 +1,39 @@
+import datetime
+
+from sqlalchemy import Double, ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class TweetEngagement(Base):
+    """
+    Скорость набора лайков твитом: счётчик с экспоненциальным затуханием,
+    обновляется при каждом лайке / дизлайке (см. EngagementService), а не
+    пересчитывается по таблице лайков при построении ленты.
+    Значение на момент t: velocity * 2 ** (-(t - updated_at) / период полураспада).
+    """
+
+    __tablename__ = "tweet_engagement"
+
+    tweet_id: Mapped[int] = mapped_column(primary_key=True)
+    velocity: Mapped[float] = mapped_column(Double, default=0)
+    updated_at: Mapped[datetime.datetime]
+
+
+class AuthorAffinity(Base):
+    """
+    Близость пользователя к автору: лайки твитов автора этим пользователем,
+    затухающие так же, как TweetEngagement
+    """
+
+    __tablename__ = "author_affinity"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    author_id: Mapped[int] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    score: Mapped[float] = mapped_column(Double, default=0)
+    updated_at: Mapped[datetime.datetime]
@@ -0,0 +1,51 @@
+import datetime
+
+from sqlalchemy import ForeignKey, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class Hashtag(Base):
+    """
+    Модель для хранения хэштегов (в нормализованном виде: без "#", в нижнем регистре)
+    """
+
+    __tablename__ = "hashtags"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    tag: Mapped[str] = mapped_column(String(100), unique=True)
+
+
+class TweetHashtag(Base):
+    """
+    Связь твитов с хэштегами - обратный индекс "хэштег -> твиты".
+    Первичный ключ (hashtag_id, tweet_id) отдаёт твиты хэштега от новых к старым,
+    created_at твита хранится для поиска твита только в его секции.
+    Внешний ключ на секционированную таблицу твитов невозможен (как и у лайков).
+    """
+
+    __tablename__ = "tweet_hashtags"
+    __table_args__ = (Index("ix_tweet_hashtags_tweet_id", "tweet_id"),)
+
+    hashtag_id: Mapped[int] = mapped_column(
+        ForeignKey("hashtags.id", ondelete="CASCADE"), primary_key=True
+    )
+    tweet_id: Mapped[int] = mapped_column(primary_key=True)
+    created_at: Mapped[datetime.datetime]
+
+
+class Mention(Base):
+    """
+    Упоминания пользователей в твитах - обратный индекс "пользователь -> твиты"
+    (устроен так же, как TweetHashtag)
+    """
+
+    __tablename__ = "mentions"
+    __table_args__ = (Index("ix_mentions_tweet_id", "tweet_id"),)
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    tweet_id: Mapped[int] = mapped_column(primary_key=True)
+    created_at: Mapped[datetime.datetime]
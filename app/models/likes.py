@@ -13,5 +13,5 @@ class Like(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
-    tweets_id: Mapped[int] = mapped_column(ForeignKey("tweets.id"))
+    tweets_id: Mapped[int] = mapped_column(index=True)
 
@@ -2,25 +2,72 @@ import datetime
 
 from typing import List
 from sqlalchemy.orm import Mapped, mapped_column, relationship
-from sqlalchemy import ForeignKey, String
+from sqlalchemy import DDL, Computed, ForeignKey, Index, String, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
 
 from app.database import Base
 from app.models.likes import Like
 
+# Конфигурация полнотекстового поиска: русские слова приводятся к основе,
+# латинские - по правилам английского языка. Совпадает с выражением
+# колонки search_vector (смена конфигурации требует миграции)
+SEARCH_CONFIG = "russian"
+
 
 class Tweet(Base):
     """
-    Модель для хранения твитов
+    Модель для хранения твитов.
+    Таблица секционирована по месяцам по created_at (см. TweetPartitionService),
+    поэтому created_at входит в первичный ключ.
     """
 
     __tablename__ = "tweets"
+    __table_args__ = (
+        Index("ix_tweets_user_id_created_at", "user_id", "created_at"),
+        Index("ix_tweets_search_vector", "search_vector", postgresql_using="gin"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True, index=True)
     tweet_data: Mapped[str] = mapped_column(String(280))
     created_at: Mapped[datetime.datetime] = mapped_column(
-        default=datetime.datetime.utcnow, nullable=True
+        primary_key=True, default=datetime.datetime.utcnow
     )
     user_id: Mapped[int] = mapped_column(ForeignKey("user.id"))
+    # Лексемы текста для полнотекстового поиска: вычисляются БД при записи
+    # и не загружаются вместе с объектом
+    search_vector: Mapped[str] = mapped_column(
+        TSVECTOR,
+        Computed(f"to_tsvector('{SEARCH_CONFIG}'::regconfig, tweet_data)", persisted=True),
+        deferred=True,
+    )
+    # Внешний ключ на секционированную таблицу по одному id невозможен,
+    # поэтому связь с лайками описана без ForeignKey. Лайки удалённого твита
+    # не загружаются и не удаляются ORM: их пачками удаляет TweetPurgeService
     likes: Mapped[List["Like"]] = relationship(
-        backref="tweet", cascade="all, delete-orphan"
+        primaryjoin="Tweet.id == foreign(Like.tweets_id)",
+        backref="tweet",
+        cascade="save-update, merge",
+        passive_deletes="all",
     )
+
+
+class TweetPurge(Base):
+    """
+    Очередь очистки: удалённые твиты, лайки которых ещё не удалены.
+    Запись добавляется в транзакции удаления твита, поэтому не теряется
+    при сбое до очистки.
+    """
+
+    __tablename__ = "tweet_purges"
+
+    tweet_id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    deleted_at: Mapped[datetime.datetime] = mapped_column(default=datetime.datetime.utcnow)
+
+
+# Секция по умолчанию принимает строки, для месяца которых ещё не создана секция
+event.listen(
+    Tweet.__table__,
+    "after_create",
+    DDL("CREATE TABLE IF NOT EXISTS tweets_default PARTITION OF tweets DEFAULT"),
+)
@@ -8,6 +8,9 @@ from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.models.likes import Like
 from app.models.tweets import Tweet
+from app.models.versions import ContentVersion
+from app.models.hashtags import Hashtag, Mention, TweetHashtag
+from app.models.engagement import AuthorAffinity, TweetEngagement
 
 
 from app.database import Base
@@ -30,6 +33,8 @@ class User(SQLAlchemyBaseUserTable[int], Base):
     registered_at = Column(TIMESTAMP, default=datetime.utcnow)
     hashed_password: Mapped[str] = mapped_column(
         String, nullable=False)
+    api_key: Mapped[str] = mapped_column(
+        String(64), nullable=True, unique=True, index=True)
     email_code: Mapped[str] = mapped_column(
         String, nullable=False, default='empty')
     is_active: Mapped[bool] = mapped_column(
@@ -0,0 +1,58 @@
+from sqlalchemy import DDL, BigInteger, ForeignKey, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.database import Base
+
+
+class ContentVersion(Base):
+    """
+    Счётчик изменений контента автора: увеличивается триггерами при добавлении
+    и удалении его твитов и лайков к ним. Используется для дешёвого вычисления
+    ETag ленты без построения самой ленты.
+    """
+
+    __tablename__ = "content_versions"
+
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("user.id", ondelete="CASCADE"), primary_key=True
+    )
+    version: Mapped[int] = mapped_column(BigInteger, default=0)
+
+
+BUMP_CONTENT_VERSION_FUNCTION = """
+CREATE OR REPLACE FUNCTION bump_content_version() RETURNS trigger AS $$
+DECLARE
+    author integer;
+    row_data record;
+BEGIN
+    IF TG_OP = 'DELETE' THEN
+        row_data := OLD;
+    ELSE
+        row_data := NEW;
+    END IF;
+
+    IF TG_TABLE_NAME = 'likes' THEN
+        SELECT user_id INTO author FROM tweets WHERE id = row_data.tweets_id LIMIT 1;
+    ELSE
+        author := row_data.user_id;
+    END IF;
+
+    IF author IS NOT NULL THEN
+        INSERT INTO content_versions (user_id, version) VALUES (author, 1)
+        ON CONFLICT (user_id) DO UPDATE SET version = content_versions.version + 1;
+    END IF;
+
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql
+"""
+
+CONTENT_VERSION_TRIGGERS = [
+    f"CREATE TRIGGER bump_content_version AFTER INSERT OR DELETE ON {table} "
+    f"FOR EACH ROW EXECUTE FUNCTION bump_content_version()"
+    for table in ("tweets", "likes")
+]
+
+# Триггеры ссылаются на tweets и likes, поэтому создаются после всех таблиц
+for statement in [BUMP_CONTENT_VERSION_FUNCTION, *CONTENT_VERSION_TRIGGERS]:
+    event.listen(Base.metadata, "after_create", DDL(statement))
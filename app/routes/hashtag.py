@@ -0,0 +1,44 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, Path, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import TIMELINE_LIMIT, TIMELINE_MAX_LIMIT
+from app.database import get_async_session_read
+from app.models.users import User
+from app.services.tweet import TweetsService
+from app.utils.feed import FeedResponse
+from app.utils.user import get_current_user
+from app.schemas.tweet import TweetListSchema
+from app.schemas.base_response import UnauthorizedResponseSchema, ValidationResponseSchema
+
+router = APIRouter(
+    prefix="/api/hashtags", tags=["hashtags"]
+)
+
+
+@router.get(
+    "/{tag}/tweets",
+    response_model=TweetListSchema,
+    response_class=FeedResponse,
+    responses={
+        401: {"model": UnauthorizedResponseSchema},
+        422: {"model": ValidationResponseSchema},
+    },
+    status_code=200,
+)
+async def get_hashtag_tweets(
+        current_user: Annotated[User, Depends(get_current_user)],
+        tag: Annotated[str, Path(min_length=1, max_length=101)],
+        max_id: Annotated[int | None, Query()] = None,
+        limit: Annotated[int, Query(ge=1, le=TIMELINE_MAX_LIMIT)] = TIMELINE_LIMIT,
+        session: AsyncSession = Depends(get_async_session_read),
+):
+    """
+    Вывод твитов с хэштегом, от новых к старым. Следующая страница
+    запрашивается с max_id = id последнего твита предыдущей страницы
+    """
+    tweets = await TweetsService.get_hashtag_tweets(
+        tag=tag, session=session, max_id=max_id, limit=limit
+    )
+
+    return FeedResponse(tweets)
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+from app.database import engine, replica_engines
+from app.schemas.service import PoolStatsResponseSchema
+from app.utils.metrics import PoolCollector, scrape_registry
+from app.utils.pool import pool_snapshot
+
+router = APIRouter(
+    prefix="/api/service", tags=["service"]
+)
+
+# Эндпоинт для Prometheus - по стандартному пути, вне префикса API
+metrics_router = APIRouter(tags=["service"])
+
+# Пулы соединений принадлежат процессу: при нескольких воркерах метрики пулов
+# в ответе /metrics относятся к воркеру, обработавшему запрос
+registry = scrape_registry()
+registry.register(
+    PoolCollector(
+        lambda: {
+            "primary": engine,
+            **{
+                f"replica{number}": replica_engine
+                for number, replica_engine in enumerate(replica_engines, 1)
+            },
+        }
+    )
+)
+
+
+@router.get(
+    "/pool",
+    response_model=PoolStatsResponseSchema,
+    status_code=200,
+)
+async def get_pool_stats():
+    """
+    Вывод метрик пула соединений с БД: занятые соединения, overflow, гистограмма
+    времени ожидания соединения и количество таймаутов (для основной БД и реплик)
+    """
+    return {
+        "pool": pool_snapshot(engine.sync_engine),
+        "replicas": [
+            pool_snapshot(replica_engine.sync_engine)
+            for replica_engine in replica_engines
+        ],
+    }
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """
+    Метрики в формате Prometheus: задержки запросов по маршрутам и методов
+    сервисов, запросы в обработке, пулы соединений с БД, обращения к кэшу
+    и время отправки задач Celery
+    """
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,39 @@
+from typing import Annotated
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import TRENDS_LIMIT, TRENDS_TOP_K
+from app.database import get_async_session_read
+from app.models.users import User
+from app.services.trend import TrendService
+from app.utils.user import get_current_user
+from app.schemas.trend import TrendsSchema
+from app.schemas.base_response import UnauthorizedResponseSchema, ValidationResponseSchema
+
+router = APIRouter(
+    prefix="/api/trends", tags=["trends"]
+)
+
+
+@router.get(
+    "",
+    response_model=TrendsSchema,
+    responses={
+        401: {"model": UnauthorizedResponseSchema},
+        422: {"model": ValidationResponseSchema},
+    },
+    status_code=200,
+)
+async def get_trends(
+        current_user: Annotated[User, Depends(get_current_user)],
+        limit: Annotated[int, Query(ge=1, le=TRENDS_TOP_K)] = TRENDS_LIMIT,
+        session: AsyncSession = Depends(get_async_session_read),
+):
+    """
+    Вывод трендов: хэштеги, чаще всего встречающиеся в новых твитах, и твиты,
+    набирающие больше всего лайков (недавние события весят больше)
+    """
+    return Response(
+        await TrendService.get_trends(limit=limit, session=session),
+        media_type="application/json",
+    )
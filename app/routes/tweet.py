@@ -1,22 +1,44 @@
+import time
 from typing import Annotated
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Request, Response
 from fastapi_cache.decorator import cache
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_async_session
+from app.config import (
+    FEED_ENGINE,
+    FEED_LIMIT,
+    RATE_LIMIT_LIKE_IP,
+    RATE_LIMIT_LIKE_USER,
+    RATE_LIMIT_TWEET_IP,
+    RATE_LIMIT_TWEET_USER,
+    SEARCH_LIMIT,
+    SEARCH_MAX_LIMIT,
+)
+from app.database import get_async_session, get_async_session_read
 from app.models.users import User
 from app.services.like import LikeService
 from app.services.tweet import TweetsService
+from app.utils.etag import CACHE_CONTROL, etag_matches, make_etag, not_modified
+from app.utils.feed import FeedResponse, encode_search_page
+from app.utils.rate_limit import RateLimit
+from app.utils.search import SearchCursor
 from app.utils.user import get_current_user
-from app.schemas.tweet import TweetResponseSchema, TweetInSchema, TweetListSchema
+from app.schemas.tweet import TweetResponseSchema, TweetInSchema, TweetListSchema, TweetSearchSchema
 from app.schemas.base_response import (
     ResponseSchema,
     UnauthorizedResponseSchema,
     ValidationResponseSchema,
     LockedResponseSchema,
     ErrorResponseSchema,
+    TooManyRequestsResponseSchema,
 )
 
+# Период обновления ETag ранжированной ленты (секунды)
+RANKED_ETAG_SECONDS = 60
+
+tweet_rate_limit = RateLimit("tweet", user=RATE_LIMIT_TWEET_USER, ip=RATE_LIMIT_TWEET_IP)
+like_rate_limit = RateLimit("like", user=RATE_LIMIT_LIKE_USER, ip=RATE_LIMIT_LIKE_IP)
+
 router = APIRouter(
     prefix="/api/tweets", tags=["tweets"]
 )
@@ -26,19 +48,93 @@ router = APIRouter(
 @router.get(
     "",
     response_model=TweetListSchema,
+    response_class=FeedResponse,
     responses={401: {"model": UnauthorizedResponseSchema}},
     status_code=200,
 )
 async def get_tweets(
+        request: Request,
         current_user: Annotated[User, Depends(get_current_user)],
-        session: AsyncSession = Depends(get_async_session),
+        ranked: bool = False,
+        session: AsyncSession = Depends(get_async_session_read),
 ):
     """
-    Вывод ленты твитов (выводятся твиты людей, на которых подписан пользователь)
+    Вывод ленты твитов (выводятся твиты людей, на которых подписан пользователь).
+    ranked=true - лента по оценке (свежесть, скорость набора лайков, близость
+    к автору) вместо хронологической; её ETag меняется и со временем
+    (раз в RANKED_ETAG_SECONDS), так как оценка свежести затухает.
+    Ответ сериализуется напрямую из DTO (или собирается в БД при FEED_ENGINE=json),
+    минуя валидацию по TweetListSchema (схема остаётся для документации).
+    Если у клиента актуальная версия ленты (If-None-Match), возвращается 304
+    без построения ленты.
     """
+    author_ids = sorted(following.id for following in current_user.following)
+    version = await TweetsService.get_feed_version(author_ids=author_ids, session=session)
+    if ranked:
+        etag = make_etag(
+            "feed", "ranked", FEED_LIMIT, author_ids, version, int(time.time() // RANKED_ETAG_SECONDS)
+        )
+    else:
+        etag = make_etag("feed", FEED_ENGINE, FEED_LIMIT, author_ids, version)
+
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+
+    if ranked:
+        return FeedResponse(
+            await TweetsService.get_ranked_tweets(user=current_user, session=session),
+            headers=headers,
+        )
+
+    if FEED_ENGINE == "json":
+        return Response(
+            await TweetsService.get_tweets_json(user=current_user, session=session),
+            media_type="application/json",
+            headers=headers,
+        )
+
     tweets = await TweetsService.get_tweets(user=current_user, session=session)
 
-    return {"tweets": tweets}
+    return FeedResponse(tweets, headers=headers)
+
+
+@router.get(
+    "/search",
+    response_model=TweetSearchSchema,
+    responses={
+        401: {"model": UnauthorizedResponseSchema},
+        422: {"model": ValidationResponseSchema},
+    },
+    status_code=200,
+)
+async def search_tweets(
+        current_user: Annotated[User, Depends(get_current_user)],
+        q: Annotated[str, Query(min_length=1, max_length=280)],
+        cursor: Annotated[str | None, Query()] = None,
+        limit: Annotated[int, Query(ge=1, le=SEARCH_MAX_LIMIT)] = SEARCH_LIMIT,
+        following: bool = False,
+        session: AsyncSession = Depends(get_async_session_read),
+):
+    """
+    Поиск твитов по тексту, самые релевантные первыми. Следующая страница
+    запрашивается с курсором next_cursor из предыдущего ответа, following=true -
+    поиск только среди твитов подписок
+    """
+    tweets, next_cursor = await TweetsService.search_tweets(
+        query=q,
+        user=current_user,
+        session=session,
+        cursor=SearchCursor.decode(cursor) if cursor else None,
+        limit=limit,
+        following_only=following,
+    )
+
+    return Response(
+        encode_search_page(tweets, next_cursor.encode() if next_cursor else None),
+        media_type="application/json",
+    )
 
 
 @router.post(
@@ -47,8 +143,10 @@ async def get_tweets(
     responses={
         401: {"model": UnauthorizedResponseSchema},
         422: {"model": ValidationResponseSchema},
+        429: {"model": TooManyRequestsResponseSchema},
     },
     status_code=201,
+    dependencies=[Depends(tweet_rate_limit)],
 )
 async def create_tweet(
         tweet: TweetInSchema,
@@ -99,8 +197,10 @@ async def delete_tweet(
         404: {"model": ErrorResponseSchema},
         422: {"model": ValidationResponseSchema},
         423: {"model": LockedResponseSchema},
+        429: {"model": TooManyRequestsResponseSchema},
     },
     status_code=201,
+    dependencies=[Depends(like_rate_limit)],
 )
 async def create_like(
         tweet_id: int,
@@ -4,18 +4,30 @@ import secrets
 import socket
 import random
 from http import HTTPStatus
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.services.tasks import send_async_email_task
-from app.database import get_async_session
+from app.config import (
+    RATE_LIMIT_FOLLOW_IP,
+    RATE_LIMIT_FOLLOW_USER,
+    RATE_LIMIT_SIGNUP_IP,
+    TIMELINE_LIMIT,
+    TIMELINE_MAX_LIMIT,
+)
+from app.database import get_async_session, get_async_session_read, replica_router
 from app.models.users import User
 from app.services.user import UserService
 from app.services.follower import FollowerService
+from app.services.export import ExportService, NDJSON_MEDIA_TYPE
+from app.services.tweet import TweetsService
+from app.utils.etag import CACHE_CONTROL, etag_matches, make_etag, not_modified
+from app.utils.feed import FeedResponse
+from app.utils.rate_limit import RateLimit
 from app.utils.user import get_current_user
 from app.utils.exeptions import CustomApiException
+from app.schemas.tweet import TweetListSchema
 from app.schemas.user import UserOutSchema, EmailSchema, UserResult, UserCreate, UserActivationCreate
 from app.schemas.base_response import (
     UnauthorizedResponseSchema,
@@ -23,6 +35,7 @@ from app.schemas.base_response import (
     ValidationResponseSchema,
     ResponseSchema,
     LockedResponseSchema,
+    TooManyRequestsResponseSchema,
 )
 from passlib.hash import bcrypt
 
@@ -36,6 +49,10 @@ router = APIRouter(
     prefix="/api/users", tags=["users"]
 )
 
+follow_rate_limit = RateLimit("follow", user=RATE_LIMIT_FOLLOW_USER, ip=RATE_LIMIT_FOLLOW_IP)
+# Регистрация без api-key: ограничение только по IP (письма с кодом активации)
+signup_rate_limit = RateLimit("signup", ip=RATE_LIMIT_SIGNUP_IP)
+
 
 @router.get(
     "/me",
@@ -43,13 +60,92 @@ router = APIRouter(
     responses={401: {"model": UnauthorizedResponseSchema}},
     status_code=200,
 )
-async def get_me(current_user: Annotated[User, Depends(get_current_user)]):
+async def get_me(
+        request: Request,
+        response: Response,
+        current_user: Annotated[User, Depends(get_current_user)],
+):
     """
-    Вывод данных о текущем пользователе: id, username, подписки, подписчики
+    Вывод данных о текущем пользователе: id, username, подписки, подписчики.
+    ETag вычисляется по уже загруженным подпискам; при совпадении с If-None-Match
+    возвращается 304 без сериализации ответа.
     """
+    etag = make_etag(
+        "me",
+        current_user.id,
+        current_user.username,
+        [(user.id, user.username) for user in current_user.following],
+        [(user.id, user.username) for user in current_user.followers],
+    )
+
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
     return {"user": current_user}
 
 
+@router.get(
+    "/me/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {NDJSON_MEDIA_TYPE: {}}},
+        401: {"model": UnauthorizedResponseSchema},
+    },
+    status_code=200,
+)
+async def export_me(
+        request: Request,
+        current_user: Annotated[User, Depends(get_current_user)],
+):
+    """
+    Потоковая выгрузка данных текущего пользователя (профиль, твиты, лайки) в NDJSON.
+    Сессия открывается внутри генератора: зависимости с yield закрываются
+    до начала отправки тела ответа.
+    """
+    session_maker = await replica_router.session_maker_for(request)
+
+    async def content():
+        async with session_maker() as session:
+            async for chunk in ExportService.iter_export(user=current_user, session=session):
+                yield chunk
+
+    return StreamingResponse(
+        content(),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": f'attachment; filename="user-{current_user.id}.ndjson"'},
+    )
+
+
+@router.get(
+    "/me/mentions",
+    response_model=TweetListSchema,
+    response_class=FeedResponse,
+    responses={
+        401: {"model": UnauthorizedResponseSchema},
+        422: {"model": ValidationResponseSchema},
+    },
+    status_code=200,
+)
+async def get_my_mentions(
+        current_user: Annotated[User, Depends(get_current_user)],
+        max_id: Annotated[int | None, Query()] = None,
+        limit: Annotated[int, Query(ge=1, le=TIMELINE_MAX_LIMIT)] = TIMELINE_LIMIT,
+        session: AsyncSession = Depends(get_async_session_read),
+):
+    """
+    Вывод твитов, в которых упомянут текущий пользователь, от новых к старым.
+    Следующая страница запрашивается с max_id = id последнего твита предыдущей страницы
+    """
+    tweets = await TweetsService.get_mention_tweets(
+        user_id=current_user.id, session=session, max_id=max_id, limit=limit
+    )
+
+    return FeedResponse(tweets)
+
+
 @router.post(
     "/{user_id}/follow",
     response_model=ResponseSchema,
@@ -58,8 +154,10 @@ async def get_me(current_user: Annotated[User, Depends(get_current_user)]):
         404: {"model": ErrorResponseSchema},
         422: {"model": ValidationResponseSchema},
         423: {"model": LockedResponseSchema},
+        429: {"model": TooManyRequestsResponseSchema},
     },
     status_code=201,
+    dependencies=[Depends(follow_rate_limit)],
 )
 async def create_follower(
         user_id: int,
@@ -115,20 +213,33 @@ async def delete_follower(
 )
 async def get_user(user_id: int, session: AsyncSession = Depends(get_async_session)):
     """
-    Вывод данных о пользователе: id, username, подписки, подписчики
+    Вывод данных о пользователе: id, username, подписки, подписчики.
+    Профиль отдаётся из кэша профилей уже сериализованным. Промах заполняется
+    из основной БД: кэш общий для всех клиентов, и профиль, прочитанный
+    с отстающей реплики после сброса, отдавался бы всем (и автору подписки) до
+    истечения PROFILE_CACHE_TTL.
     """
-    user = await UserService.get_user_for_id(user_id=user_id, session=session)
+    profile = await UserService.get_profile(user_id=user_id, session=session)
 
-    if user is None:
+    if profile is None:
         raise CustomApiException(
             status_code=HTTPStatus.NOT_FOUND, detail="User not found"
         )
 
-    return {"user": user}
+    return Response(profile, media_type="application/json")
 
 
-@router.put('/user/create', response_model=UserResult)
+@router.put(
+    '/user/create',
+    response_model=UserResult,
+    responses={429: {"model": TooManyRequestsResponseSchema}},
+    dependencies=[Depends(signup_rate_limit)],
+)
 async def create_user(req: UserCreate, db: AsyncSession = Depends(get_async_session_user)):
+    # Celery (и kombu) загружается при первой регистрации, а не при импорте
+    # приложения: обработчики сигналов Celery подключаются вместе с задачами
+    from app.services.tasks import send_async_email_task
+
     email_code = ''.join([str(secrets.randbelow(10)) for _ in range(8)])
     if req.re_password != req.password:
         raise HTTPException(detail="Password do not match, try again", status_code=status.HTTP_406_NOT_ACCEPTABLE)
@@ -206,6 +317,8 @@ async def create_user(req: UserCreate, db: AsyncSession = Depends(get_async_sess
     db.add(new_user)
     await db.commit()
     await db.refresh(new_user)
+    # Id мог попасть в кэш профилей как отсутствующий
+    await UserService.invalidate_profiles(new_user.id)
 
     send_async_email_task.delay(req.email.lower(), "Account Activation Code", {"msg": email_code, "email": req.email})
 
@@ -48,6 +48,16 @@ class LockedResponseSchema(ErrorResponseSchema):
     error_message: str = "The action is blocked"
 
 
+class TooManyRequestsResponseSchema(ErrorResponseSchema):
+    """
+    Схема для неуспешного ответа при превышении частоты запросов
+    (время ожидания - в заголовке Retry-After).
+    """
+
+    error_type: str = HTTPStatus.TOO_MANY_REQUESTS  # 429
+    error_message: str = "Too many requests"
+
+
 class BadResponseSchema(ResponseSchema):
     """
     Схема для ответа при отправке запроса на добавление изображения, но не приложив его.
@@ -0,0 +1,28 @@
+from typing import Dict, List
+from pydantic import BaseModel
+
+from app.schemas.base_response import ResponseSchema
+
+
+class PoolStatsSchema(BaseModel):
+    """
+    Схема для вывода состояния пула соединений с БД
+    """
+
+    size: int
+    checked_in: int
+    checked_out: int
+    overflow: int
+    timeouts: int = 0
+    wait_count: int = 0
+    wait_seconds_sum: float = 0.0
+    wait_histogram: Dict[str, int] = {}
+
+
+class PoolStatsResponseSchema(ResponseSchema):
+    """
+    Схема для вывода ответа с метриками пула соединений
+    """
+
+    pool: PoolStatsSchema
+    replicas: List[PoolStatsSchema] = []
@@ -0,0 +1,23 @@
+from typing import List
+from pydantic import BaseModel
+
+from app.schemas.base_response import ResponseSchema
+from app.schemas.tweet import TweetOutSchema
+
+
+class TrendHashtagSchema(BaseModel):
+    """
+    Схема для вывода хэштега в трендах (оценка - количество упоминаний с учётом затухания)
+    """
+
+    tag: str
+    score: float
+
+
+class TrendsSchema(ResponseSchema):
+    """
+    Схема для вывода трендов: хэштеги и твиты по убыванию популярности
+    """
+
+    hashtags: List[TrendHashtagSchema]
+    tweets: List[TweetOutSchema]
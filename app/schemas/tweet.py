@@ -71,3 +71,11 @@ class TweetListSchema(ResponseSchema):
     """
 
     tweets: List[TweetOutSchema]
+
+
+class TweetSearchSchema(TweetListSchema):
+    """
+    Схема для вывода страницы результатов поиска
+    """
+
+    next_cursor: Optional[str] = None
@@ -0,0 +1,118 @@
+"""
+Запуск приложения в production-режиме: несколько процессов uvicorn, цикл
+событий uvloop и HTTP-парсер httptools (если установлены).
+
+Каждый воркер собирает приложение через create_app() и при запуске (lifespan)
+прогревает собственные пулы соединений с БД и Redis. По SIGTERM воркеры
+перестают принимать соединения, дожидаются завершения текущих запросов (не
+дольше SERVER_GRACEFUL_TIMEOUT) и закрывают пулы.
+
+Метрики Prometheus при нескольких воркерах пишутся в файлы общего каталога
+(PROMETHEUS_MULTIPROC_DIR, по умолчанию - временный каталог) и суммируются при
+запросе /metrics любым воркером.
+
+Количество соединений с БД: воркеры * (DB_POOL_SIZE + DB_MAX_OVERFLOW) на каждую
+БД должно помещаться в max_connections.
+
+Пример запуска:
+    SERVER_WORKERS=4 python -m app.server
+"""
+import os
+import tempfile
+from glob import glob
+from importlib.util import find_spec
+from typing import Any, Dict, Optional
+
+import uvicorn
+from loguru import logger
+
+from app.config import (
+    PROMETHEUS_MULTIPROC_DIR,
+    SERVER_ACCESS_LOG,
+    SERVER_BACKLOG,
+    SERVER_FORWARDED_ALLOW_IPS,
+    SERVER_GRACEFUL_TIMEOUT,
+    SERVER_HOST,
+    SERVER_KEEPALIVE_TIMEOUT,
+    SERVER_PORT,
+    SERVER_WORKERS,
+)
+
+
+def available_cpus() -> int:
+    """
+    Количество ядер, доступных процессу (с учётом ограничений контейнера по cpuset)
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def worker_count(workers: int = SERVER_WORKERS) -> int:
+    """
+    Количество воркеров: заданное или по одному на ядро
+    :param workers: значение настройки (0 - по числу ядер)
+    """
+    return workers if workers > 0 else available_cpus()
+
+
+def prepare_metrics_dir(
+    workers: int = SERVER_WORKERS, path: str = PROMETHEUS_MULTIPROC_DIR
+) -> Optional[str]:
+    """
+    Каталог файлов метрик Prometheus для воркеров: создаётся (при нескольких
+    воркерах и незаданном каталоге - временный), файлы прошлого запуска удаляются.
+    Воркеры получают каталог через переменную окружения PROMETHEUS_MULTIPROC_DIR
+    :param workers: количество воркеров (0 - по числу ядер)
+    :param path: каталог из настроек
+    :return: каталог или None, если метрики собираются в памяти единственного воркера
+    """
+    if not path:
+        if worker_count(workers) == 1:
+            return None
+
+        path = tempfile.mkdtemp(prefix="naptwitter-metrics-")
+
+    os.makedirs(path, exist_ok=True)
+
+    for name in glob(os.path.join(path, "*.db")):
+        os.remove(name)
+
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = path
+
+    return path
+
+
+def server_options(workers: int = SERVER_WORKERS) -> Dict[str, Any]:
+    """
+    Параметры uvicorn.run для production-режима
+    :param workers: количество воркеров (0 - по числу ядер)
+    """
+    return dict(
+        host=SERVER_HOST,
+        port=SERVER_PORT,
+        factory=True,
+        workers=worker_count(workers),
+        loop="uvloop" if find_spec("uvloop") else "asyncio",
+        http="httptools" if find_spec("httptools") else "h11",
+        backlog=SERVER_BACKLOG,
+        timeout_keep_alive=SERVER_KEEPALIVE_TIMEOUT,
+        timeout_graceful_shutdown=SERVER_GRACEFUL_TIMEOUT,
+        access_log=SERVER_ACCESS_LOG,
+        proxy_headers=True,
+        forwarded_allow_ips=SERVER_FORWARDED_ALLOW_IPS,
+    )
+
+
+def main() -> None:
+    options = server_options()
+    prepare_metrics_dir(options["workers"])
+    logger.info(
+        "Запуск сервера: воркеров {workers}, цикл событий {loop}, HTTP {http}", **options
+    )
+    uvicorn.run("app.main:create_app", **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Показатели ранжированной ленты: скорость набора лайков твитами и близость
+пользователей к авторам.
+
+Показатели обновляются при каждом лайке (EngagementService.record_like).
+Близость по лайкам, поставленным до появления показателей, заполняется вручную
+(один раз после миграции c17d2e8b5f63):
+    python -m app.services.engagement --batch-size 50000
+"""
+import argparse
+import datetime
+import time
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import delete, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import FEED_RANK_AFFINITY_HALF_LIFE, FEED_RANK_VELOCITY_HALF_LIFE
+from app.database import get_sync_engine
+from app.models.engagement import TweetEngagement
+from app.utils.metrics import instrument_service
+
+# Обновление затухающих счётчиков: старое значение затухает на время,
+# прошедшее с прошлого обновления, и к нему прибавляется delta. Запись или
+# удаление самого лайка (CTE change) выполняется тем же запросом
+RECORD_ENGAGEMENT = """
+    WITH change AS (
+        {change}
+    ),
+    engagement AS (
+        INSERT INTO tweet_engagement AS e (tweet_id, velocity, updated_at)
+        VALUES (:tweet_id, GREATEST(:delta, 0), :now)
+        ON CONFLICT (tweet_id) DO UPDATE SET
+            velocity = GREATEST(
+                e.velocity * power(
+                    2, -GREATEST(date_part('epoch', excluded.updated_at - e.updated_at), 0)
+                    / :velocity_half_life
+                ) + :delta,
+                0
+            ),
+            updated_at = excluded.updated_at
+    )
+    INSERT INTO author_affinity AS a (user_id, author_id, score, updated_at)
+    VALUES (:user_id, :author_id, GREATEST(:delta, 0), :now)
+    ON CONFLICT (user_id, author_id) DO UPDATE SET
+        score = GREATEST(
+            a.score * power(
+                2, -GREATEST(date_part('epoch', excluded.updated_at - a.updated_at), 0)
+                / :affinity_half_life
+            ) + :delta,
+            0
+        ),
+        updated_at = excluded.updated_at
+"""
+LIKE_WITH_ENGAGEMENT = text(
+    RECORD_ENGAGEMENT.format(
+        change="INSERT INTO likes (user_id, tweets_id) VALUES (:user_id, :tweet_id)"
+    )
+)
+DISLIKE_WITH_ENGAGEMENT = text(
+    RECORD_ENGAGEMENT.format(
+        change="DELETE FROM likes WHERE tweets_id = :tweet_id AND user_id = :user_id"
+    )
+)
+
+# Близость по порции лайков (по id). Время лайка не хранится: вместо него
+# берётся время создания твита (большинство лайков ставится вскоре после публикации)
+BACKFILL_AFFINITY = text(
+    """
+    INSERT INTO author_affinity AS a (user_id, author_id, score, updated_at)
+    SELECT
+        l.user_id,
+        t.user_id,
+        sum(power(
+            2, -GREATEST(date_part('epoch', CAST(:now AS timestamp) - t.created_at), 0)
+            / :affinity_half_life
+        )),
+        :now
+    FROM likes l
+    JOIN tweets t ON t.id = l.tweets_id
+    WHERE l.id > :last_id AND l.id <= :upto_id
+    GROUP BY l.user_id, t.user_id
+    ON CONFLICT (user_id, author_id) DO UPDATE SET
+        score = a.score * power(
+            2, -GREATEST(date_part('epoch', excluded.updated_at - a.updated_at), 0)
+            / :affinity_half_life
+        ) + excluded.score,
+        updated_at = GREATEST(a.updated_at, excluded.updated_at)
+    """
+)
+
+
+@instrument_service
+class EngagementService:
+    """
+    Сервис для инкрементального обновления показателей ранжированной ленты:
+    скорости набора лайков твитами и близости пользователей к авторам
+    """
+
+    @classmethod
+    async def record_like(
+        cls, tweet_id: int, author_id: int, user_id: int, session: AsyncSession, delta: int = 1
+    ) -> None:
+        """
+        Запись лайка (delta=1) или его удаление (delta=-1) вместе с обновлением
+        показателей - одним запросом в транзакции сессии, без commit
+        :param tweet_id: id твита
+        :param author_id: id автора твита
+        :param user_id: id пользователя, поставившего лайк
+        :param session: объект асинхронной сессии
+        :param delta: изменение счётчиков
+        :return: None
+        """
+        await session.execute(
+            LIKE_WITH_ENGAGEMENT if delta > 0 else DISLIKE_WITH_ENGAGEMENT,
+            {
+                "tweet_id": tweet_id,
+                "author_id": author_id,
+                "user_id": user_id,
+                "delta": float(delta),
+                "now": datetime.datetime.utcnow(),
+                "velocity_half_life": FEED_RANK_VELOCITY_HALF_LIFE,
+                "affinity_half_life": FEED_RANK_AFFINITY_HALF_LIFE,
+            },
+        )
+
+    @classmethod
+    async def delete_tweet_engagement(cls, tweet_id: int, session: AsyncSession) -> None:
+        """
+        Удаление показателей твита (в транзакции сессии, без commit)
+        :param tweet_id: id твита
+        :param session: объект асинхронной сессии
+        :return: None
+        """
+        await session.execute(delete(TweetEngagement).where(TweetEngagement.tweet_id == tweet_id))
+
+    @classmethod
+    def backfill_affinity(
+        cls, engine: Engine, batch_size: int, after_id: int = 0, until_id: Optional[int] = None
+    ) -> int:
+        """
+        Заполнение близости к авторам по лайкам, поставленным до появления
+        показателей: лайки читаются порциями по возрастанию id, каждая порция
+        записывается одним запросом и фиксируется отдельной транзакцией.
+        Вклад лайка прибавляется к текущему значению, поэтому каждый лайк должен
+        учитываться один раз: лайки после until_id уже учтены record_like.
+        Скорость набора лайков не заполняется: за несколько часов она затухает.
+        :param engine: синхронный движок БД
+        :param batch_size: диапазон id лайков в порции
+        :param after_id: начать с лайков с id больше указанного (продолжение прерванного запуска)
+        :param until_id: последний id лайка до миграции (по умолчанию - наибольший id на момент запуска)
+        :return: количество обновлённых пар пользователь - автор
+        """
+        if until_id is None:
+            with engine.connect() as connection:
+                until_id = connection.execute(text("SELECT max(id) FROM likes")).scalar() or 0
+
+        now = datetime.datetime.utcnow()
+        last_id = after_id
+        updated = 0
+
+        while last_id < until_id:
+            started = time.perf_counter()
+            upto_id = min(last_id + batch_size, until_id)
+
+            with engine.begin() as connection:
+                result = connection.execute(
+                    BACKFILL_AFFINITY,
+                    {
+                        "last_id": last_id,
+                        "upto_id": upto_id,
+                        "now": now,
+                        "affinity_half_life": FEED_RANK_AFFINITY_HALF_LIFE,
+                    },
+                )
+
+            last_id = upto_id
+            updated += result.rowcount
+
+            logger.info(
+                f"Близость к авторам: обновлено пар {updated} (лайки до id {last_id} из {until_id}), "
+                f"{time.perf_counter() - started:.1f} с"
+            )
+
+        return updated
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Заполнение близости к авторам по лайкам")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    parser.add_argument("--after-id", type=int, default=0, help="Начать с лайков с id больше N")
+    parser.add_argument(
+        "--until-id", type=int, default=None,
+        help="Последний id лайка до миграции (по умолчанию - наибольший id)",
+    )
+    args = parser.parse_args()
+
+    EngagementService.backfill_affinity(
+        get_sync_engine(), batch_size=args.batch_size, after_id=args.after_id, until_id=args.until_id
+    )
+
+
+if __name__ == "__main__":
+    main()
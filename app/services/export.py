@@ -0,0 +1,138 @@
+"""
+Потоковая выгрузка данных пользователя (профиль, твиты, лайки) в NDJSON.
+
+Строки читаются из серверного курсора БД порциями по EXPORT_CHUNK_SIZE и сразу
+сериализуются, поэтому расход памяти не зависит от объёма данных аккаунта.
+
+Пример запуска:
+    python -m app.services.export --user-id 42 --out user-42.ndjson
+"""
+import argparse
+import asyncio
+import sys
+import time
+from typing import AsyncIterator, Dict
+
+import orjson
+from loguru import logger
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import EXPORT_CHUNK_SIZE
+from app.models.likes import Like
+from app.models.tweets import Tweet
+from app.models.users import User
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def encode_record(record_type: str, record: Dict) -> bytes:
+    """
+    Строка NDJSON: запись с полем type в начале
+    :param record_type: тип записи (user, tweet, like)
+    :param record: колонка -> значение
+    :return: строка с переводом строки в конце
+    """
+    return orjson.dumps({"type": record_type, **record}) + b"\n"
+
+
+class ExportService:
+    """
+    Сервис для выгрузки данных пользователя
+    """
+
+    @classmethod
+    async def iter_export(
+        cls, user: User, session: AsyncSession, chunk_size: int = EXPORT_CHUNK_SIZE
+    ) -> AsyncIterator[bytes]:
+        """
+        Выгрузка данных пользователя: первая строка - профиль, затем твиты
+        (по возрастанию даты) и лайки. Каждая порция строк из курсора отдаётся
+        одним блоком байт.
+        :param user: объект пользователя
+        :param session: объект асинхронной сессии (на время выгрузки держит соединение)
+        :param chunk_size: количество строк, читаемых из курсора за раз
+        :return: асинхронный генератор блоков NDJSON
+        """
+        logger.debug(f"Выгрузка данных пользователя: {user.id}")
+
+        yield encode_record(
+            "user",
+            {
+                "id": user.id,
+                "username": user.username,
+                "email": user.email,
+                "registered_at": user.registered_at,
+            },
+        )
+
+        queries = (
+            (
+                "tweet",
+                select(Tweet.id, Tweet.tweet_data, Tweet.created_at)
+                .where(Tweet.user_id == user.id)
+                .order_by(Tweet.created_at, Tweet.id),
+            ),
+            (
+                "like",
+                select(Like.id, Like.tweets_id)
+                .where(Like.user_id == user.id)
+                .order_by(Like.id),
+            ),
+        )
+
+        for record_type, query in queries:
+            result = await session.stream(query.execution_options(yield_per=chunk_size))
+
+            async for rows in result.mappings().partitions():
+                yield b"".join(encode_record(record_type, row) for row in rows)
+
+
+async def export_to_file(user_id: int, out, chunk_size: int) -> int:
+    """
+    Выгрузка данных пользователя в файл
+    :param user_id: id пользователя
+    :param out: бинарный файл для записи
+    :param chunk_size: количество строк, читаемых из курсора за раз
+    :return: количество записанных байт
+    """
+    from app.database import async_session_maker
+    from app.services.user import UserService
+
+    written = 0
+
+    async with async_session_maker() as session:
+        user = await UserService.get_user_for_id(user_id=user_id, session=session)
+
+        if user is None:
+            raise SystemExit(f"Пользователь {user_id} не найден")
+
+        async for chunk in ExportService.iter_export(
+            user=user, session=session, chunk_size=chunk_size
+        ):
+            out.write(chunk)
+            written += len(chunk)
+
+    return written
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Выгрузка данных пользователя в NDJSON")
+    parser.add_argument("--user-id", type=int, required=True)
+    parser.add_argument("--out", help="Файл для выгрузки (по умолчанию - stdout)")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+
+    if args.out:
+        with open(args.out, "wb") as out:
+            written = asyncio.run(export_to_file(args.user_id, out, args.chunk_size))
+    else:
+        written = asyncio.run(export_to_file(args.user_id, sys.stdout.buffer, args.chunk_size))
+
+    logger.info(f"Выгружено {written} байт за {time.perf_counter() - started:.1f} с")
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,10 @@ from loguru import logger
 from app.models.users import User
 from app.services.user import UserService
 from app.utils.exeptions import CustomApiException
+from app.utils.metrics import instrument_service
 
 
+@instrument_service
 class FollowerService:
     """
     Сервис для оформления и удаления подписки между пользователями
@@ -25,7 +27,7 @@ class FollowerService:
         :return: None
         """
         logger.debug(
-            f"Запрос подписки пользователя id: {current_user.id} на id: {following_user_id} "
+            "Запрос подписки пользователя id: {} на id: {}", current_user.id, following_user_id
         )
 
         # Проверка, что текущий пользователь не подписывается сам на себя
@@ -46,7 +48,7 @@ class FollowerService:
 
         if not following_user:
             logger.error(
-                f"Не найден пользователь для подписки (id: {following_user_id})"
+                "Не найден пользователь для подписки (id: {})", following_user_id
             )
 
             raise CustomApiException(
@@ -57,7 +59,7 @@ class FollowerService:
         if await cls.check_follower(
             current_user=current_user, following_user_id=following_user.id
         ):
-            logger.warning(f"Подписка уже оформлена")
+            logger.warning("Подписка уже оформлена")
 
             raise CustomApiException(
                 status_code=HTTPStatus.LOCKED,  # 423
@@ -72,8 +74,9 @@ class FollowerService:
         # Добавляем подписку текущему пользователю
         current_user_db.following.append(following_user)
         await session.commit()
+        await UserService.invalidate_profiles(current_user.id, following_user.id)
 
-        logger.info(f"Подписка оформлена")
+        logger.info("Подписка оформлена")
 
     @classmethod
     async def check_follower(cls, current_user: User, following_user_id: int) -> bool:
@@ -100,7 +103,9 @@ class FollowerService:
         :return: None
         """
         logger.debug(
-            f"Запрос удаления подписки пользователя id: {current_user.id} от id: {followed_user_id}"
+            "Запрос удаления подписки пользователя id: {} от id: {}",
+            current_user.id,
+            followed_user_id,
         )
 
         # Проверка, что текущий пользователь не отписывается от самого себя
@@ -121,7 +126,7 @@ class FollowerService:
 
         if not followed_user:
             logger.error(
-                f"Не найден пользователь для отмены подписки (id: {followed_user})"
+                "Не найден пользователь для отмены подписки (id: {})", followed_user_id
             )
 
             raise CustomApiException(
@@ -132,7 +137,7 @@ class FollowerService:
         if not await cls.check_follower(
             current_user=current_user, following_user_id=followed_user.id
         ):
-            logger.warning(f"Подписка не обнаружена")
+            logger.warning("Подписка не обнаружена")
 
             raise CustomApiException(
                 status_code=HTTPStatus.LOCKED,  # 423
@@ -147,5 +152,6 @@ class FollowerService:
         # Удаляем подписку текущему пользователю
         current_user_db.following.remove(followed_user)
         await session.commit()
+        await UserService.invalidate_profiles(current_user.id, followed_user.id)
 
-        logger.info(f"Подписка удалена")
\ No newline at end of file
+        logger.info("Подписка удалена")
\ No newline at end of file
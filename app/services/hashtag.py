@@ -0,0 +1,184 @@
+"""
+Хэштеги и упоминания пользователей в твитах.
+
+Новые твиты разбираются при публикации (TweetsService.create_tweet), уже
+существующие (например, загруженные импортом) - заполнением индекса вручную:
+    python -m app.services.hashtag --batch-size 10000
+"""
+import argparse
+import time
+from typing import List
+
+from loguru import logger
+from sqlalchemy import delete, literal, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_sync_engine
+from app.models.hashtags import Hashtag, Mention, TweetHashtag
+from app.models.tweets import Tweet
+from app.models.users import User
+from app.utils.hashtags import extract_hashtags, extract_mentions
+from app.utils.metrics import instrument_service
+
+BACKFILL_HASHTAGS = text(
+    "INSERT INTO hashtags (tag) SELECT DISTINCT unnest(CAST(:tags AS text[])) "
+    "ON CONFLICT DO NOTHING"
+)
+BACKFILL_TWEET_HASHTAGS = text(
+    "INSERT INTO tweet_hashtags (hashtag_id, tweet_id, created_at) "
+    "SELECT h.id, e.tweet_id, e.created_at "
+    "FROM unnest(CAST(:tags AS text[]), CAST(:tweet_ids AS integer[]), "
+    "            CAST(:created_at AS timestamp[])) e (tag, tweet_id, created_at) "
+    "JOIN hashtags h ON h.tag = e.tag "
+    "ON CONFLICT DO NOTHING"
+)
+BACKFILL_MENTIONS = text(
+    "INSERT INTO mentions (user_id, tweet_id, created_at) "
+    "SELECT u.id, e.tweet_id, e.created_at "
+    "FROM unnest(CAST(:names AS text[]), CAST(:tweet_ids AS integer[]), "
+    "            CAST(:created_at AS timestamp[])) e (name, tweet_id, created_at) "
+    'JOIN "user" u ON u.username = e.name '
+    "ON CONFLICT DO NOTHING"
+)
+
+
+@instrument_service
+class HashtagService:
+    """
+    Сервис для заполнения обратных индексов хэштегов и упоминаний
+    """
+
+    @classmethod
+    async def save_tweet_entities(cls, tweet: Tweet, session: AsyncSession) -> List[str]:
+        """
+        Сохранение хэштегов и упоминаний твита (в транзакции сессии, без commit).
+        Упоминания несуществующих пользователей пропускаются.
+        :param tweet: объект сохранённого твита (с id и created_at)
+        :param session: объект асинхронной сессии
+        :return: хэштеги твита
+        """
+        tags = extract_hashtags(tweet.tweet_data)
+        names = extract_mentions(tweet.tweet_data)
+
+        if tags:
+            # Сортировка задаёт одинаковый порядок блокировок для параллельных вставок
+            await session.execute(
+                insert(Hashtag).values([{"tag": tag} for tag in sorted(tags)]).on_conflict_do_nothing()
+            )
+            await session.execute(
+                insert(TweetHashtag).from_select(
+                    ["hashtag_id", "tweet_id", "created_at"],
+                    select(Hashtag.id, literal(tweet.id), literal(tweet.created_at))
+                    .where(Hashtag.tag.in_(tags)),
+                )
+            )
+
+        if names:
+            await session.execute(
+                insert(Mention).from_select(
+                    ["user_id", "tweet_id", "created_at"],
+                    select(User.id, literal(tweet.id), literal(tweet.created_at))
+                    .where(User.username.in_(names)),
+                )
+            )
+
+        return tags
+
+    @classmethod
+    async def delete_tweet_entities(cls, tweet_id: int, session: AsyncSession) -> None:
+        """
+        Удаление хэштегов и упоминаний твита (в транзакции сессии, без commit)
+        :param tweet_id: id твита
+        :param session: объект асинхронной сессии
+        :return: None
+        """
+        await session.execute(delete(TweetHashtag).where(TweetHashtag.tweet_id == tweet_id))
+        await session.execute(delete(Mention).where(Mention.tweet_id == tweet_id))
+
+    @classmethod
+    def backfill(cls, engine: Engine, batch_size: int, after_id: int = 0) -> int:
+        """
+        Заполнение индексов для существующих твитов: твиты читаются порциями
+        по возрастанию id, каждая порция записывается тремя запросами и
+        фиксируется отдельной транзакцией. Повторный запуск безопасен.
+        :param engine: синхронный движок БД
+        :param batch_size: количество твитов в порции
+        :param after_id: начать с твитов с id больше указанного (продолжение прерванного запуска)
+        :return: количество обработанных твитов
+        """
+        last_id = after_id
+        processed = 0
+
+        while True:
+            started = time.perf_counter()
+
+            with engine.begin() as connection:
+                rows = connection.execute(
+                    text(
+                        "SELECT id, created_at, tweet_data FROM tweets "
+                        "WHERE id > :last_id ORDER BY id LIMIT :batch_size"
+                    ),
+                    {"last_id": last_id, "batch_size": batch_size},
+                ).all()
+
+                if not rows:
+                    break
+
+                hashtags = cls._collect(rows, extract_hashtags)
+                mentions = cls._collect(rows, extract_mentions)
+
+                if hashtags[0]:
+                    connection.execute(BACKFILL_HASHTAGS, {"tags": hashtags[0]})
+                    connection.execute(
+                        BACKFILL_TWEET_HASHTAGS,
+                        {"tags": hashtags[0], "tweet_ids": hashtags[1], "created_at": hashtags[2]},
+                    )
+
+                if mentions[0]:
+                    connection.execute(
+                        BACKFILL_MENTIONS,
+                        {"names": mentions[0], "tweet_ids": mentions[1], "created_at": mentions[2]},
+                    )
+
+            last_id = rows[-1].id
+            processed += len(rows)
+
+            logger.info(
+                f"Хэштеги и упоминания: обработано твитов {processed} (до id {last_id}), "
+                f"{time.perf_counter() - started:.1f} с"
+            )
+
+        return processed
+
+    @classmethod
+    def _collect(cls, rows, extract) -> tuple[List[str], List[int], List]:
+        """
+        Значения из текстов твитов порции в виде колонок для unnest
+        :param rows: строки (id, created_at, tweet_data)
+        :param extract: функция извлечения (extract_hashtags / extract_mentions)
+        :return: значения, id твитов, даты создания твитов
+        """
+        values, tweet_ids, created_at = [], [], []
+
+        for tweet_id, created, data in rows:
+            for value in extract(data):
+                values.append(value)
+                tweet_ids.append(tweet_id)
+                created_at.append(created)
+
+        return values, tweet_ids, created_at
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Заполнение индексов хэштегов и упоминаний")
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--after-id", type=int, default=0, help="Начать с твитов с id больше N")
+    args = parser.parse_args()
+
+    HashtagService.backfill(get_sync_engine(), batch_size=args.batch_size, after_id=args.after_id)
+
+
+if __name__ == "__main__":
+    main()
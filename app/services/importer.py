@@ -0,0 +1,417 @@
+"""
+Массовый импорт пользователей, твитов, лайков и подписок через COPY.
+
+Пример запуска:
+    python -m app.services.importer --users users.csv --tweets tweets.ndjson \
+        --likes likes.csv --follows follows.csv --batch-size 50000
+"""
+import argparse
+import asyncio
+import csv
+import datetime
+import json
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Tuple
+
+import asyncpg
+from loguru import logger
+
+from app.database import DATABASE_URL
+
+# Признак колонки, которую нужно заполнить значением по умолчанию из БД (sequence),
+# если её нет во входном файле
+DB_DEFAULT = object()
+# Признак обязательной колонки
+REQUIRED = object()
+# Таблицы с триггером счётчика изменений контента (см. app.models.versions):
+# на время загрузки триггер отключается, счётчики увеличиваются после неё
+VERSIONED_TABLES = ("tweets", "likes")
+
+
+def parse_bool(value: Any) -> bool:
+    """
+    Приведение значения из CSV / NDJSON к bool
+    """
+    if isinstance(value, bool):
+        return value
+
+    return str(value).strip().lower() in ("1", "true", "t", "yes", "y")
+
+
+def parse_datetime(value: Any) -> datetime.datetime:
+    """
+    Приведение значения из CSV / NDJSON к datetime (ISO 8601 или unix timestamp)
+    """
+    if isinstance(value, datetime.datetime):
+        return value
+
+    if isinstance(value, (int, float)):
+        return datetime.datetime.utcfromtimestamp(value)
+
+    return datetime.datetime.fromisoformat(str(value))
+
+
+# Описание колонок импортируемых таблиц: колонка -> (конвертер, значение по умолчанию).
+# Порядок таблиц соответствует порядку загрузки.
+TABLES: Dict[str, Dict[str, Tuple[Callable, Any]]] = {
+    "user": {
+        "id": (int, DB_DEFAULT),
+        "username": (str, REQUIRED),
+        "email": (str, REQUIRED),
+        "registered_at": (parse_datetime, datetime.datetime.utcnow),
+        # Пользователи без пароля не смогут войти, пока не сбросят пароль
+        "hashed_password": (str, lambda: "!"),
+        "email_code": (str, lambda: "empty"),
+        "is_active": (parse_bool, lambda: True),
+        "is_superuser": (parse_bool, lambda: False),
+        "is_verified": (parse_bool, lambda: False),
+        "api_key": (str, lambda: None),
+    },
+    "tweets": {
+        "id": (int, DB_DEFAULT),
+        "tweet_data": (str, REQUIRED),
+        "created_at": (parse_datetime, datetime.datetime.utcnow),
+        "user_id": (int, REQUIRED),
+    },
+    "likes": {
+        "id": (int, DB_DEFAULT),
+        "user_id": (int, REQUIRED),
+        "tweets_id": (int, REQUIRED),
+    },
+    "user_to_user": {
+        "followers_id": (int, REQUIRED),
+        "following_id": (int, REQUIRED),
+    },
+}
+
+
+def read_records(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Потоковое чтение записей из CSV (с заголовком) или NDJSON
+    :param path: путь к файлу
+    :return: генератор словарей колонка -> значение
+    """
+    with path.open(encoding="utf-8", newline="") as file:
+        if path.suffix.lower() in (".ndjson", ".jsonl", ".json"):
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(file)
+
+
+def resolve_columns(table: str, first_record: Dict[str, Any]) -> List[str]:
+    """
+    Определение списка загружаемых колонок по первой записи файла
+    :param table: название таблицы
+    :param first_record: первая запись из файла
+    :return: список колонок для COPY
+    """
+    spec = TABLES[table]
+    unknown = set(first_record) - set(spec)
+
+    if unknown:
+        raise ValueError(f"Неизвестные колонки для таблицы {table}: {sorted(unknown)}")
+
+    columns = []
+
+    for column, (_, default) in spec.items():
+        if column in first_record:
+            columns.append(column)
+        elif default is REQUIRED:
+            raise ValueError(f"Нет обязательной колонки {column} для таблицы {table}")
+        elif default is not DB_DEFAULT:
+            columns.append(column)
+
+    return columns
+
+
+def prepare_record(table: str, columns: List[str], record: Dict[str, Any]) -> tuple:
+    """
+    Приведение записи из файла к кортежу для copy_records_to_table
+    :param table: название таблицы
+    :param columns: список загружаемых колонок
+    :param record: запись из файла
+    :return: кортеж значений в порядке колонок
+    """
+    spec = TABLES[table]
+    values = []
+
+    for column in columns:
+        converter, default = spec[column]
+        value = record.get(column)
+
+        if value is not None and value != "":
+            values.append(converter(value))
+        elif default is REQUIRED or default is DB_DEFAULT:
+            raise ValueError(f"Пустое значение колонки {column} в таблице {table}")
+        else:
+            values.append(default())
+
+    return tuple(values)
+
+
+def batched(records: Iterator[tuple], size: int) -> Iterator[List[tuple]]:
+    """
+    Разбиение потока записей на пачки фиксированного размера
+    """
+    batch = []
+
+    for record in records:
+        batch.append(record)
+
+        if len(batch) >= size:
+            yield batch
+            batch = []
+
+    if batch:
+        yield batch
+
+
+def chain_first(first: Dict[str, Any], rest: Iterator[Dict[str, Any]]) -> Iterator:
+    """
+    Возврат первой прочитанной записи обратно в поток
+    """
+    yield first
+    yield from rest
+
+
+def quote_ident(name: str) -> str:
+    """
+    Экранирование идентификатора для подстановки в DDL
+    """
+    return '"' + name.replace('"', '""') + '"'
+
+
+class ImportService:
+    """
+    Сервис для массовой загрузки данных в БД через COPY
+    """
+
+    @classmethod
+    async def drop_indexes(
+        cls, conn: asyncpg.Connection, tables: List[str]
+    ) -> List[str]:
+        """
+        Удаление вторичных индексов (не связанных с ограничениями) перед загрузкой
+        :param conn: соединение asyncpg
+        :param tables: список таблиц
+        :return: список DDL для восстановления индексов
+        """
+        rows = await conn.fetch(
+            """
+            SELECT i.indexrelid::regclass::text AS name,
+                   pg_get_indexdef(i.indexrelid) AS definition
+            FROM pg_index i
+            JOIN pg_class t ON t.oid = i.indrelid
+            JOIN pg_namespace n ON n.oid = t.relnamespace
+            WHERE t.relname = ANY($1::text[])
+              AND n.nspname = current_schema()
+              AND NOT EXISTS (
+                  SELECT 1 FROM pg_constraint c WHERE c.conindid = i.indexrelid
+              )
+              AND NOT i.indisprimary
+            """,
+            tables,
+        )
+
+        for row in rows:
+            logger.debug(f"Удаление индекса {row['name']} на время загрузки")
+            await conn.execute(f"DROP INDEX {row['name']}")
+
+        # Для секционированных таблиц pg_get_indexdef возвращает "ON ONLY", а при
+        # восстановлении индекс должен создаваться и на всех секциях
+        return [row["definition"].replace(" ON ONLY ", " ON ") for row in rows]
+
+    @classmethod
+    async def drop_foreign_keys(
+        cls, conn: asyncpg.Connection, tables: List[str]
+    ) -> List[str]:
+        """
+        Удаление внешних ключей импортируемых таблиц перед загрузкой
+        :param conn: соединение asyncpg
+        :param tables: список таблиц
+        :return: список DDL для восстановления внешних ключей
+        """
+        rows = await conn.fetch(
+            """
+            SELECT c.conname AS name,
+                   t.relname AS table_name,
+                   pg_get_constraintdef(c.oid) AS definition
+            FROM pg_constraint c
+            JOIN pg_class t ON t.oid = c.conrelid
+            JOIN pg_namespace n ON n.oid = t.relnamespace
+            WHERE c.contype = 'f'
+              AND c.conparentid = 0
+              AND t.relname = ANY($1::text[])
+              AND n.nspname = current_schema()
+            """,
+            tables,
+        )
+        restore = []
+
+        for row in rows:
+            table, name = quote_ident(row["table_name"]), quote_ident(row["name"])
+            logger.debug(f"Удаление внешнего ключа {row['name']} на время загрузки")
+
+            await conn.execute(f"ALTER TABLE {table} DROP CONSTRAINT {name}")
+            restore.append(
+                f"ALTER TABLE {table} ADD CONSTRAINT {name} {row['definition']}"
+            )
+
+        return restore
+
+    @classmethod
+    async def copy_file(
+        cls, conn: asyncpg.Connection, table: str, path: Path, batch_size: int
+    ) -> int:
+        """
+        Загрузка одного файла в таблицу пачками через COPY с выводом прогресса
+        :param conn: соединение asyncpg
+        :param table: название таблицы
+        :param path: путь к CSV / NDJSON файлу
+        :param batch_size: размер пачки записей
+        :return: количество загруженных строк
+        """
+        records = read_records(path)
+        first = next(records, None)
+
+        if first is None:
+            logger.warning(f"Файл {path} пуст, таблица {table} пропущена")
+            return 0
+
+        columns = resolve_columns(table, first)
+        prepared = (
+            prepare_record(table, columns, record)
+            for record in chain_first(first, records)
+        )
+
+        total = 0
+        started = time.perf_counter()
+
+        for batch in batched(prepared, batch_size):
+            await conn.copy_records_to_table(table, records=batch, columns=columns)
+            total += len(batch)
+
+            elapsed = time.perf_counter() - started
+            logger.info(
+                f"{table}: загружено {total} строк ({total / elapsed:.0f} строк/с)"
+            )
+
+        return total
+
+    @classmethod
+    async def rebuild(cls, conn: asyncpg.Connection, tables: List[str]) -> None:
+        """
+        Пересчёт зависимых данных после загрузки: сдвиг последовательностей
+        на максимальный id, счётчики изменений контента (для ETag ленты)
+        и обновление статистики планировщика
+        :param conn: соединение asyncpg
+        :param tables: список загруженных таблиц
+        :return: None
+        """
+        for table in tables:
+            if "id" in TABLES[table]:
+                logger.debug(f"Обновление последовательности для {table}")
+
+                await conn.execute(
+                    f"SELECT setval(pg_get_serial_sequence($1, 'id'), "
+                    f"coalesce(max(id), 0) + 1, false) FROM {quote_ident(table)}",
+                    quote_ident(table),
+                )
+
+        if any(table in VERSIONED_TABLES for table in tables):
+            logger.debug("Обновление счётчиков изменений контента")
+
+            await conn.execute(
+                'INSERT INTO content_versions (user_id, version) SELECT id, 1 FROM "user" '
+                "ON CONFLICT (user_id) DO UPDATE SET version = content_versions.version + 1"
+            )
+
+        for table in tables:
+            await conn.execute(f"ANALYZE {quote_ident(table)}")
+
+    @classmethod
+    async def run(cls, files: Dict[str, Path], batch_size: int = 10000) -> Dict[str, int]:
+        """
+        Импорт набора файлов в одной транзакции: индексы и внешние ключи снимаются
+        на время загрузки и восстанавливаются (с проверкой данных) в конце
+        :param files: словарь таблица -> путь к файлу
+        :param batch_size: размер пачки записей для COPY
+        :return: словарь таблица -> количество загруженных строк
+        """
+        tables = [table for table in TABLES if table in files]
+        conn = await asyncpg.connect(DATABASE_URL.replace("+asyncpg", ""))
+        loaded = {}
+
+        try:
+            async with conn.transaction():
+                indexes = await cls.drop_indexes(conn, tables)
+                foreign_keys = await cls.drop_foreign_keys(conn, tables)
+                versioned = [table for table in tables if table in VERSIONED_TABLES]
+
+                for table in versioned:
+                    await conn.execute(
+                        f"ALTER TABLE {quote_ident(table)} DISABLE TRIGGER bump_content_version"
+                    )
+
+                for table in tables:
+                    loaded[table] = await cls.copy_file(
+                        conn, table, files[table], batch_size
+                    )
+
+                for table in versioned:
+                    await conn.execute(
+                        f"ALTER TABLE {quote_ident(table)} ENABLE TRIGGER bump_content_version"
+                    )
+
+                started = time.perf_counter()
+                logger.info("Восстановление индексов и внешних ключей")
+
+                for ddl in indexes + foreign_keys:
+                    await conn.execute(ddl)
+
+                logger.info(
+                    f"Индексы и внешние ключи восстановлены за "
+                    f"{time.perf_counter() - started:.1f} с"
+                )
+
+                await cls.rebuild(conn, tables)
+        finally:
+            await conn.close()
+
+        return loaded
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Массовый импорт данных через COPY")
+    parser.add_argument("--users", type=Path, help="CSV / NDJSON с пользователями")
+    parser.add_argument("--tweets", type=Path, help="CSV / NDJSON с твитами")
+    parser.add_argument("--likes", type=Path, help="CSV / NDJSON с лайками")
+    parser.add_argument("--follows", type=Path, help="CSV / NDJSON с подписками")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+
+    files = {
+        table: path
+        for table, path in (
+            ("user", args.users),
+            ("tweets", args.tweets),
+            ("likes", args.likes),
+            ("user_to_user", args.follows),
+        )
+        if path is not None
+    }
+
+    if not files:
+        parser.error("Не указан ни один файл для импорта")
+
+    loaded = asyncio.run(ImportService.run(files=files, batch_size=args.batch_size))
+
+    for table, rows in loaded.items():
+        logger.info(f"{table}: всего {rows} строк")
+
+
+if __name__ == "__main__":
+    main()
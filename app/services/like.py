@@ -4,10 +4,14 @@ from http import HTTPStatus
 from loguru import logger
 
 from app.models.likes import Like
+from app.services.engagement import EngagementService
 from app.services.tweet import TweetsService
 from app.utils.exeptions import CustomApiException
+from app.utils.metrics import instrument_service
+from app.utils.trends import trend_tracker
 
 
+@instrument_service
 class LikeService:
     """
     Сервис для проставления лайков и дизлайков твитам
@@ -22,10 +26,10 @@ class LikeService:
         :param session: объект асинхронной сессии
         :return: None
         """
-        logger.debug(f"Лайк твита №{tweet_id}")
+        logger.debug("Лайк твита №{}", tweet_id)
 
         # Поиск твита по id
-        tweet = await TweetsService.get_tweet(tweet_id=tweet_id, session=session)
+        tweet = await TweetsService.get_tweet_meta(tweet_id=tweet_id, session=session)
 
         if not tweet:
             logger.error("Твит не найден")
@@ -44,10 +48,11 @@ class LikeService:
                 detail="The user has already liked this tweet",
             )
 
-        like_record = Like(user_id=user_id, tweets_id=tweet.id)
-
-        session.add(like_record)
+        await EngagementService.record_like(
+            tweet_id=tweet_id, author_id=tweet.author_id, user_id=user_id, session=session
+        )
         await session.commit()
+        trend_tracker.record("tweets", [str(tweet_id)])
 
     @classmethod
     async def check_like_tweet(
@@ -76,9 +81,9 @@ class LikeService:
         :param session: объект асинхронной сессии
         :return: None
         """
-        logger.debug(f"Дизлайк твита №{tweet_id}")
+        logger.debug("Дизлайк твита №{}", tweet_id)
 
-        tweet = await TweetsService.get_tweet(tweet_id=tweet_id, session=session)
+        tweet = await TweetsService.get_tweet_meta(tweet_id=tweet_id, session=session)
 
         if not tweet:
             logger.error("Твит не найден")
@@ -99,6 +104,8 @@ class LikeService:
                 detail="The user has not yet liked this tweet",
             )
 
-        await session.delete(like_record)
+        await EngagementService.record_like(
+            tweet_id=tweet_id, author_id=tweet.author_id, user_id=user_id, session=session, delta=-1
+        )
 
         await session.commit()
\ No newline at end of file
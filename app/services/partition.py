@@ -0,0 +1,208 @@
+"""
+Обслуживание помесячных секций таблицы tweets.
+
+Запускается периодически задачей Celery (maintain_tweet_partitions) или вручную:
+    python -m app.services.partition --ahead 3 --archive-after 24
+"""
+import argparse
+import datetime
+import re
+from typing import List
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.config import (
+    TWEETS_ARCHIVE_SCHEMA,
+    TWEETS_PARTITIONS_AHEAD,
+    TWEETS_ARCHIVE_AFTER_MONTHS,
+)
+from app.database import get_sync_engine
+
+PARTITION_NAME = re.compile(r"^tweets_p(\d{4})_(\d{2})$")
+
+
+def month_start(value: datetime.datetime | datetime.date) -> datetime.date:
+    """
+    Первое число месяца для переданной даты
+    """
+    return datetime.date(value.year, value.month, 1)
+
+
+def add_months(value: datetime.date, months: int) -> datetime.date:
+    """
+    Сдвиг первого числа месяца на указанное количество месяцев
+    """
+    index = value.year * 12 + value.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: datetime.date) -> str:
+    """
+    Название секции для месяца, например tweets_p2024_11
+    """
+    return f"tweets_p{month:%Y_%m}"
+
+
+class TweetPartitionService:
+    """
+    Сервис для создания и архивации помесячных секций таблицы твитов
+    """
+
+    @classmethod
+    def get_partitions(cls, connection: Connection) -> List[datetime.date]:
+        """
+        Список месяцев, для которых существуют секции
+        :param connection: синхронное соединение с БД
+        :return: отсортированный список первых чисел месяцев
+        """
+        rows = connection.execute(
+            text(
+                "SELECT c.relname FROM pg_inherits i "
+                "JOIN pg_class c ON c.oid = i.inhrelid "
+                "WHERE i.inhparent = 'tweets'::regclass"
+            )
+        ).scalars()
+
+        months = []
+
+        for name in rows:
+            match = PARTITION_NAME.match(name)
+
+            if match:
+                months.append(datetime.date(int(match[1]), int(match[2]), 1))
+
+        return sorted(months)
+
+    @classmethod
+    def create_partition(cls, connection: Connection, month: datetime.date) -> None:
+        """
+        Создание секции за месяц. Если в секции по умолчанию уже есть строки
+        за этот месяц, они переносятся в новую секцию.
+        :param connection: синхронное соединение с БД
+        :param month: первое число месяца
+        :return: None
+        """
+        name = partition_name(month)
+        bounds = {"start": month, "end": add_months(month, 1)}
+        bounds_sql = f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+        # Небольшие пороги autovacuum: секции маленькие, и очистка должна
+        # срабатывать раньше, чем на одной большой таблице
+        storage = (
+            "WITH (autovacuum_vacuum_scale_factor = 0.02, "
+            "autovacuum_analyze_scale_factor = 0.01)"
+        )
+
+        has_default_rows = connection.execute(
+            text(
+                "SELECT EXISTS (SELECT 1 FROM tweets_default "
+                "WHERE created_at >= :start AND created_at < :end)"
+            ),
+            bounds,
+        ).scalar()
+
+        if not has_default_rows:
+            connection.execute(
+                text(f"CREATE TABLE {name} PARTITION OF tweets {bounds_sql} {storage}")
+            )
+        else:
+            logger.warning(f"Перенос строк из tweets_default в новую секцию {name}")
+
+            connection.execute(
+                text(
+                    f"CREATE TABLE {name} (LIKE tweets INCLUDING DEFAULTS INCLUDING GENERATED) "
+                    f"{storage}"
+                )
+            )
+            connection.execute(
+                text(
+                    f"WITH moved AS (DELETE FROM tweets_default "
+                    f"WHERE created_at >= :start AND created_at < :end RETURNING *) "
+                    f"INSERT INTO {name} (id, tweet_data, created_at, user_id) "
+                    f"SELECT id, tweet_data, created_at, user_id FROM moved"
+                ),
+                bounds,
+            )
+            connection.execute(text(f"ALTER TABLE tweets ATTACH PARTITION {name} {bounds_sql}"))
+
+        logger.info(f"Создана секция {name}")
+
+    @classmethod
+    def ensure_partitions(
+        cls, connection: Connection, months_ahead: int, today: datetime.date | None = None
+    ) -> List[str]:
+        """
+        Создание недостающих секций с текущего месяца на months_ahead месяцев вперёд
+        :param connection: синхронное соединение с БД
+        :param months_ahead: количество месяцев вперёд
+        :param today: текущая дата (для тестов)
+        :return: список созданных секций
+        """
+        current = month_start(today or datetime.datetime.utcnow())
+        existing = set(cls.get_partitions(connection))
+        created = []
+
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+
+            if month not in existing:
+                cls.create_partition(connection, month)
+                created.append(partition_name(month))
+
+        return created
+
+    @classmethod
+    def archive_partitions(
+        cls, connection: Connection, keep_months: int, today: datetime.date | None = None
+    ) -> List[str]:
+        """
+        Отсоединение секций старше keep_months месяцев и перенос их в архивную схему.
+        Отсоединённые секции не участвуют в запросах к tweets и в обслуживании таблицы.
+        :param connection: синхронное соединение с БД
+        :param keep_months: количество последних месяцев, которые остаются в таблице
+        :param today: текущая дата (для тестов)
+        :return: список архивированных секций
+        """
+        threshold = add_months(month_start(today or datetime.datetime.utcnow()), -keep_months)
+        archived = []
+
+        connection.execute(text(f"CREATE SCHEMA IF NOT EXISTS {TWEETS_ARCHIVE_SCHEMA}"))
+
+        for month in cls.get_partitions(connection):
+            if month >= threshold:
+                continue
+
+            name = partition_name(month)
+
+            connection.execute(text(f"ALTER TABLE tweets DETACH PARTITION {name}"))
+            connection.execute(text(f"ALTER TABLE {name} SET SCHEMA {TWEETS_ARCHIVE_SCHEMA}"))
+            archived.append(name)
+
+            logger.info(f"Секция {name} перенесена в схему {TWEETS_ARCHIVE_SCHEMA}")
+
+        return archived
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Обслуживание секций таблицы tweets")
+    parser.add_argument("--ahead", type=int, default=TWEETS_PARTITIONS_AHEAD)
+    parser.add_argument(
+        "--archive-after",
+        type=int,
+        default=TWEETS_ARCHIVE_AFTER_MONTHS,
+        help="Архивировать секции старше N месяцев (0 - не архивировать)",
+    )
+    args = parser.parse_args()
+
+    with get_sync_engine().begin() as connection:
+        TweetPartitionService.ensure_partitions(connection, months_ahead=args.ahead)
+
+        if args.archive_after:
+            TweetPartitionService.archive_partitions(
+                connection, keep_months=args.archive_after
+            )
+
+
+if __name__ == "__main__":
+    main()
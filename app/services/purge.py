@@ -0,0 +1,82 @@
+"""
+Очистка удалённых твитов: лайки удаляются пачками по TWEET_PURGE_BATCH_SIZE,
+каждая пачка - отдельной короткой транзакцией, поэтому удаление твита
+с сотнями тысяч лайков не держит блокировки и не занимает соединение надолго.
+
+Запускается периодически задачей Celery (purge_deleted_tweets) или вручную:
+    python -m app.services.purge --batch-size 5000
+"""
+import argparse
+import time
+
+from loguru import logger
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+
+from app.config import TWEET_PURGE_BATCH_SIZE
+from app.database import get_sync_engine
+
+# Твит из очереди; SKIP LOCKED - параллельные запуски очищают разные твиты
+CLAIM_PURGE = text(
+    "SELECT tweet_id FROM tweet_purges ORDER BY deleted_at LIMIT 1 FOR UPDATE SKIP LOCKED"
+)
+DELETE_LIKES = text(
+    "DELETE FROM likes WHERE id IN "
+    "(SELECT id FROM likes WHERE tweets_id = :tweet_id LIMIT :batch_size)"
+)
+DELETE_PURGE = text("DELETE FROM tweet_purges WHERE tweet_id = :tweet_id")
+
+
+class TweetPurgeService:
+    """
+    Сервис для удаления лайков удалённых твитов (очередь tweet_purges)
+    """
+
+    @classmethod
+    def purge(cls, engine: Engine, batch_size: int = TWEET_PURGE_BATCH_SIZE) -> int:
+        """
+        Очистка всех твитов из очереди. Твит убирается из очереди в той же
+        транзакции, что и последняя пачка его лайков; прерванный запуск
+        продолжается со следующей пачки.
+        :param engine: синхронный движок БД
+        :param batch_size: количество лайков, удаляемых одной транзакцией
+        :return: количество удалённых лайков
+        """
+        deleted = 0
+
+        while True:
+            started = time.perf_counter()
+
+            with engine.begin() as connection:
+                tweet_id = connection.execute(CLAIM_PURGE).scalar()
+
+                if tweet_id is None:
+                    break
+
+                count = connection.execute(
+                    DELETE_LIKES, {"tweet_id": tweet_id, "batch_size": batch_size}
+                ).rowcount
+
+                if count < batch_size:
+                    connection.execute(DELETE_PURGE, {"tweet_id": tweet_id})
+
+            deleted += count
+
+            logger.info(
+                f"Очистка твита {tweet_id}: удалено лайков {count}, "
+                f"{time.perf_counter() - started:.2f} с"
+            )
+
+        return deleted
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Удаление лайков удалённых твитов")
+    parser.add_argument("--batch-size", type=int, default=TWEET_PURGE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    TweetPurgeService.purge(get_sync_engine(), batch_size=args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
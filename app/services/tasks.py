@@ -4,6 +4,18 @@ import os
 
 from celery import shared_task
 
+from app.config import TWEETS_PARTITIONS_AHEAD, TWEETS_ARCHIVE_AFTER_MONTHS
+from app.database import get_sync_engine
+from app.services.partition import TweetPartitionService
+from app.services.purge import TweetPurgeService
+from app.utils.metrics import connect_celery_metrics
+from app.utils.tracing import connect_celery_tracing
+
+# Сигналы Celery подключаются вместе с задачами: в процессе API - при первой
+# отправке задачи, в воркере трассировка подключается после настройки (celery_conf)
+connect_celery_metrics()
+connect_celery_tracing()
+
 
 @shared_task()
 def send_async_email_task(email_to: str, subject: str, body: dict):
@@ -37,3 +49,30 @@ def send_async_email_task(email_to: str, subject: str, body: dict):
         return 'error'
 
     return True
+
+
+@shared_task()
+def maintain_tweet_partitions():
+    """
+    Создание секций таблицы твитов на несколько месяцев вперёд и архивация старых секций.
+    """
+    with get_sync_engine().begin() as connection:
+        created = TweetPartitionService.ensure_partitions(
+            connection, months_ahead=TWEETS_PARTITIONS_AHEAD
+        )
+        archived = []
+
+        if TWEETS_ARCHIVE_AFTER_MONTHS:
+            archived = TweetPartitionService.archive_partitions(
+                connection, keep_months=TWEETS_ARCHIVE_AFTER_MONTHS
+            )
+
+    return {"created": created, "archived": archived}
+
+
+@shared_task()
+def purge_deleted_tweets():
+    """
+    Удаление лайков удалённых твитов пачками.
+    """
+    return {"likes": TweetPurgeService.purge(get_sync_engine())}
@@ -0,0 +1,42 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from loguru import logger
+
+from app.config import CACHE_PREFIX, TRENDS_CACHE_TTL
+from app.services.tweet import TweetsService
+from app.utils.cache import cache_backend
+from app.utils.feed import encode_trends
+from app.utils.metrics import instrument_service
+from app.utils.trends import trend_tracker
+
+
+@instrument_service
+class TrendService:
+    """
+    Сервис для вывода трендов
+    """
+
+    @classmethod
+    async def get_trends(cls, limit: int, session: AsyncSession) -> bytes:
+        """
+        Популярные хэштеги (по публикациям) и твиты (по лайкам) по последнему
+        снимку трендов. Ответ кэшируется на TRENDS_CACHE_TTL секунд.
+        :param limit: количество хэштегов и твитов
+        :param session: объект асинхронной сессии
+        :return: тело ответа
+        """
+        key = f"{CACHE_PREFIX}:trends:{limit}"
+        body = await cache_backend.get(key)
+
+        if body is not None:
+            return body
+
+        logger.debug("Вывод трендов")
+
+        tweet_ids = [int(tweet_id) for tweet_id, _ in trend_tracker.top("tweets", limit)]
+        body = encode_trends(
+            hashtags=trend_tracker.top("hashtags", limit),
+            tweets=await TweetsService.get_tweets_by_ids(tweet_ids=tweet_ids, session=session),
+        )
+        await cache_backend.set(key, body, TRENDS_CACHE_TTL)
+
+        return body
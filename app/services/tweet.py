@@ -1,43 +1,605 @@
-from sqlalchemy import select
-from sqlalchemy.orm import joinedload
+import datetime
+import struct
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import (
+    ARRAY,
+    Integer,
+    Row,
+    bindparam,
+    cast,
+    delete,
+    func,
+    literal,
+    select,
+    text,
+    tuple_,
+)
+from sqlalchemy.dialects.postgresql import REAL, REGCONFIG, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from http import HTTPStatus
 from loguru import logger
 
+from app.config import (
+    CACHE_PREFIX,
+    FEED_LIMIT,
+    FEED_HOT_DAYS,
+    FEED_RANK_CANDIDATES,
+    SEARCH_LIMIT,
+    SEARCH_HOT_DAYS,
+    TIMELINE_LIMIT,
+    TWEET_META_TTL,
+)
+from app.models.engagement import AuthorAffinity, TweetEngagement
+from app.models.hashtags import Hashtag, Mention, TweetHashtag
 from app.models.likes import Like
-from app.models.tweets import Tweet
+from app.models.tweets import SEARCH_CONFIG, Tweet, TweetPurge
 from app.models.users import User
+from app.models.versions import ContentVersion
+from app.services.engagement import EngagementService
+from app.services.hashtag import HashtagService
+from app.utils.cache import cache_backend
 from app.utils.exeptions import CustomApiException
+from app.utils.metrics import instrument_service
 from app.schemas.tweet import TweetInSchema
+from app.utils.feed import FeedAuthor, FeedLike, FeedTweet
+from app.utils.ranking import rank_candidates
+from app.utils.search import SearchCursor
+from app.utils.trends import trend_tracker
+
+EMPTY_FEED_JSON = b'{"result":true,"tweets":[]}'
+
+# Метаданные твита в кэше: id автора, created_at (микросекунды от эпохи, UTC)
+# и признак удаления - 17 байт на твит
+TWEET_META = struct.Struct("!qq?")
+EPOCH = datetime.datetime(1970, 1, 1)
+MICROSECOND = datetime.timedelta(microseconds=1)
+
+
+@dataclass(slots=True)
+class TweetMeta:
+    """
+    Метаданные твита для проверки существования и авторства без обращения к БД.
+    created_at позволяет удалять твит с отсечением лишних секций таблицы.
+    """
+
+    author_id: int
+    created_at: datetime.datetime
+    deleted: bool = False
+
+    def pack(self) -> bytes:
+        return TWEET_META.pack(
+            self.author_id, (self.created_at - EPOCH) // MICROSECOND, self.deleted
+        )
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "TweetMeta":
+        author_id, created_at, deleted = TWEET_META.unpack(data)
 
+        return cls(author_id, EPOCH + created_at * MICROSECOND, deleted)
 
+
+def tweet_meta_key(tweet_id: int) -> str:
+    """
+    Ключ кэша метаданных твита
+    """
+    return f"{CACHE_PREFIX}:tweet:{tweet_id}"
+
+# Лента в виде готового JSON. Старые секции (cold) читаются, только если в
+# "горячем" окне меньше limit твитов: условие вычисляется один раз (InitPlan),
+# и при его ложности сканирование не выполняется
+FEED_JSON_QUERY = text(
+    """
+    WITH hot AS (
+        SELECT id, tweet_data, user_id, created_at FROM tweets
+        WHERE user_id = ANY(:author_ids) AND created_at >= :hot_from
+        ORDER BY created_at DESC
+        LIMIT :limit
+    ), cold AS (
+        SELECT id, tweet_data, user_id, created_at FROM tweets
+        WHERE user_id = ANY(:author_ids) AND created_at < :hot_from
+            AND (SELECT count(*) FROM hot) < :limit
+        ORDER BY created_at DESC
+        LIMIT :limit
+    ), page AS (
+        SELECT * FROM hot
+        UNION ALL
+        SELECT * FROM cold
+        ORDER BY created_at DESC
+        LIMIT :limit
+    )
+    SELECT json_build_object(
+        'result', true,
+        'tweets', coalesce(
+            json_agg(
+                json_build_object(
+                    'id', page.id,
+                    'content', page.tweet_data,
+                    'author', json_build_object('id', author.id, 'name', author.username),
+                    'likes', coalesce(
+                        (
+                            SELECT json_agg(
+                                json_build_object('user_id', liker.id, 'name', liker.username)
+                                ORDER BY likes.id
+                            )
+                            FROM likes JOIN "user" liker ON liker.id = likes.user_id
+                            WHERE likes.tweets_id = page.id
+                        ),
+                        '[]'::json
+                    )
+                )
+                ORDER BY page.created_at DESC
+            ),
+            '[]'::json
+        )
+    )::text
+    FROM page JOIN "user" author ON author.id = page.user_id
+    """
+).bindparams(bindparam("author_ids", type_=ARRAY(Integer)))
+
+
+@instrument_service
 class TweetsService:
     """
     Сервис для добавления, удаления и вывода твитов
     """
 
     @classmethod
-    async def get_tweets(cls, user: User, session: AsyncSession):
+    async def get_tweets(cls, user: User, session: AsyncSession) -> List[FeedTweet]:
         """
-        Вывод последних твитов подписанных пользователей
+        Вывод последних твитов подписанных пользователей.
+        Сначала просматривается "горячее" окно FEED_HOT_DAYS (затрагивает только
+        последние секции таблицы), и только если твитов в нём не хватает -
+        более старые секции. Данные выбираются строками (без создания ORM-объектов)
+        и сразу собираются в DTO для быстрой сериализации.
         :param user: объект текущего пользователя
         :param session: объект асинхронной сессии
         :return: список с твитами
         """
         logger.debug("Вывод твитов")
 
+        author_ids = [following.id for following in user.following]
+
+        if not author_ids:
+            return []
+
+        hot_from = datetime.datetime.utcnow() - datetime.timedelta(days=FEED_HOT_DAYS)
+
+        tweets = await cls._get_feed_page(
+            author_ids=author_ids,
+            condition=Tweet.created_at >= hot_from,
+            limit=FEED_LIMIT,
+            session=session,
+        )
+
+        if len(tweets) < FEED_LIMIT:
+            tweets += await cls._get_feed_page(
+                author_ids=author_ids,
+                condition=Tweet.created_at < hot_from,
+                limit=FEED_LIMIT - len(tweets),
+                session=session,
+            )
+
+        await cls._load_feed_likes(tweets=tweets, session=session)
+
+        return tweets
+
+    @classmethod
+    async def get_ranked_tweets(cls, user: User, session: AsyncSession) -> List[FeedTweet]:
+        """
+        Ранжированная лента: из последних FEED_RANK_CANDIDATES твитов подписок
+        (сначала "горячее" окно FEED_HOT_DAYS) выбираются FEED_LIMIT лучших по
+        свежести, скорости набора лайков и близости пользователя к автору.
+        Показатели лайков поддерживаются инкрементально (EngagementService),
+        поэтому лента строится без агрегации по таблице лайков.
+        :param user: объект текущего пользователя
+        :param session: объект асинхронной сессии
+        :return: список с твитами по убыванию оценки
+        """
+        logger.debug("Вывод ранжированной ленты")
+
+        author_ids = [following.id for following in user.following]
+
+        if not author_ids:
+            return []
+
+        hot_from = datetime.datetime.utcnow() - datetime.timedelta(days=FEED_HOT_DAYS)
+
+        candidates = await cls._get_rank_candidates(
+            user_id=user.id,
+            author_ids=author_ids,
+            condition=Tweet.created_at >= hot_from,
+            limit=FEED_RANK_CANDIDATES,
+            session=session,
+        )
+
+        if len(candidates) < FEED_LIMIT:
+            candidates += await cls._get_rank_candidates(
+                user_id=user.id,
+                author_ids=author_ids,
+                condition=Tweet.created_at < hot_from,
+                limit=FEED_LIMIT - len(candidates),
+                session=session,
+            )
+
+        if not candidates:
+            return []
+
+        order = rank_candidates(
+            candidates=np.array(candidates, dtype=np.float64),
+            now=time.time(),
+            limit=FEED_LIMIT,
+        )
+
+        return await cls.get_tweets_by_ids(
+            tweet_ids=[candidates[index][0] for index in order], session=session
+        )
+
+    @classmethod
+    async def _get_rank_candidates(
+        cls, user_id: int, author_ids: List[int], condition, limit: int, session: AsyncSession
+    ) -> List[Row]:
+        """
+        Кандидаты ранжированной ленты в пределах временного условия
+        вместе с показателями лайков твита и близости пользователя к автору
+        :param user_id: id пользователя ленты
+        :param author_ids: id авторов
+        :param condition: условие по created_at (для отсечения секций)
+        :param limit: максимальное количество твитов
+        :param session: объект асинхронной сессии
+        :return: строки в формате колонок app.utils.ranking (время - unix time),
+        по убыванию даты
+        """
         query = (
-            select(Tweet)
-            .filter(Tweet.user_id.in_(user.id for user in user.following))
-            .options(
-                joinedload(Tweet.user),
-                joinedload(Tweet.likes).subqueryload(Like.user)
+            select(
+                Tweet.id,
+                Tweet.user_id,
+                func.extract("epoch", Tweet.created_at),
+                func.coalesce(TweetEngagement.velocity, 0),
+                func.coalesce(func.extract("epoch", TweetEngagement.updated_at), 0),
+                func.coalesce(AuthorAffinity.score, 0),
+                func.coalesce(func.extract("epoch", AuthorAffinity.updated_at), 0),
+            )
+            .outerjoin(TweetEngagement, TweetEngagement.tweet_id == Tweet.id)
+            .outerjoin(
+                AuthorAffinity,
+                (AuthorAffinity.user_id == user_id) & (AuthorAffinity.author_id == Tweet.user_id),
             )
+            .filter(Tweet.user_id.in_(author_ids), condition)
             .order_by(Tweet.created_at.desc())
+            .limit(limit)
+        )
+
+        return list((await session.execute(query)).all())
+
+    @classmethod
+    async def _get_feed_page(
+        cls, author_ids: List[int], condition, limit: int, session: AsyncSession
+    ) -> List[FeedTweet]:
+        """
+        Выборка твитов авторов в пределах временного условия
+        :param author_ids: id авторов
+        :param condition: условие по created_at (для отсечения секций)
+        :param limit: максимальное количество твитов
+        :param session: объект асинхронной сессии
+        :return: список твитов (без лайков), отсортированный по убыванию даты
+        """
+        query = (
+            select(Tweet.id, Tweet.tweet_data, User.id, User.username)
+            .join(User, User.id == Tweet.user_id)
+            .filter(Tweet.user_id.in_(author_ids), condition)
+            .order_by(Tweet.created_at.desc())
+            .limit(limit)
+        )
+
+        result = await session.execute(query)
+
+        return [
+            FeedTweet(id=tweet_id, content=content, author=FeedAuthor(id=author_id, name=name))
+            for tweet_id, content, author_id, name in result
+        ]
+
+    @classmethod
+    async def _load_feed_likes(cls, tweets: List[FeedTweet], session: AsyncSession) -> None:
+        """
+        Загрузка лайков для твитов ленты одним запросом
+        :param tweets: твиты ленты
+        :param session: объект асинхронной сессии
+        :return: None
+        """
+        if not tweets:
+            return
+
+        by_id = {tweet.id: tweet for tweet in tweets}
+        query = (
+            select(Like.tweets_id, User.id, User.username)
+            .join(User, User.id == Like.user_id)
+            .where(Like.tweets_id.in_(by_id))
+            .order_by(Like.id)
         )
 
+        for tweet_id, user_id, name in await session.execute(query):
+            by_id[tweet_id].likes.append(FeedLike(user_id=user_id, name=name))
+
+    @classmethod
+    async def get_feed_version(cls, author_ids: List[int], session: AsyncSession) -> int:
+        """
+        Версия ленты: сумма счётчиков изменений контента авторов (растёт при
+        любом добавлении или удалении их твитов и лайков к ним)
+        :param author_ids: id авторов, на которых подписан пользователь
+        :param session: объект асинхронной сессии
+        :return: версия ленты
+        """
+        if not author_ids:
+            return 0
+
+        query = select(func.coalesce(func.sum(ContentVersion.version), 0)).where(
+            ContentVersion.user_id.in_(author_ids)
+        )
         result = await session.execute(query)
-        tweets = result.unique().scalars().all()
+
+        return result.scalar_one()
+
+    @classmethod
+    async def get_tweets_json(cls, user: User, session: AsyncSession) -> bytes:
+        """
+        Вывод ленты одним запросом: БД сама собирает готовый JSON-документ
+        {"result": true, "tweets": [...]} (движок ленты FEED_ENGINE=json).
+        Логика окон та же, что в get_tweets: более старые секции читаются,
+        только если в "горячем" окне не набралось FEED_LIMIT твитов.
+        :param user: объект текущего пользователя
+        :param session: объект асинхронной сессии
+        :return: тело ответа
+        """
+        logger.debug("Вывод твитов (JSON из БД)")
+
+        author_ids = [following.id for following in user.following]
+
+        if not author_ids:
+            return EMPTY_FEED_JSON
+
+        hot_from = datetime.datetime.utcnow() - datetime.timedelta(days=FEED_HOT_DAYS)
+
+        result = await session.execute(
+            FEED_JSON_QUERY,
+            {"author_ids": author_ids, "hot_from": hot_from, "limit": FEED_LIMIT},
+        )
+
+        return result.scalar_one().encode()
+
+    @classmethod
+    async def search_tweets(
+        cls,
+        query: str,
+        user: User,
+        session: AsyncSession,
+        cursor: Optional[SearchCursor] = None,
+        limit: int = SEARCH_LIMIT,
+        following_only: bool = False,
+    ) -> Tuple[List[FeedTweet], Optional[SearchCursor]]:
+        """
+        Полнотекстовый поиск твитов по GIN-индексу search_vector. Запрос
+        в синтаксисе веб-поиска ("точная фраза", or, -исключение).
+        Как и в ленте, сначала выводятся совпадения из "горячего" окна
+        SEARCH_HOT_DAYS, и только когда они закончились - более старые: частое
+        слово совпадает с сотнями тысяч твитов, и ранжировать их все ради одной
+        страницы слишком дорого. Внутри окна результаты упорядочены по
+        релевантности (ts_rank_cd), затем по id. Страницы выбираются по курсору
+        (окно, rank, id) последнего твита предыдущей страницы.
+        :param query: поисковый запрос
+        :param user: объект текущего пользователя
+        :param session: объект асинхронной сессии
+        :param cursor: курсор предыдущей страницы (None - первая страница)
+        :param limit: размер страницы
+        :param following_only: искать только среди твитов подписок
+        :return: твиты страницы и курсор следующей страницы (None - страница последняя)
+        """
+        logger.debug("Поиск твитов")
+
+        ts_query = func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), query)
+        matches = select(
+            Tweet.id,
+            Tweet.tweet_data,
+            Tweet.user_id,
+            func.ts_rank_cd(Tweet.search_vector, ts_query, type_=REAL).label("rank"),
+        ).where(Tweet.search_vector.bool_op("@@")(ts_query))
+
+        if following_only:
+            author_ids = [following.id for following in user.following]
+
+            if not author_ids:
+                return [], None
+
+            matches = matches.where(Tweet.user_id.in_(author_ids))
+
+        if cursor is not None:
+            hot_from = cursor.hot_from
+        elif SEARCH_HOT_DAYS > 0:
+            # Граница окна с точностью до секунды: так она хранится в курсоре
+            hot_from = datetime.datetime.utcnow().replace(microsecond=0) - datetime.timedelta(
+                days=SEARCH_HOT_DAYS
+            )
+        else:
+            hot_from = EPOCH
+
+        # Лишняя строка показывает, есть ли следующая страница
+        hot_rows = []
+
+        if cursor is None or not cursor.cold:
+            hot_rows = await cls._search_page(
+                matches=matches,
+                condition=Tweet.created_at >= hot_from,
+                after=cursor,
+                limit=limit + 1,
+                session=session,
+            )
+
+        cold_rows = []
+
+        if len(hot_rows) <= limit and hot_from > EPOCH:
+            cold_rows = await cls._search_page(
+                matches=matches,
+                condition=Tweet.created_at < hot_from,
+                after=cursor if cursor is not None and cursor.cold else None,
+                limit=limit + 1 - len(hot_rows),
+                session=session,
+            )
+
+        rows = hot_rows + cold_rows
+        tweets = [
+            FeedTweet(id=tweet_id, content=content, author=FeedAuthor(id=author_id, name=name))
+            for tweet_id, content, author_id, name, _ in rows[:limit]
+        ]
+        await cls._load_feed_likes(tweets=tweets, session=session)
+
+        next_cursor = None
+
+        if len(rows) > limit:
+            last = rows[limit - 1]
+            next_cursor = SearchCursor(
+                rank=last.rank, tweet_id=last.id, hot_from=hot_from, cold=limit > len(hot_rows)
+            )
+
+        return tweets, next_cursor
+
+    @classmethod
+    async def _search_page(
+        cls, matches, condition, after: Optional[SearchCursor], limit: int, session: AsyncSession
+    ) -> List[Row]:
+        """
+        Выборка совпадений поиска в пределах временного условия
+        :param matches: запрос совпадений (id, tweet_data, user_id, rank)
+        :param condition: условие по created_at (для отсечения секций)
+        :param after: курсор, после которого начинается страница (None - с начала)
+        :param limit: максимальное количество твитов
+        :param session: объект асинхронной сессии
+        :return: строки (id, tweet_data, id автора, имя автора, rank) по убыванию (rank, id)
+        """
+        page = matches.where(condition).subquery()
+        stmt = select(page.c.id, page.c.tweet_data, User.id, User.username, page.c.rank).join(
+            User, User.id == page.c.user_id
+        )
+
+        if after is not None:
+            stmt = stmt.where(
+                tuple_(page.c.rank, page.c.id)
+                < tuple_(literal(after.rank, REAL), literal(after.tweet_id))
+            )
+
+        stmt = stmt.order_by(page.c.rank.desc(), page.c.id.desc()).limit(limit)
+
+        return list((await session.execute(stmt)).all())
+
+    @classmethod
+    async def get_hashtag_tweets(
+        cls,
+        tag: str,
+        session: AsyncSession,
+        max_id: Optional[int] = None,
+        limit: int = TIMELINE_LIMIT,
+    ) -> List[FeedTweet]:
+        """
+        Твиты с хэштегом, от новых к старым (по индексу tweet_hashtags)
+        :param tag: хэштег (с "#" или без, в любом регистре)
+        :param session: объект асинхронной сессии
+        :param max_id: выводить твиты с id меньше указанного (следующая страница)
+        :param limit: количество твитов
+        :return: список твитов
+        """
+        logger.debug("Вывод твитов с хэштегом")
+
+        # id хэштега подставляется подзапросом (а не соединением): тогда
+        # первичный ключ (hashtag_id, tweet_id) отдаёт страницу без сортировки
+        hashtag_id = select(Hashtag.id).where(Hashtag.tag == tag.lstrip("#").lower())
+        entries = select(TweetHashtag.tweet_id, TweetHashtag.created_at).where(
+            TweetHashtag.hashtag_id == hashtag_id.scalar_subquery()
+        )
+
+        return await cls._get_timeline(entries=entries, max_id=max_id, limit=limit, session=session)
+
+    @classmethod
+    async def get_mention_tweets(
+        cls,
+        user_id: int,
+        session: AsyncSession,
+        max_id: Optional[int] = None,
+        limit: int = TIMELINE_LIMIT,
+    ) -> List[FeedTweet]:
+        """
+        Твиты с упоминанием пользователя, от новых к старым (по индексу mentions)
+        :param user_id: id упомянутого пользователя
+        :param session: объект асинхронной сессии
+        :param max_id: выводить твиты с id меньше указанного (следующая страница)
+        :param limit: количество твитов
+        :return: список твитов
+        """
+        logger.debug("Вывод упоминаний пользователя")
+
+        entries = select(Mention.tweet_id, Mention.created_at).where(Mention.user_id == user_id)
+
+        return await cls._get_timeline(entries=entries, max_id=max_id, limit=limit, session=session)
+
+    @classmethod
+    async def _get_timeline(
+        cls, entries, max_id: Optional[int], limit: int, session: AsyncSession
+    ) -> List[FeedTweet]:
+        """
+        Твиты по записям обратного индекса: страница выбирается из индекса,
+        затем твиты читаются по первичному ключу (id, created_at) - только
+        из своих секций
+        :param entries: запрос (tweet_id, created_at) к обратному индексу
+        :param max_id: выводить твиты с id меньше указанного
+        :param limit: количество твитов
+        :param session: объект асинхронной сессии
+        :return: список твитов с лайками
+        """
+        tweet_id = entries.selected_columns.tweet_id
+
+        if max_id is not None:
+            entries = entries.where(tweet_id < max_id)
+
+        page = entries.order_by(tweet_id.desc()).limit(limit).subquery()
+        query = (
+            select(Tweet.id, Tweet.tweet_data, User.id, User.username)
+            .select_from(page)
+            .join(Tweet, (Tweet.id == page.c.tweet_id) & (Tweet.created_at == page.c.created_at))
+            .join(User, User.id == Tweet.user_id)
+            .order_by(page.c.tweet_id.desc())
+        )
+
+        tweets = [
+            FeedTweet(id=tweet_id, content=content, author=FeedAuthor(id=author_id, name=name))
+            for tweet_id, content, author_id, name in await session.execute(query)
+        ]
+        await cls._load_feed_likes(tweets=tweets, session=session)
+
+        return tweets
+
+    @classmethod
+    async def get_tweets_by_ids(cls, tweet_ids: List[int], session: AsyncSession) -> List[FeedTweet]:
+        """
+        Твиты по списку id в том же порядке (удалённые пропускаются)
+        :param tweet_ids: id твитов
+        :param session: объект асинхронной сессии
+        :return: список твитов с лайками
+        """
+        if not tweet_ids:
+            return []
+
+        query = (
+            select(Tweet.id, Tweet.tweet_data, User.id, User.username)
+            .join(User, User.id == Tweet.user_id)
+            .where(Tweet.id.in_(tweet_ids))
+        )
+        by_id = {
+            tweet_id: FeedTweet(id=tweet_id, content=content, author=FeedAuthor(id=author_id, name=name))
+            for tweet_id, content, author_id, name in await session.execute(query)
+        }
+        tweets = [by_id[tweet_id] for tweet_id in tweet_ids if tweet_id in by_id]
+        await cls._load_feed_likes(tweets=tweets, session=session)
 
         return tweets
 
@@ -49,13 +611,45 @@ class TweetsService:
         :param session: объект асинхронной сессии
         :return: объект твита
         """
-        logger.debug(f"Поиск твита по id: {tweet_id}")
+        logger.debug("Поиск твита по id: {}", tweet_id)
 
         query = select(Tweet).where(Tweet.id == tweet_id)
         tweet = await session.execute(query)
 
         return tweet.scalar_one_or_none()
 
+    @classmethod
+    async def get_tweet_meta(cls, tweet_id: int, session: AsyncSession) -> TweetMeta | None:
+        """
+        Метаданные твита (автор, дата создания) из кэша, при промахе - из БД.
+        Отсутствующий твит кэшируется как удалённый.
+        :param tweet_id: id твита
+        :param session: объект асинхронной сессии
+        :return: метаданные / None - твит не найден или удалён
+        """
+        key = tweet_meta_key(tweet_id)
+        _, cached = await cache_backend.get_with_ttl(key)
+
+        if cached is not None:
+            meta = TweetMeta.unpack(cached)
+        else:
+            logger.debug("Поиск твита по id: {}", tweet_id)
+
+            query = select(Tweet.user_id, Tweet.created_at).where(Tweet.id == tweet_id)
+
+            try:
+                row = (await session.execute(query)).one_or_none()
+            except BaseException:
+                # Запросы, ждущие это значение, не ждут до coalesce_timeout
+                cache_backend.release(key)
+                raise
+
+            meta = TweetMeta(*row) if row else TweetMeta(0, EPOCH, deleted=True)
+
+            await cache_backend.set(key, meta.pack(), TWEET_META_TTL)
+
+        return None if meta.deleted else meta
+
     @classmethod
     async def create_tweet(
         cls, tweet: TweetInSchema, current_user: User, session: AsyncSession
@@ -73,8 +667,17 @@ class TweetsService:
 
         session.add(new_tweet)
         await session.flush()
+        hashtags = await HashtagService.save_tweet_entities(tweet=new_tweet, session=session)
 
         await session.commit()
+        trend_tracker.record("hashtags", hashtags)
+
+        # Запись в кэш сразу: id мог быть закэширован как отсутствующий
+        await cache_backend.set(
+            tweet_meta_key(new_tweet.id),
+            TweetMeta(current_user.id, new_tweet.created_at).pack(),
+            TWEET_META_TTL,
+        )
 
         return new_tweet
 
@@ -89,11 +692,11 @@ class TweetsService:
         :param session: объект асинхронной сессии
         :return: None
         """
-        logger.debug(f"Удаление твита")
+        logger.debug("Удаление твита")
 
-        tweet = await cls.get_tweet(tweet_id=tweet_id, session=session)
+        meta = await cls.get_tweet_meta(tweet_id=tweet_id, session=session)
 
-        if not tweet:
+        if not meta:
             logger.error("Твит не найден")
 
             raise CustomApiException(
@@ -101,7 +704,7 @@ class TweetsService:
             )
 
         else:
-            if tweet.user_id != user.id:
+            if meta.author_id != user.id:
                 logger.error("Запрос на удаление чужого твита")
 
                 raise CustomApiException(
@@ -110,5 +713,33 @@ class TweetsService:
                 )
 
             else:
-                await session.delete(tweet)
-                await session.commit()
\ No newline at end of file
+                # Твит удаляется сразу (одна строка своей секции), лайки - позже
+                # пачками (TweetPurgeService): у популярного твита их удаление
+                # в этой транзакции заняло бы секунды.
+                # Строка твита удаляется первой: параллельный запрос на удаление
+                # ждёт её блокировку и после фиксации первого не удаляет ничего
+                deleted = await session.scalar(
+                    delete(Tweet)
+                    .where(Tweet.id == tweet_id, Tweet.created_at == meta.created_at)
+                    .returning(Tweet.id)
+                )
+                meta.deleted = True
+
+                if deleted is None:
+                    logger.error("Твит уже удалён")
+
+                    await session.rollback()
+                    await cache_backend.set(tweet_meta_key(tweet_id), meta.pack(), TWEET_META_TTL)
+
+                    raise CustomApiException(
+                        status_code=HTTPStatus.NOT_FOUND, detail="Tweet not found"  # 404
+                    )
+
+                await HashtagService.delete_tweet_entities(tweet_id=tweet_id, session=session)
+                await EngagementService.delete_tweet_engagement(tweet_id=tweet_id, session=session)
+                await session.execute(
+                    insert(TweetPurge).values(tweet_id=tweet_id).on_conflict_do_nothing()
+                )
+                await session.commit()
+
+                await cache_backend.set(tweet_meta_key(tweet_id), meta.pack(), TWEET_META_TTL)
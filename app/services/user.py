@@ -3,10 +3,25 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 from loguru import logger
 
+from app.config import CACHE_PREFIX, PROFILE_CACHE_TTL, PROFILE_NEGATIVE_TTL
 from app.models.users import User
 from app.database import async_session_maker
+from app.schemas.user import UserOutSchema
+from app.utils.cache import cache_backend
+from app.utils.metrics import instrument_service
 
+# Отрицательная запись кэша профилей: пользователя с таким id нет
+PROFILE_NOT_FOUND = b""
 
+
+def profile_key(user_id: int) -> str:
+    """
+    Ключ кэша профиля пользователя
+    """
+    return f"{CACHE_PREFIX}:profile:{user_id}"
+
+
+@instrument_service
 class UserService:
     """
     Сервис для вывода данных о пользователе
@@ -20,7 +35,7 @@ class UserService:
         :param session: объект асинхронной сессии
         :return: объект пользователя / False
         """
-        logger.debug(f"Поиск пользователя по api-key: {token}")
+        logger.debug("Поиск пользователя по api-key")
 
         query = (
             select(User)
@@ -31,7 +46,7 @@ class UserService:
             result = await session.execute(query)
             return result.scalar_one_or_none()
         except Exception as e:
-            logger.error(f"Ошибка при выполнении запроса: {e}")
+            logger.error("Ошибка при выполнении запроса: {}", e)
             return None
 
     @classmethod
@@ -42,7 +57,7 @@ class UserService:
         :param session: объект асинхронной сессии
         :return: объект пользователя / False
         """
-        logger.debug(f"Поиск пользователя по id: {user_id}")
+        logger.debug("Поиск пользователя по id: {}", user_id)
 
         query = (
             select(User)
@@ -53,6 +68,53 @@ class UserService:
 
         return result.scalar_one_or_none()
 
+    @classmethod
+    async def get_profile(cls, user_id: int, session: AsyncSession) -> bytes | None:
+        """
+        Профиль пользователя (сериализованный ответ UserOutSchema) из кэша профилей,
+        при промахе - из БД. Отсутствие пользователя тоже кэшируется
+        (на PROFILE_NEGATIVE_TTL), чтобы перебор id не доходил до БД.
+        :param user_id: id пользователя
+        :param session: объект асинхронной сессии основной БД (не реплики)
+        :return: тело ответа / None - пользователь не найден
+        """
+        key = profile_key(user_id)
+        _, cached = await cache_backend.get_with_ttl(key)
+
+        if cached is not None:
+            return cached or None
+
+        try:
+            user = await cls.get_user_for_id(user_id=user_id, session=session)
+        except BaseException:
+            # Запросы, ждущие этот профиль, не ждут до coalesce_timeout
+            cache_backend.release(key)
+            raise
+
+        if user is None:
+            await cache_backend.set(key, PROFILE_NOT_FOUND, PROFILE_NEGATIVE_TTL)
+            return None
+
+        profile = (
+            UserOutSchema.model_validate({"user": user}, from_attributes=True)
+            .model_dump_json(by_alias=True)
+            .encode()
+        )
+        await cache_backend.set(key, profile, PROFILE_CACHE_TTL)
+
+        return profile
+
+    @classmethod
+    async def invalidate_profiles(cls, *user_ids: int) -> None:
+        """
+        Сброс профилей в кэше (во всех процессах) после изменения подписок
+        или появления пользователя
+        :param user_ids: id пользователей
+        :return: None
+        """
+        for user_id in user_ids:
+            await cache_backend.clear(key=profile_key(user_id))
+
     @classmethod
     async def check_user_for_id(cls, current_user_id: int, user_id: int) -> bool:
         """
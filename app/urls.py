@@ -2,6 +2,9 @@ from fastapi import FastAPI
 
 from app.routes.user import router as user_router
 from app.routes.tweet import router as tweet_router
+from app.routes.hashtag import router as hashtag_router
+from app.routes.trend import router as trend_router
+from app.routes.service import router as service_router, metrics_router
 
 
 def register_routers(app: FastAPI) -> FastAPI:
@@ -11,5 +14,9 @@ def register_routers(app: FastAPI) -> FastAPI:
 
     app.include_router(user_router)  # Вывод информации о пользователе
     app.include_router(tweet_router)  # Добавление, удаление и вывод твитов
+    app.include_router(hashtag_router)  # Твиты с хэштегом
+    app.include_router(trend_router)  # Тренды
+    app.include_router(service_router)  # Служебные метрики
+    app.include_router(metrics_router)  # Метрики для Prometheus
 
     return app
@@ -0,0 +1,476 @@
+import asyncio
+import math
+import random
+import struct
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import orjson
+from fastapi_cache.types import Backend
+from loguru import logger
+from redis import asyncio as aioredis
+
+from app.config import (
+    CACHE_COALESCE_TIMEOUT,
+    CACHE_EARLY_REFRESH_BETA,
+    CACHE_INVALIDATION_CHANNEL,
+    CACHE_L1_MAX_ITEMS,
+    CACHE_L1_TTL,
+    CACHE_REDIS_URL,
+)
+from app.utils.metrics import CACHE_LOOKUPS
+from app.utils.tracing import TracedRedisBackend
+
+# Заголовок значения в L2: метка формата и время вычисления значения в секундах
+# (нужно другим процессам для вероятностного досрочного обновления). Значение
+# без метки (записанное не этим бэкендом или повреждённое) считается промахом
+VALUE_HEADER = struct.Struct("!4sd")
+VALUE_MAGIC = b"TBv1"
+
+
+@dataclass(slots=True)
+class CacheEntry:
+    value: bytes
+    # Момент истечения (time.monotonic), math.inf - без срока
+    expires_at: float
+    # Время вычисления значения
+    delta: float = 0.0
+
+
+@dataclass(slots=True)
+class Inflight:
+    started: float
+    # Результат для ожидающих запросов: значение или None (вычисление не удалось)
+    future: asyncio.Future = field(default_factory=lambda: asyncio.get_running_loop().create_future())
+    # Ключ сброшен во время вычисления: значение могло быть прочитано до изменения
+    # данных и не сохраняется
+    stale: bool = False
+
+
+class LocalCache:
+    """
+    Кэш в памяти процесса (L1): LRU с ограничением количества записей.
+    Запись живёт не дольше ttl секунд и не дольше срока самого значения,
+    поэтому без сообщений о сбросе расхождение с Redis ограничено ttl.
+    """
+
+    def __init__(self, max_items: int, ttl: float) -> None:
+        self.max_items = max_items
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, CacheEntry]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        item = self._entries.get(key)
+
+        if item is None:
+            return None
+
+        stored_until, entry = item
+
+        if stored_until <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        self._entries.move_to_end(key)
+
+        return entry
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        if self.max_items <= 0 or self.ttl <= 0:
+            return
+
+        self._entries[key] = (min(entry.expires_at, time.monotonic() + self.ttl), entry)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_items:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self, namespace: Optional[str] = None) -> int:
+        """
+        Удаление записей пространства имён (всех записей, если оно не передано)
+        :return: количество удалённых записей
+        """
+        if namespace is None:
+            count = len(self._entries)
+            self._entries.clear()
+            return count
+
+        keys = [key for key in self._entries if key.startswith(f"{namespace}:")]
+
+        for key in keys:
+            del self._entries[key]
+
+        return len(keys)
+
+
+class TieredBackend(Backend):
+    """
+    Бэкенд fastapi-cache из двух уровней: кэш в памяти процесса (L1) перед
+    Redis (L2). Подключается через FastAPICache.init, декоратор @cache не меняется.
+
+    Защита от одновременного пересчёта (stampede):
+    - промах отдаётся только первому запросу за ключом, остальные запросы этого
+      процесса ждут, пока он сохранит значение (не дольше coalesce_timeout);
+      если он завершился ошибкой, не сохранив значение (release или окончание
+      его задачи asyncio), ожидающие сразу получают промах;
+    - незадолго до истечения значения один из запросов получает промах с
+      вероятностью, растущей по мере приближения срока (XFetch), и обновляет
+      значение заранее, пока остальные читают текущее.
+
+    Сохранение и удаление значений публикуются в канал Redis, и другие процессы
+    удаляют свою копию из L1. Вычисление, начатое до сброса ключа, не сохраняет
+    своё значение: оно могло быть прочитано до изменения данных.
+    """
+
+    def __init__(
+        self,
+        l2: Optional[Backend] = None,
+        redis: Optional[aioredis.Redis] = None,
+        max_items: int = CACHE_L1_MAX_ITEMS,
+        l1_ttl: float = CACHE_L1_TTL,
+        beta: float = CACHE_EARLY_REFRESH_BETA,
+        coalesce_timeout: float = CACHE_COALESCE_TIMEOUT,
+        channel: str = CACHE_INVALIDATION_CHANNEL,
+    ) -> None:
+        self.l1 = LocalCache(max_items=max_items, ttl=l1_ttl)
+        self.l2 = l2
+        self.redis = redis
+        self.beta = beta
+        self.coalesce_timeout = coalesce_timeout
+        self.channel = channel
+        # Отправитель сообщений о сбросе: свои сообщения процесс пропускает
+        self.origin = uuid.uuid4().hex
+        self._inflight: Dict[str, Inflight] = {}
+        # Ключи, значения которых вычисляет текущий запрос (задача asyncio).
+        # Словарь не изменяется, а заменяется: у каждой задачи своя копия контекста
+        self._leading: ContextVar[Dict[str, Inflight]] = ContextVar(
+            f"cache_leading_{self.origin}", default={}
+        )
+        self._listener: Optional[asyncio.Task] = None
+
+    async def _lookup(self, key: str) -> Optional[CacheEntry]:
+        """
+        Поиск значения в L1, затем в L2 (найденное в L2 копируется в L1)
+        """
+        entry = self.l1.get(key)
+        CACHE_LOOKUPS.labels(tier="l1", result="miss" if entry is None else "hit").inc()
+
+        if entry is not None or self.l2 is None:
+            return entry
+
+        try:
+            ttl, raw = await self.l2.get_with_ttl(key)
+        except Exception as exc:
+            logger.warning("Ошибка чтения из Redis, ключ {}: {}", key, exc)
+            return None
+
+        entry = None if raw is None else self._decode(raw, ttl)
+        CACHE_LOOKUPS.labels(tier="l2", result="miss" if entry is None else "hit").inc()
+
+        if entry is None:
+            if raw is not None:
+                logger.warning("Значение в Redis без заголовка кэша, ключ {}", key)
+
+            return None
+
+        self.l1.set(key, entry)
+
+        return entry
+
+    @staticmethod
+    def _decode(raw: bytes, ttl: int) -> Optional[CacheEntry]:
+        """
+        Разбор значения из L2 (None - нет заголовка или он повреждён)
+        """
+        if len(raw) < VALUE_HEADER.size:
+            return None
+
+        magic, delta = VALUE_HEADER.unpack_from(raw)
+
+        if magic != VALUE_MAGIC or not math.isfinite(delta) or delta < 0:
+            return None
+
+        return CacheEntry(
+            value=raw[VALUE_HEADER.size:],
+            expires_at=time.monotonic() + ttl if ttl >= 0 else math.inf,
+            delta=delta,
+        )
+
+    def _refresh_early(self, entry: CacheEntry) -> bool:
+        """
+        XFetch: досрочное обновление, если now - delta * beta * ln(rand) >= expires_at
+        """
+        if self.beta <= 0 or entry.delta <= 0 or entry.expires_at == math.inf:
+            return False
+
+        gap = -entry.delta * self.beta * math.log(1.0 - random.random())
+
+        return time.monotonic() + gap >= entry.expires_at
+
+    def _lead(self, key: str) -> Tuple[int, None]:
+        """
+        Регистрация запроса, который вычислит значение (ответ - промах)
+        """
+        inflight = self._inflight[key] = Inflight(started=time.monotonic())
+        self._leading.set({**self._leading.get(), key: inflight})
+        task = asyncio.current_task()
+
+        # Задача запроса завершилась (например, ошибкой), не сохранив значение
+        if task is not None:
+            task.add_done_callback(lambda _: self._finish(key, inflight, None))
+
+        return 0, None
+
+    def _stop_leading(self, key: str) -> Optional[Inflight]:
+        """
+        Снятие отметки текущего запроса о вычислении значения
+        :return: вычисление текущего запроса или None
+        """
+        leading = self._leading.get()
+        inflight = leading.get(key)
+
+        if inflight is not None:
+            self._leading.set({name: value for name, value in leading.items() if name != key})
+
+        return inflight
+
+    def _finish(self, key: str, inflight: Inflight, entry: Optional[CacheEntry]) -> None:
+        """
+        Завершение вычисления: ожидающие запросы получают значение или промах (None)
+        """
+        if self._inflight.get(key) is inflight:
+            del self._inflight[key]
+
+        if not inflight.future.done():
+            inflight.future.set_result(entry)
+
+    def _drop_inflight(self, namespace: Optional[str] = None, key: Optional[str] = None) -> None:
+        """
+        Сброс вычислений ключа (или пространства имён): ожидающие запросы получают
+        промах, значения начатых вычислений не сохраняются
+        """
+        if namespace:
+            keys = [name for name in self._inflight if name.startswith(f"{namespace}:")]
+        else:
+            keys = [key] if key in self._inflight else []
+
+        for name in keys:
+            inflight = self._inflight[name]
+            inflight.stale = True
+            self._finish(name, inflight, None)
+
+    def release(self, key: str) -> None:
+        """
+        Отказ текущего запроса от вычисления значения (ошибка до set):
+        ожидающие запросы получают промах, следующий запрос вычисляет значение заново
+        :param key: ключ кэша
+        """
+        inflight = self._stop_leading(key)
+
+        if inflight is not None:
+            self._finish(key, inflight, None)
+
+    @staticmethod
+    def _ttl(entry: CacheEntry) -> int:
+        if entry.expires_at == math.inf:
+            return -1
+
+        return max(int(entry.expires_at - time.monotonic()), 0)
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        entry = await self._lookup(key)
+        inflight = self._inflight.get(key)
+
+        # Вычисление, не завершившееся за coalesce_timeout, считается прерванным
+        if inflight is not None and time.monotonic() - inflight.started > self.coalesce_timeout:
+            del self._inflight[key]
+            inflight = None
+
+        if entry is not None:
+            if inflight is None and self._refresh_early(entry):
+                return self._lead(key)
+
+            return self._ttl(entry), entry.value
+
+        if inflight is None:
+            return self._lead(key)
+
+        # Значение уже вычисляет другой запрос этого процесса
+        try:
+            entry = await asyncio.wait_for(asyncio.shield(inflight.future), self.coalesce_timeout)
+        except asyncio.TimeoutError:
+            return 0, None
+
+        if entry is None:
+            return 0, None
+
+        return self._ttl(entry), entry.value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = await self._lookup(key)
+
+        return None if entry is None else entry.value
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        now = time.monotonic()
+        # Значение вычислено этим запросом или записано напрямую (тогда оно
+        # отдаётся и запросам, ждущим вычисления другим запросом)
+        inflight = self._stop_leading(key)
+
+        if inflight is not None and inflight.stale:
+            logger.debug("Ключ {} сброшен во время вычисления, значение не сохраняется", key)
+            return
+
+        inflight = inflight or self._inflight.get(key)
+        entry = CacheEntry(
+            value=value,
+            expires_at=now + expire if expire else math.inf,
+            delta=now - inflight.started if inflight is not None else 0.0,
+        )
+        self.l1.set(key, entry)
+
+        if inflight is not None:
+            self._finish(key, inflight, entry)
+
+        if self.l2 is not None:
+            try:
+                await self.l2.set(
+                    key, VALUE_HEADER.pack(VALUE_MAGIC, entry.delta) + value, expire
+                )
+            except Exception as exc:
+                logger.warning("Ошибка записи в Redis, ключ {}: {}", key, exc)
+
+        await self._publish({"key": key})
+
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        if namespace:
+            count = self.l1.clear(namespace)
+        elif key:
+            self.l1.delete(key)
+            count = 1
+        else:
+            return 0
+
+        self._drop_inflight(namespace, key)
+
+        if self.l2 is not None:
+            try:
+                count = await self.l2.clear(namespace, key)
+            except Exception as exc:
+                logger.warning("Ошибка очистки кэша в Redis: {}", exc)
+
+        await self._publish({"namespace": namespace} if namespace else {"key": key})
+
+        return count
+
+    async def _publish(self, message: Dict) -> None:
+        """
+        Сообщение другим процессам о сбросе записей L1
+        """
+        if self.redis is None:
+            return
+
+        try:
+            await self.redis.publish(
+                self.channel, orjson.dumps({"origin": self.origin, **message})
+            )
+        except Exception as exc:
+            logger.warning("Не удалось отправить сообщение о сбросе кэша: {}", exc)
+
+    def handle_invalidation(self, data: bytes) -> None:
+        """
+        Обработка сообщения о сбросе от другого процесса
+        :param data: сообщение {"origin": ..., "key" | "namespace": ...}
+        """
+        message = orjson.loads(data)
+
+        if message.get("origin") == self.origin:
+            return
+
+        if message.get("namespace"):
+            self.l1.clear(message["namespace"])
+            self._drop_inflight(namespace=message["namespace"])
+        elif message.get("key"):
+            self.l1.delete(message["key"])
+            self._drop_inflight(key=message["key"])
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub()
+
+            try:
+                await pubsub.subscribe(self.channel)
+
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.handle_invalidation(message["data"])
+
+            except asyncio.CancelledError:
+                raise
+
+            except Exception as exc:
+                logger.warning("Подписка на сброс кэша прервана: {}", exc)
+                # Сообщения могли быть пропущены: L1 сбрасывается целиком
+                self.l1.clear()
+                await asyncio.sleep(1)
+
+            finally:
+                await pubsub.reset()
+
+    async def start(self) -> None:
+        """
+        Подключение к Redis и запуск подписки на сообщения о сбросе (при запуске
+        приложения): первые запросы не ждут открытия соединения
+        """
+        if self.redis is None or self._listener is not None:
+            return
+
+        try:
+            await self.redis.ping()
+        except Exception as exc:
+            logger.warning("Redis недоступен при запуске: {}", exc)
+
+        self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        """
+        Остановка подписки (при остановке приложения)
+        """
+        if self._listener is None:
+            return
+
+        self._listener.cancel()
+
+        try:
+            await self._listener
+        except asyncio.CancelledError:
+            pass
+
+        self._listener = None
+
+
+def create_cache_backend() -> TieredBackend:
+    """
+    Бэкенд кэша по настройкам: без CACHE_REDIS_URL - только L1
+    """
+    if not CACHE_REDIS_URL:
+        return TieredBackend()
+
+    redis = aioredis.from_url(CACHE_REDIS_URL)
+
+    return TieredBackend(l2=TracedRedisBackend(redis), redis=redis)
+
+
+# Бэкенд кэша приложения: подключается к FastAPICache при запуске (app.main)
+# и используется сервисами напрямую
+cache_backend = create_cache_backend()
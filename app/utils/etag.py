@@ -0,0 +1,42 @@
+import hashlib
+
+from fastapi import Request, Response
+
+# Ответ может храниться у клиента, но перед использованием должен быть
+# перепроверен (If-None-Match)
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts) -> str:
+    """
+    Сильный ETag из версии данных (без построения тела ответа)
+    :param parts: значения, от которых зависит содержимое ответа
+    :return: ETag в кавычках
+    """
+    return f'"{hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Проверка заголовка If-None-Match. Для GET используется слабое сравнение:
+    сжатые ответы отдаются со слабым ETag (W/"...")
+    :param request: текущий запрос
+    :param etag: ETag актуальной версии данных
+    :return: True - если у клиента актуальная версия | False - иначе
+    """
+    header = request.headers.get("if-none-match")
+
+    if not header:
+        return False
+
+    if header.strip() == "*":
+        return True
+
+    return etag in (tag.strip().removeprefix("W/") for tag in header.split(","))
+
+
+def not_modified(etag: str) -> Response:
+    """
+    Ответ 304 без тела
+    """
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
@@ -23,4 +23,5 @@ async def custom_api_exception_handler(request: Request, exc: HTTPException):
             "error_message": str(exc.detail),
         },
         status_code=exc.status_code,
+        headers=exc.headers,
     )
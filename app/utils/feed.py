@@ -0,0 +1,75 @@
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+import orjson
+from fastapi.responses import Response
+
+# DTO ленты твитов. Поля названы так же, как ключи ответа TweetListSchema
+# (с учётом псевдонимов), и идут в том же порядке: orjson сериализует
+# dataclass напрямую, без валидации и промежуточных словарей
+
+
+@dataclass(slots=True)
+class FeedAuthor:
+    id: int
+    name: str
+
+
+@dataclass(slots=True)
+class FeedLike:
+    user_id: int
+    name: str
+
+
+@dataclass(slots=True)
+class FeedTweet:
+    id: int
+    content: str
+    author: FeedAuthor
+    likes: List[FeedLike] = field(default_factory=list)
+
+
+def encode_feed(tweets: List[FeedTweet]) -> bytes:
+    """
+    Сериализация ленты в JSON (побайтно совпадает с ответом по схеме TweetListSchema)
+    :param tweets: твиты ленты
+    :return: тело ответа
+    """
+    return orjson.dumps({"result": True, "tweets": tweets})
+
+
+def encode_search_page(tweets: List[FeedTweet], next_cursor: Optional[str]) -> bytes:
+    """
+    Сериализация страницы результатов поиска (ответ по схеме TweetSearchSchema)
+    :param tweets: твиты страницы
+    :param next_cursor: курсор следующей страницы
+    :return: тело ответа
+    """
+    return orjson.dumps({"result": True, "tweets": tweets, "next_cursor": next_cursor})
+
+
+def encode_trends(hashtags: List[Tuple[str, float]], tweets: List[FeedTweet]) -> bytes:
+    """
+    Сериализация трендов (ответ по схеме TrendsSchema)
+    :param hashtags: хэштеги с оценками
+    :param tweets: твиты по убыванию оценки
+    :return: тело ответа
+    """
+    return orjson.dumps(
+        {
+            "result": True,
+            "hashtags": [{"tag": tag, "score": round(score, 2)} for tag, score in hashtags],
+            "tweets": tweets,
+        }
+    )
+
+
+class FeedResponse(Response):
+    """
+    Ответ с лентой твитов, сериализованной через orjson
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: List[FeedTweet]) -> bytes:
+        return encode_feed(content)
@@ -0,0 +1,36 @@
+import re
+from typing import List
+
+# Хэштег: "#" в начале слова и буквы / цифры / "_" (только цифры - не хэштег, как "#1")
+HASHTAG = re.compile(r"(?<![\w#&])#(\w+)")
+# Упоминание: "@" в начале слова и имя пользователя (буквы, цифры, "_", ".", "-");
+# точка или дефис в конце имени считаются знаком препинания
+MENTION = re.compile(r"(?<![\w@])@([\w.-]+)")
+HASHTAG_MAX_LENGTH = 100
+USERNAME_MAX_LENGTH = 60
+
+
+def extract_hashtags(text: str) -> List[str]:
+    """
+    Хэштеги твита в нормализованном виде (без "#", в нижнем регистре), без повторов
+    :param text: текст твита
+    :return: список хэштегов в порядке появления
+    """
+    tags = (tag.lower() for tag in HASHTAG.findall(text))
+
+    return list(
+        dict.fromkeys(
+            tag for tag in tags if not tag.isdigit() and len(tag) <= HASHTAG_MAX_LENGTH
+        )
+    )
+
+
+def extract_mentions(text: str) -> List[str]:
+    """
+    Имена упомянутых пользователей (без "@"), без повторов
+    :param text: текст твита
+    :return: список имён в порядке появления
+    """
+    names = (name.rstrip(".-") for name in MENTION.findall(text))
+
+    return list(dict.fromkeys(name for name in names if 0 < len(name) <= USERNAME_MAX_LENGTH))
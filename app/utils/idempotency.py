@@ -0,0 +1,299 @@
+"""
+Ключи идемпотентности: повтор POST-запроса с тем же заголовком Idempotency-Key
+(например, после обрыва связи у мобильного клиента) получает сохранённый ответ
+первого запроса, а не выполняет действие ещё раз.
+
+Ответ хранится по паре (api-key, ключ) в Redis (без Redis - в памяти процесса)
+IDEMPOTENCY_TTL секунд. Пока первый запрос выполняется, по ключу лежит пустая
+отметка: одновременные повторы ждут его ответ, а не выполняются параллельно.
+"""
+import asyncio
+import hashlib
+import math
+import struct
+import time
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import List, Optional, Tuple
+
+import orjson
+from loguru import logger
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import (
+    CACHE_PREFIX,
+    IDEMPOTENCY_LOCAL_MAX_KEYS,
+    IDEMPOTENCY_LOCK_TIMEOUT,
+    IDEMPOTENCY_TTL,
+)
+from app.utils.cache import CacheEntry, LocalCache, cache_backend
+
+IDEMPOTENCY_HEADER = "idempotency-key"
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# Заголовок ответа, выданного повторно из хранилища
+REPLAYED_HEADER = b"idempotent-replayed"
+# Сохранённый ответ: отпечаток запроса, статус, длина заголовков (JSON), далее заголовки и тело
+STORED_RESPONSE = struct.Struct("!16sHI")
+# Пауза между проверками результата выполняющегося запроса (секунды)
+POLL_INTERVAL = 0.05
+# Отметка выполняющегося запроса
+IN_PROGRESS = b""
+
+
+@dataclass(slots=True)
+class StoredResponse:
+    fingerprint: bytes
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+
+    def pack(self) -> bytes:
+        headers = orjson.dumps(self.headers)
+
+        return (
+            STORED_RESPONSE.pack(self.fingerprint, self.status, len(headers))
+            + headers
+            + self.body
+        )
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "StoredResponse":
+        fingerprint, status, headers_size = STORED_RESPONSE.unpack_from(data)
+        offset = STORED_RESPONSE.size
+
+        return cls(
+            fingerprint=fingerprint,
+            status=status,
+            headers=[tuple(item) for item in orjson.loads(data[offset:offset + headers_size])],
+            body=data[offset + headers_size:],
+        )
+
+
+class IdempotencyStore:
+    """
+    Хранилище ответов: Redis, если он настроен и доступен, иначе память процесса
+    """
+
+    def __init__(
+        self,
+        ttl: int = IDEMPOTENCY_TTL,
+        lock_timeout: float = IDEMPOTENCY_LOCK_TIMEOUT,
+        max_keys: int = IDEMPOTENCY_LOCAL_MAX_KEYS,
+    ) -> None:
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self.local = LocalCache(max_items=max_keys, ttl=ttl)
+
+    async def acquire(self, key: str) -> Tuple[bool, Optional[bytes]]:
+        """
+        Попытка начать выполнение запроса с ключом
+        :param key: ключ хранилища
+        :return: (True, None) - запрос выполняет вызывающий; иначе (False, значение):
+        сохранённый ответ, IN_PROGRESS - запрос выполняется, None - ключ освободился
+        """
+        redis = cache_backend.redis
+
+        if redis is not None:
+            try:
+                if await redis.set(key, IN_PROGRESS, nx=True, px=math.ceil(self.lock_timeout * 1000)):
+                    return True, None
+
+                return False, await redis.get(key)
+
+            except Exception as exc:
+                logger.warning("Ключи идемпотентности без Redis: {}", exc)
+
+        entry = self.local.get(key)
+
+        if entry is not None:
+            return False, entry.value
+
+        self.local.set(key, CacheEntry(IN_PROGRESS, time.monotonic() + self.lock_timeout))
+
+        return True, None
+
+    async def save(self, key: str, value: bytes) -> None:
+        """
+        Сохранение ответа (заменяет отметку выполняющегося запроса)
+        """
+        redis = cache_backend.redis
+
+        if redis is not None:
+            try:
+                await redis.set(key, value, ex=self.ttl)
+                return
+            except Exception as exc:
+                logger.warning("Не удалось сохранить ответ для ключа идемпотентности: {}", exc)
+
+        self.local.set(key, CacheEntry(value, time.monotonic() + self.ttl))
+
+    async def release(self, key: str) -> None:
+        """
+        Снятие отметки без сохранения ответа: повтор запроса выполнится заново
+        """
+        self.local.delete(key)
+        redis = cache_backend.redis
+
+        if redis is not None:
+            try:
+                await redis.delete(key)
+            except Exception as exc:
+                # Отметка истечёт сама через lock_timeout
+                logger.warning("Не удалось снять отметку ключа идемпотентности: {}", exc)
+
+
+def error_response(status_code: int, message: str) -> JSONResponse:
+    """
+    Ответ с ошибкой в формате API (как у custom_api_exception_handler)
+    """
+    return JSONResponse(
+        {"result": False, "error_type": f"{status_code}", "error_message": message},
+        status_code=status_code,
+    )
+
+
+class IdempotencyMiddleware:
+    """
+    Обработка POST-запросов с заголовком Idempotency-Key. Сохраняются ответы
+    со статусом меньше 500 (кроме 429): после ошибки сервера или превышения
+    частоты запросов повтор с тем же ключом выполняется заново. Тот же ключ
+    с другим запросом (путь, тело) - 422, ожидание результата дольше
+    lock_timeout - 409.
+    """
+
+    def __init__(self, app: ASGIApp, store: Optional[IdempotencyStore] = None) -> None:
+        self.app = app
+        self.store = store or IdempotencyStore()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        idempotency_key = headers.get(IDEMPOTENCY_HEADER)
+        api_key = headers.get("api-key")
+
+        # Без api-key ответы разных клиентов не разделить - ключ не учитывается
+        if not idempotency_key or not api_key:
+            await self.app(scope, receive, send)
+            return
+
+        if len(idempotency_key) > IDEMPOTENCY_KEY_MAX_LENGTH:
+            response = error_response(HTTPStatus.BAD_REQUEST, "Idempotency-Key is too long")
+            await response(scope, receive, send)
+            return
+
+        body = await self._read_body(receive)
+        fingerprint = hashlib.blake2b(
+            b"\0".join((scope["path"].encode(), scope["query_string"], body)), digest_size=16
+        ).digest()
+        key = "{}:idempotency:{}".format(
+            CACHE_PREFIX,
+            hashlib.blake2b(f"{api_key}\0{idempotency_key}".encode(), digest_size=16).hexdigest(),
+        )
+
+        deadline = time.monotonic() + self.store.lock_timeout
+
+        while True:
+            acquired, stored = await self.store.acquire(key)
+
+            if acquired:
+                await self._execute(key, fingerprint, body, scope, receive, send)
+                return
+
+            if stored:
+                await self._replay(StoredResponse.unpack(stored), fingerprint, scope, receive, send)
+                return
+
+            if time.monotonic() >= deadline:
+                response = error_response(
+                    HTTPStatus.CONFLICT, "A request with this Idempotency-Key is in progress"
+                )
+                await response(scope, receive, send)
+                return
+
+            await asyncio.sleep(POLL_INTERVAL)
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        chunks = []
+
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    async def _execute(
+        self, key: str, fingerprint: bytes, body: bytes, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """
+        Выполнение запроса с сохранением ответа
+        """
+        body_sent = False
+        start: Message = {}
+        chunks = []
+
+        async def receive_wrapper() -> Message:
+            nonlocal body_sent
+
+            # Тело уже прочитано для отпечатка: приложение получает его одним сообщением
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+
+            return await receive()
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start
+
+            if message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+
+            await send(message)
+
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        except BaseException:
+            await self.store.release(key)
+            raise
+
+        status = start.get("status", 500)
+
+        if status >= HTTPStatus.INTERNAL_SERVER_ERROR or status == HTTPStatus.TOO_MANY_REQUESTS:
+            await self.store.release(key)
+            return
+
+        stored = StoredResponse(
+            fingerprint=fingerprint,
+            status=status,
+            headers=[(name.decode("latin-1"), value.decode("latin-1")) for name, value in start["headers"]],
+            body=b"".join(chunks),
+        )
+        await self.store.save(key, stored.pack())
+
+    @staticmethod
+    async def _replay(
+        stored: StoredResponse, fingerprint: bytes, scope: Scope, receive: Receive, send: Send
+    ) -> None:
+        """
+        Повторная выдача сохранённого ответа (без обращения к приложению)
+        """
+        if stored.fingerprint != fingerprint:
+            response = error_response(
+                HTTPStatus.UNPROCESSABLE_ENTITY, "Idempotency-Key was already used with a different request"
+            )
+            await response(scope, receive, send)
+            return
+
+        headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in stored.headers]
+        headers.append((REPLAYED_HEADER, b"true"))
+
+        await send({"type": "http.response.start", "status": stored.status, "headers": headers})
+        await send({"type": "http.response.body", "body": stored.body})
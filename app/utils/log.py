@@ -0,0 +1,157 @@
+import atexit
+import random
+import re
+import sys
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, TextIO
+
+from loguru import logger
+
+from app.config import LOG_JSON, LOG_LEVEL, LOG_QUEUE_SIZE, LOG_SAMPLING
+
+# Значения секретов в тексте сообщений ("api-key: ...", "token=...") и в полях
+# extra (logger.bind) заменяются на REDACTED
+SECRET_PATTERN = re.compile(r"(?i)\b(api[-_ ]?key|token|password|secret)(\s*[:=]\s*)([^\s,;]+)")
+SECRET_FIELDS = ("api_key", "apikey", "token", "password", "secret")
+REDACTED = "***"
+
+_sink: Optional["QueueSink"] = None
+
+
+class QueueSink:
+    """
+    Неблокирующий приёмник loguru: строки добавляются в очередь в памяти
+    (deque, без блокировок), а фоновый поток раз в flush_interval секунд
+    записывает накопившееся одной операцией. При переполнении очереди сообщения
+    отбрасываются, а не блокируют цикл событий.
+    """
+
+    def __init__(self, stream: TextIO, maxsize: int = 10000, flush_interval: float = 0.1) -> None:
+        self.stream = stream
+        self.maxsize = maxsize
+        self.flush_interval = flush_interval
+        self.dropped = 0
+        self._buffer: Deque[str] = deque()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def write(self, message: str) -> None:
+        if len(self._buffer) >= self.maxsize:
+            self.dropped += 1
+            return
+
+        self._buffer.append(message)
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.flush_interval):
+            self.flush()
+
+        self.flush()
+
+    def flush(self) -> None:
+        """
+        Запись накопившихся сообщений
+        """
+        messages = []
+
+        while self._buffer:
+            messages.append(self._buffer.popleft())
+
+        if self.dropped:
+            dropped, self.dropped = self.dropped, 0
+            messages.append(f"Очередь логов переполнена, отброшено сообщений: {dropped}\n")
+
+        if not messages:
+            return
+
+        try:
+            self.stream.write("".join(messages))
+            self.stream.flush()
+        except (OSError, ValueError):
+            # Поток закрыт (например, при завершении процесса): сообщения теряются
+            pass
+
+    def stop(self) -> None:
+        """
+        Запись оставшихся сообщений и остановка потока (вызывается loguru
+        при удалении приёмника)
+        """
+        self._stopped.set()
+        self._thread.join(timeout=5)
+
+
+def redact_secrets(record: Dict) -> None:
+    """
+    Патчер loguru: маскирование секретов в сообщении и полях extra
+    """
+    record["message"] = SECRET_PATTERN.sub(rf"\1\2{REDACTED}", record["message"])
+
+    for name in record["extra"]:
+        if any(field in name.lower() for field in SECRET_FIELDS):
+            record["extra"][name] = REDACTED
+
+
+def parse_sampling(value: str) -> Dict[str, float]:
+    """
+    Разбор настройки LOG_SAMPLING: "DEBUG=0.01,INFO=0.5" -> {"DEBUG": 0.01, "INFO": 0.5}
+    """
+    rates = {}
+
+    for item in value.split(","):
+        level, _, rate = item.partition("=")
+
+        if level.strip():
+            rates[level.strip().upper()] = float(rate)
+
+    return rates
+
+
+def make_sampler(rates: Dict[str, float]) -> Callable[[Dict], bool]:
+    """
+    Фильтр loguru, пропускающий заданную долю сообщений каждого уровня
+    (уровни без настройки пропускаются полностью)
+    """
+
+    def sample(record: Dict) -> bool:
+        rate = rates.get(record["level"].name, 1.0)
+
+        return rate >= 1.0 or random.random() < rate
+
+    return sample
+
+
+def setup_logging(
+    level: str = LOG_LEVEL,
+    sampling: str = LOG_SAMPLING,
+    serialize: bool = LOG_JSON,
+    queue_size: int = LOG_QUEUE_SIZE,
+    stream: TextIO = sys.stderr,
+) -> "QueueSink":
+    """
+    Настройка логирования приложения (повторные вызовы ничего не меняют).
+    Сообщения ниже level отбрасываются loguru до форматирования, если
+    аргументы переданы отдельно: logger.debug("Твит {}", tweet_id)
+    :return: приёмник логов
+    """
+    global _sink
+
+    if _sink is not None:
+        return _sink
+
+    logger.remove()
+    logger.configure(patcher=redact_secrets)
+
+    _sink = QueueSink(stream, maxsize=queue_size)
+    logger.add(
+        _sink,
+        level=level,
+        filter=make_sampler(parse_sampling(sampling)),
+        serialize=serialize,
+        colorize=False,
+    )
+    # Запись сообщений, оставшихся в очереди, при завершении процесса
+    atexit.register(logger.remove)
+
+    return _sink
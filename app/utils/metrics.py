@@ -0,0 +1,272 @@
+import functools
+import inspect
+import os
+import time
+from typing import Callable, Dict, Iterator, Type
+
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+from prometheus_client.core import (
+    CounterMetricFamily,
+    GaugeMetricFamily,
+    HistogramMetricFamily,
+    Metric,
+)
+from prometheus_client.registry import Collector
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import PROMETHEUS_MULTIPROC_DIR
+from app.utils.pool import pool_snapshot
+from app.utils.tracing import tracer
+
+# Границы корзин гистограмм задержки (в секундах)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# Заголовок fastapi-cache с результатом обращения к кэшу (HIT / MISS)
+CACHE_STATUS_HEADER = b"x-fastapi-cache"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Время обработки запроса к API",
+    ("method", "route", "status"),
+    buckets=LATENCY_BUCKETS,
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Количество запросов к API, обрабатываемых в данный момент",
+    ("method",),
+    # При нескольких воркерах - сумма по живым процессам
+    multiprocess_mode="livesum",
+)
+SERVICE_LATENCY = Histogram(
+    "service_method_duration_seconds",
+    "Время выполнения методов сервисов",
+    ("service", "method"),
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Обращения к кэшу ответов по эндпоинтам",
+    ("route", "result"),
+)
+CACHE_LOOKUPS = Counter(
+    "cache_backend_lookups_total",
+    "Обращения к уровням кэша (l1 - память процесса, l2 - Redis)",
+    ("tier", "result"),
+)
+RATE_LIMIT_DECISIONS = Counter(
+    "rate_limit_decisions_total",
+    "Решения ограничителя частоты запросов (backend: redis / local)",
+    ("limit", "result", "backend"),
+)
+CELERY_PUBLISH_LATENCY = Histogram(
+    "celery_task_publish_duration_seconds",
+    "Время отправки задачи Celery в брокер",
+    ("task",),
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def scrape_registry(multiproc_dir: str = PROMETHEUS_MULTIPROC_DIR) -> CollectorRegistry:
+    """
+    Реестр для эндпоинта /metrics: при нескольких воркерах (задан каталог
+    PROMETHEUS_MULTIPROC_DIR) значения всех процессов читаются из файлов каталога,
+    иначе используется реестр текущего процесса
+    :param multiproc_dir: каталог файлов метрик
+    """
+    if not multiproc_dir:
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=multiproc_dir)
+
+    return registry
+
+
+def mark_process_dead(multiproc_dir: str = PROMETHEUS_MULTIPROC_DIR) -> None:
+    """
+    Удаление файлов live-метрик остановленного воркера (запросы в обработке),
+    чтобы они не учитывались в сумме по процессам
+    :param multiproc_dir: каталог файлов метрик
+    """
+    if multiproc_dir:
+        multiprocess.mark_process_dead(os.getpid(), path=multiproc_dir)
+
+
+def instrument_service(cls: Type) -> Type:
+    """
+    Декоратор класса сервиса: время выполнения каждого публичного асинхронного
+    classmethod записывается в гистограмму service_method_duration_seconds,
+    а сам вызов оборачивается в спан трассировки "Сервис.метод"
+    """
+    for name, attribute in list(vars(cls).items()):
+        if (
+            name.startswith("_")
+            or not isinstance(attribute, classmethod)
+            or not inspect.iscoroutinefunction(attribute.__func__)
+        ):
+            continue
+
+        histogram = SERVICE_LATENCY.labels(service=cls.__name__, method=name)
+        setattr(
+            cls,
+            name,
+            classmethod(_timed(attribute.__func__, histogram, f"{cls.__name__}.{name}")),
+        )
+
+    return cls
+
+
+def _timed(func: Callable, histogram: Histogram, span_name: str) -> Callable:
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+
+        try:
+            with tracer.start_as_current_span(span_name):
+                return await func(*args, **kwargs)
+        finally:
+            histogram.observe(time.perf_counter() - started)
+
+    return wrapper
+
+
+class PrometheusMiddleware:
+    """
+    Сбор метрик запросов к API: гистограмма задержки по шаблону маршрута
+    (например, /api/tweets/{tweet_id}/likes), количество запросов в обработке
+    и результаты обращения к кэшу ответов
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        cache_status = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, cache_status
+
+            if message["type"] == "http.response.start":
+                status = message["status"]
+
+                for header, value in message.get("headers", ()):
+                    if header.lower() == CACHE_STATUS_HEADER:
+                        cache_status = value.decode().lower()
+
+            await send(message)
+
+        in_progress = REQUESTS_IN_PROGRESS.labels(method=method)
+        in_progress.inc()
+        started = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+
+            # Шаблон маршрута известен только после маршрутизации; для
+            # ненайденных путей используется общая метка, чтобы не плодить серии
+            route = scope.get("route")
+            route_path = getattr(route, "path", "<unmatched>")
+
+            REQUEST_LATENCY.labels(
+                method=method, route=route_path, status=str(status)
+            ).observe(time.perf_counter() - started)
+
+            if cache_status is not None:
+                CACHE_REQUESTS.labels(route=route_path, result=cache_status).inc()
+
+
+class PoolCollector(Collector):
+    """
+    Метрики пулов соединений с БД, снимаемые в момент запроса /metrics
+    """
+
+    def __init__(self, engines: Callable[[], Dict[str, AsyncEngine]]) -> None:
+        self.engines = engines
+
+    def collect(self) -> Iterator[Metric]:
+        checked_out = GaugeMetricFamily(
+            "db_pool_checked_out", "Занятые соединения пула", labels=("pool",)
+        )
+        checked_in = GaugeMetricFamily(
+            "db_pool_checked_in", "Свободные соединения пула", labels=("pool",)
+        )
+        overflow = GaugeMetricFamily(
+            "db_pool_overflow", "Соединения сверх pool_size", labels=("pool",)
+        )
+        timeouts = CounterMetricFamily(
+            "db_pool_timeouts", "Таймауты ожидания соединения", labels=("pool",)
+        )
+        wait = HistogramMetricFamily(
+            "db_pool_wait_seconds", "Время ожидания соединения из пула", labels=("pool",)
+        )
+
+        for name, engine in self.engines().items():
+            snapshot = pool_snapshot(engine.sync_engine)
+
+            checked_out.add_metric((name,), snapshot["checked_out"])
+            checked_in.add_metric((name,), snapshot["checked_in"])
+            overflow.add_metric((name,), snapshot["overflow"])
+            timeouts.add_metric((name,), snapshot["timeouts"])
+            wait.add_metric(
+                (name,),
+                buckets=[
+                    ("+Inf" if bound == "inf" else bound, count)
+                    for bound, count in snapshot["wait_histogram"].items()
+                ],
+                sum_value=snapshot["wait_seconds_sum"],
+            )
+
+        yield from (checked_out, checked_in, overflow, timeouts, wait)
+
+
+def connect_celery_metrics() -> None:
+    """
+    Подключение метрик отправки задач к сигналам Celery. Вызывается при загрузке
+    задач (app.services.tasks): приложение API не загружает Celery до первой
+    отправки задачи. Повторный вызов ничего не меняет.
+    """
+    from celery.signals import after_task_publish, before_task_publish
+
+    # dispatch_uid исключает повторное подключение
+    before_task_publish.connect(
+        _before_task_publish, weak=False, dispatch_uid="metrics_before_task_publish"
+    )
+    after_task_publish.connect(
+        _after_task_publish, weak=False, dispatch_uid="metrics_after_task_publish"
+    )
+
+
+# Время начала отправки задач Celery по id задачи (в порядке начала отправки)
+_publish_started: Dict[str, float] = {}
+# Отправка, не завершившаяся за это время, считается неудавшейся
+PUBLISH_STALE_SECONDS = 60.0
+
+
+def _before_task_publish(headers: Dict = None, **kwargs) -> None:
+    now = time.perf_counter()
+
+    # При ошибке отправки (брокер недоступен) after_task_publish не приходит:
+    # такие записи удаляются, чтобы словарь не рос в долгоживущем процессе
+    for task_id, started in list(_publish_started.items()):
+        if now - started < PUBLISH_STALE_SECONDS:
+            break
+
+        del _publish_started[task_id]
+
+    if headers and "id" in headers:
+        _publish_started[headers["id"]] = now
+
+
+def _after_task_publish(headers: Dict = None, sender: str = None, **kwargs) -> None:
+    started = _publish_started.pop((headers or {}).get("id"), None)
+
+    if started is not None:
+        CELERY_PUBLISH_LATENCY.labels(task=sender).observe(time.perf_counter() - started)
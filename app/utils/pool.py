@@ -0,0 +1,102 @@
+import time
+from bisect import bisect_left
+from typing import Dict, List
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, PoolProxiedConnection
+
+# Верхние границы корзин гистограммы ожидания соединения (в секундах)
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class PoolStats:
+    """
+    Накопленная статистика выдачи соединений из пула
+    """
+
+    __slots__ = ("bucket_counts", "wait_count", "wait_sum", "timeouts")
+
+    def __init__(self) -> None:
+        self.bucket_counts: List[int] = [0] * (len(WAIT_BUCKETS) + 1)
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.timeouts = 0
+
+    def observe_wait(self, seconds: float) -> None:
+        """
+        Учёт времени ожидания соединения
+        :param seconds: время ожидания в секундах
+        :return: None
+        """
+        self.bucket_counts[bisect_left(WAIT_BUCKETS, seconds)] += 1
+        self.wait_count += 1
+        self.wait_sum += seconds
+
+    def histogram(self) -> Dict[str, int]:
+        """
+        Кумулятивная гистограмма ожидания в формате "верхняя граница -> количество"
+        """
+        result = {}
+        total = 0
+
+        for bound, count in zip(WAIT_BUCKETS + (float("inf"),), self.bucket_counts):
+            total += count
+            result[str(bound)] = total
+
+        return result
+
+
+class MeteredQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул соединений, замеряющий время ожидания соединения и количество таймаутов
+    """
+
+    @property
+    def stats(self) -> PoolStats:
+        # Пул создаётся SQLAlchemy (в т.ч. пересоздаётся при dispose), поэтому
+        # статистика заводится лениво, а не в __init__
+        try:
+            return self._stats
+        except AttributeError:
+            self._stats = PoolStats()
+            return self._stats
+
+    def connect(self) -> PoolProxiedConnection:
+        started = time.perf_counter()
+
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+
+        self.stats.observe_wait(time.perf_counter() - started)
+
+        return connection
+
+
+def pool_snapshot(engine: Engine) -> Dict:
+    """
+    Текущее состояние пула соединений движка
+    :param engine: синхронный движок (engine.sync_engine для асинхронного)
+    :return: словарь с метриками пула
+    """
+    pool = engine.pool
+    snapshot = {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+    }
+
+    if isinstance(pool, MeteredQueuePool):
+        stats = pool.stats
+        snapshot.update(
+            timeouts=stats.timeouts,
+            wait_count=stats.wait_count,
+            wait_seconds_sum=round(stats.wait_sum, 6),
+            wait_histogram=stats.histogram(),
+        )
+
+    return snapshot
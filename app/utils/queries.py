@@ -0,0 +1,133 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Заголовки ответа с количеством SQL-запросов и временем работы БД (в мс)
+QUERY_COUNT_HEADER = b"x-db-query-count"
+QUERY_TIME_HEADER = b"x-db-query-time"
+
+
+class QueryStats:
+    """
+    Статистика SQL-запросов в пределах запроса к API (или блока кода в тестах)
+    """
+
+    __slots__ = ("count", "duration", "statements")
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.duration = 0.0
+        self.statements: List[str] = []
+
+    def observe(self, statement: str, seconds: float) -> None:
+        """
+        Учёт выполненного выражения
+        :param statement: текст SQL-выражения
+        :param seconds: время выполнения в секундах
+        :return: None
+        """
+        self.count += 1
+        self.duration += seconds
+        self.statements.append(statement)
+
+
+# Статистика текущего запроса. Хранится изменяемый объект, поэтому учёт работает
+# и в скопированных контекстах (задачи asyncio, greenlet SQLAlchemy)
+_current_stats: ContextVar[QueryStats | None] = ContextVar("query_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats.get() is not None:
+        conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats.get()
+
+    if stats is not None and conn.info.get("query_started_at"):
+        stats.observe(statement, time.perf_counter() - conn.info["query_started_at"].pop())
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Подсчёт SQL-запросов, выполненных внутри блока (всеми движками SQLAlchemy)
+    :return: объект статистики, заполняемый по мере выполнения запросов
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@contextmanager
+def assert_max_queries(budget: int) -> Iterator[QueryStats]:
+    """
+    Проверка бюджета SQL-запросов: блок не должен выполнять больше budget запросов.
+    Используется в тестах, чтобы лишний запрос к БД (например, N+1) ломал сборку.
+    :param budget: допустимое количество запросов
+    :return: объект статистики
+    """
+    with track_queries() as stats:
+        yield stats
+
+    if stats.count > budget:
+        statements = "\n".join(
+            f"{number}. {statement}" for number, statement in enumerate(stats.statements, 1)
+        )
+
+        raise AssertionError(
+            f"Превышен бюджет SQL-запросов: {stats.count} > {budget}\n{statements}"
+        )
+
+
+class QueryCountMiddleware:
+    """
+    Подсчёт SQL-запросов и времени работы БД для каждого запроса к API.
+    Результат добавляется в заголовки ответа X-DB-Query-Count и X-DB-Query-Time;
+    при превышении порога warn_threshold в лог пишется предупреждение.
+    """
+
+    def __init__(self, app: ASGIApp, warn_threshold: int = 0) -> None:
+        self.app = app
+        self.warn_threshold = warn_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = list(message.get("headers", []))
+                    headers.append((QUERY_COUNT_HEADER, str(stats.count).encode()))
+                    headers.append(
+                        (QUERY_TIME_HEADER, f"{stats.duration * 1000:.2f}".encode())
+                    )
+                    message["headers"] = headers
+
+                    if self.warn_threshold and stats.count > self.warn_threshold:
+                        logger.warning(
+                            "{} {}: {} SQL-запросов ({:.2f} мс)",
+                            scope["method"],
+                            scope["path"],
+                            stats.count,
+                            stats.duration * 1000,
+                        )
+
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
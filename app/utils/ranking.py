@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from app.config import (
+    FEED_RANK_AFFINITY_HALF_LIFE,
+    FEED_RANK_AFFINITY_WEIGHT,
+    FEED_RANK_RECENCY_HALF_LIFE,
+    FEED_RANK_RECENCY_WEIGHT,
+    FEED_RANK_VELOCITY_HALF_LIFE,
+    FEED_RANK_VELOCITY_WEIGHT,
+)
+
+# Колонки массива кандидатов (строки запроса кандидатов ранжированной ленты)
+(
+    CANDIDATE_ID,
+    CANDIDATE_AUTHOR,
+    CANDIDATE_CREATED,
+    CANDIDATE_VELOCITY,
+    CANDIDATE_VELOCITY_AT,
+    CANDIDATE_AFFINITY,
+    CANDIDATE_AFFINITY_AT,
+) = range(7)
+
+@dataclass(frozen=True, slots=True)
+class RankingWeights:
+    """
+    Веса составляющих оценки и периоды полураспада (в секундах)
+    """
+
+    recency: float = FEED_RANK_RECENCY_WEIGHT
+    velocity: float = FEED_RANK_VELOCITY_WEIGHT
+    affinity: float = FEED_RANK_AFFINITY_WEIGHT
+    recency_half_life: float = FEED_RANK_RECENCY_HALF_LIFE
+    velocity_half_life: float = FEED_RANK_VELOCITY_HALF_LIFE
+    affinity_half_life: float = FEED_RANK_AFFINITY_HALF_LIFE
+
+
+def decayed(values: np.ndarray, updated_at: np.ndarray, now: float, half_life: float) -> np.ndarray:
+    """
+    Значения затухающих счётчиков на момент now
+    """
+    return values * np.exp2(-np.maximum(now - updated_at, 0) / half_life)
+
+
+def score_candidates(candidates: np.ndarray, now: float, weights: RankingWeights) -> np.ndarray:
+    """
+    Оценка всех кандидатов сразу (векторно):
+    recency * 2^(-возраст / T) + velocity * ln(1 + лайки) + affinity * ln(1 + близость к автору)
+    :param candidates: массив (n, 7): id, автор, created_at, скорость лайков и её время,
+    близость пользователя к автору и её время (время - unix time)
+    :param now: текущее время (unix time)
+    :param weights: веса и периоды полураспада
+    :return: оценки кандидатов (n,)
+    """
+    recency = np.exp2(
+        -np.maximum(now - candidates[:, CANDIDATE_CREATED], 0) / weights.recency_half_life
+    )
+    velocity = decayed(
+        candidates[:, CANDIDATE_VELOCITY],
+        candidates[:, CANDIDATE_VELOCITY_AT],
+        now,
+        weights.velocity_half_life,
+    )
+    affinity = decayed(
+        candidates[:, CANDIDATE_AFFINITY],
+        candidates[:, CANDIDATE_AFFINITY_AT],
+        now,
+        weights.affinity_half_life,
+    )
+
+    return (
+        weights.recency * recency
+        + weights.velocity * np.log1p(velocity)
+        + weights.affinity * np.log1p(affinity)
+    )
+
+
+def rank_candidates(
+    candidates: np.ndarray, now: float, limit: int, weights: RankingWeights = RankingWeights()
+) -> np.ndarray:
+    """
+    Индексы limit лучших кандидатов по убыванию оценки (при равных оценках
+    сохраняется исходный порядок - от новых к старым)
+    """
+    scores = score_candidates(candidates, now, weights)
+
+    return np.argsort(-scores, kind="stable")[:limit]
@@ -0,0 +1,224 @@
+"""
+Ограничение частоты запросов на запись (token bucket).
+
+Корзина ёмкостью capacity пополняется на capacity токенов за period секунд,
+каждый запрос забирает один токен. Все корзины запроса (пользователь, IP)
+проверяются и списываются одним Lua-скриптом в Redis - атомарно и за один
+обмен с сервером, время берётся с сервера Redis (общее для всех процессов).
+Если Redis не настроен или недоступен, используются корзины в памяти процесса
+(лимит тогда действует на каждый процесс отдельно).
+
+IP клиента - request.client.host: за балансировщиком он берётся uvicorn из
+X-Forwarded-For, только если адрес балансировщика указан в SERVER_FORWARDED_ALLOW_IPS.
+"""
+import hashlib
+import math
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from http import HTTPStatus
+from typing import List, Optional, Tuple
+
+from fastapi import Request
+from loguru import logger
+
+from app.config import CACHE_PREFIX, RATE_LIMIT_ENABLED, RATE_LIMIT_LOCAL_MAX_KEYS
+from app.utils.cache import cache_backend
+from app.utils.exeptions import CustomApiException
+from app.utils.metrics import RATE_LIMIT_DECISIONS
+from app.utils.token import TOKEN
+
+# KEYS - корзины, ARGV - ёмкость и скорость пополнения (токенов в секунду)
+# каждой корзины. Токены списываются, только если их хватает во всех корзинах.
+# Возвращает время до появления токена (строкой: числа Lua приводятся к целым), "0" - разрешено
+TOKEN_BUCKET_SCRIPT = """
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local retry_after = 0
+local tokens = {}
+
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+    local bucket = redis.call('HMGET', key, 'tokens', 'updated_at')
+    local available = tonumber(bucket[1]) or capacity
+    local updated_at = tonumber(bucket[2]) or now
+
+    available = math.min(capacity, available + math.max(now - updated_at, 0) * rate)
+    tokens[i] = available
+
+    if available < 1 then
+        retry_after = math.max(retry_after, (1 - available) / rate)
+    end
+end
+
+if retry_after > 0 then
+    return tostring(retry_after)
+end
+
+for i, key in ipairs(KEYS) do
+    local capacity = tonumber(ARGV[2 * i - 1])
+    local rate = tonumber(ARGV[2 * i])
+
+    redis.call('HSET', key, 'tokens', tokens[i] - 1, 'updated_at', now)
+    redis.call('PEXPIRE', key, math.ceil(capacity / rate * 1000))
+end
+
+return '0'
+"""
+
+
+@dataclass(frozen=True, slots=True)
+class RatePolicy:
+    """
+    Политика корзины: ёмкость и время полного восстановления (секунды)
+    """
+
+    capacity: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.capacity / self.period
+
+    @classmethod
+    def parse(cls, spec: str) -> Optional["RatePolicy"]:
+        """
+        Политика из настройки вида "30/60" (пусто - без ограничения)
+        """
+        if not spec.strip():
+            return None
+
+        capacity, period = spec.split("/")
+
+        return cls(capacity=int(capacity), period=float(period))
+
+
+class LocalBuckets:
+    """
+    Корзины в памяти процесса (LRU с ограничением количества): запасной
+    вариант при недоступности Redis
+    """
+
+    def __init__(self, max_keys: int = RATE_LIMIT_LOCAL_MAX_KEYS) -> None:
+        self.max_keys = max_keys
+        # Ключ -> (токены, время обновления по time.monotonic)
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    def acquire(
+        self, buckets: List[Tuple[str, RatePolicy]], now: Optional[float] = None
+    ) -> float:
+        """
+        Списание токена из всех корзин (только если его хватает в каждой)
+        :param buckets: ключи корзин и их политики
+        :param now: текущее время (time.monotonic)
+        :return: время до появления токена в секундах, 0 - запрос разрешён
+        """
+        now = time.monotonic() if now is None else now
+        retry_after = 0.0
+        available = []
+
+        for key, policy in buckets:
+            tokens, updated_at = self._buckets.get(key, (policy.capacity, now))
+            tokens = min(policy.capacity, tokens + max(now - updated_at, 0) * policy.rate)
+            available.append(tokens)
+
+            if tokens < 1:
+                retry_after = max(retry_after, (1 - tokens) / policy.rate)
+
+        if retry_after:
+            return retry_after
+
+        for (key, _), tokens in zip(buckets, available):
+            self._buckets[key] = (tokens - 1, now)
+            self._buckets.move_to_end(key)
+
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+        return 0.0
+
+
+local_buckets = LocalBuckets()
+
+
+class RateLimit:
+    """
+    Зависимость FastAPI: ограничение частоты запросов к эндпоинту
+    по пользователю (api-key) и по IP клиента. При превышении - 429
+    с заголовком Retry-After.
+        @router.post("", dependencies=[Depends(RateLimit("tweet", user="30/60", ip="120/60"))])
+    """
+
+    def __init__(self, name: str, user: str = "", ip: str = "") -> None:
+        self.name = name
+        self.user = RatePolicy.parse(user)
+        self.ip = RatePolicy.parse(ip)
+        self._script = None
+
+    def buckets(self, request: Request) -> List[Tuple[str, RatePolicy]]:
+        """
+        Корзины запроса. Пользователь определяется по api-key без обращения
+        к БД (ключ хранится в виде хэша), запросы без ключа учитываются только по IP.
+        """
+        prefix = f"{CACHE_PREFIX}:ratelimit:{self.name}"
+        buckets = []
+        token = request.headers.get(TOKEN.model.name)
+
+        if self.user is not None and token:
+            digest = hashlib.blake2b(token.encode(), digest_size=16).hexdigest()
+            buckets.append((f"{prefix}:user:{digest}", self.user))
+
+        if self.ip is not None and request.client is not None:
+            buckets.append((f"{prefix}:ip:{request.client.host}", self.ip))
+
+        return buckets
+
+    async def acquire(self, buckets: List[Tuple[str, RatePolicy]]) -> Tuple[float, str]:
+        """
+        Списание токенов в Redis, при его недоступности - в памяти процесса
+        :return: время до появления токена (0 - разрешено) и использованное хранилище
+        """
+        redis = cache_backend.redis
+
+        if redis is not None:
+            if self._script is None:
+                # Script выполняет EVALSHA и сам загружает скрипт при NOSCRIPT
+                self._script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+            try:
+                retry_after = await self._script(
+                    keys=[key for key, _ in buckets],
+                    args=[value for _, policy in buckets for value in (policy.capacity, policy.rate)],
+                    client=redis,
+                )
+
+                return float(retry_after), "redis"
+
+            except Exception as exc:
+                logger.warning("Ограничение частоты запросов без Redis: {}", exc)
+
+        return local_buckets.acquire(buckets), "local"
+
+    async def __call__(self, request: Request) -> None:
+        if not RATE_LIMIT_ENABLED:
+            return
+
+        buckets = self.buckets(request)
+
+        if not buckets:
+            return
+
+        retry_after, backend = await self.acquire(buckets)
+        RATE_LIMIT_DECISIONS.labels(
+            self.name, "rejected" if retry_after else "allowed", backend
+        ).inc()
+
+        if retry_after:
+            logger.warning("Превышена частота запросов: {}", self.name)
+
+            raise CustomApiException(
+                status_code=HTTPStatus.TOO_MANY_REQUESTS,  # 429
+                detail="Too many requests",
+                headers={"Retry-After": str(math.ceil(retry_after))},
+            )
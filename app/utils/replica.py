@@ -0,0 +1,183 @@
+import hashlib
+import itertools
+import math
+import time
+from typing import Callable, Dict, NamedTuple, Optional, Sequence
+
+from loguru import logger
+from redis import asyncio as aioredis
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from starlette.requests import Request
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Методы, которые не изменяют данные и могут обслуживаться репликой
+READ_METHODS = frozenset(("GET", "HEAD", "OPTIONS"))
+
+
+class Replica(NamedTuple):
+    """
+    Реплика для чтения: фабрика сессий и функция оценки текущей нагрузки
+    (количество занятых соединений пула)
+    """
+
+    session_maker: async_sessionmaker
+    load: Callable[[], int]
+
+
+class ReplicaRouter:
+    """
+    Выбор фабрики сессий для запроса: изменяющие запросы и запросы пользователя
+    в течение окна read-your-writes после изменения идут в основную БД,
+    остальные чтения распределяются по репликам.
+
+    Окно read-your-writes хранится в Redis (ключ со сроком жизни окна), чтобы
+    его видели все воркеры и экземпляры приложения; без Redis - только в памяти
+    процесса, выполнившего запись
+    """
+
+    # Порог размера реестра записей, после которого из него удаляются устаревшие ключи
+    max_tracked_writers = 100_000
+
+    def __init__(
+        self,
+        primary: async_sessionmaker,
+        replicas: Sequence[Replica] = (),
+        strategy: str = "round_robin",
+        read_your_writes_seconds: float = 5.0,
+        redis: Callable[[], Optional[aioredis.Redis]] = lambda: None,
+        key_prefix: str = "fastapi-cache",
+    ) -> None:
+        if strategy not in ("round_robin", "least_loaded"):
+            raise ValueError(f"Неизвестная стратегия выбора реплики: {strategy}")
+
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.strategy = strategy
+        self.read_your_writes_seconds = read_your_writes_seconds
+        self.redis = redis
+        self.key_prefix = key_prefix
+        self._cycle = itertools.cycle(self.replicas)
+        self._writers: Dict[str, float] = {}
+
+    def _redis_key(self, key: str) -> str:
+        # api-key не хранится в Redis в открытом виде
+        return "{}:ryw:{}".format(
+            self.key_prefix, hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        )
+
+    async def mark_write(self, key: str) -> None:
+        """
+        Фиксация изменения данных пользователем
+        :param key: идентификатор клиента (api-key)
+        :return: None
+        """
+        now = time.monotonic()
+
+        if len(self._writers) >= self.max_tracked_writers:
+            self._writers = {
+                writer: deadline
+                for writer, deadline in self._writers.items()
+                if deadline > now
+            }
+
+        self._writers[key] = now + self.read_your_writes_seconds
+        redis = self.redis()
+
+        if redis is None or self.read_your_writes_seconds <= 0:
+            return
+
+        try:
+            await redis.set(
+                self._redis_key(key), b"1", px=math.ceil(self.read_your_writes_seconds * 1000)
+            )
+        except Exception as exc:
+            logger.warning("Окно read-your-writes только в памяти процесса: {}", exc)
+
+    async def recently_wrote(self, key: str | None) -> bool:
+        """
+        Проверка, изменял ли пользователь данные в пределах окна read-your-writes
+        (в этом процессе или, по Redis, в любом другом)
+        :param key: идентификатор клиента (api-key)
+        :return: True - если окно ещё не истекло | False - иначе
+        """
+        if key is None:
+            return False
+
+        deadline = self._writers.get(key)
+
+        if deadline is not None and deadline > time.monotonic():
+            return True
+
+        redis = self.redis()
+
+        if redis is None:
+            return False
+
+        try:
+            return bool(await redis.exists(self._redis_key(key)))
+        except Exception as exc:
+            logger.warning("Не удалось проверить окно read-your-writes: {}", exc)
+            return False
+
+    def choose_replica(self) -> async_sessionmaker:
+        """
+        Выбор реплики согласно стратегии
+        :return: фабрика сессий реплики
+        """
+        if self.strategy == "least_loaded":
+            return min(self.replicas, key=lambda replica: replica.load()).session_maker
+
+        return next(self._cycle).session_maker
+
+    async def session_maker_for(self, request: Request) -> async_sessionmaker:
+        """
+        Выбор фабрики сессий для запроса
+        :param request: текущий запрос
+        :return: фабрика сессий основной БД или реплики
+        """
+        if not self.replicas or request.method not in READ_METHODS:
+            return self.primary
+
+        # Сессии запроса (пользователь, эндпоинт) открываются по отдельности:
+        # окно проверяется один раз
+        recently_wrote = getattr(request.state, "recently_wrote", None)
+
+        if recently_wrote is None:
+            recently_wrote = await self.recently_wrote(request.headers.get("api-key"))
+            request.state.recently_wrote = recently_wrote
+
+        if recently_wrote:
+            return self.primary
+
+        return self.choose_replica()
+
+
+class ReadYourWritesMiddleware:
+    """
+    Отмечает клиентов, выполнивших изменяющий запрос, чтобы их последующие
+    чтения в пределах окна read-your-writes шли в основную БД
+    """
+
+    def __init__(self, app: ASGIApp, router: ReplicaRouter) -> None:
+        self.app = app
+        self.router = router
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or not self.router.replicas
+            or scope["method"] in READ_METHODS
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        api_key = Request(scope).headers.get("api-key")
+
+        async def send_wrapper(message: Message) -> None:
+            # Окно отсчитывается от момента ответа, т.е. после фиксации транзакции
+            if message["type"] == "http.response.start" and api_key:
+                await self.router.mark_write(api_key)
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,47 @@
+import base64
+import binascii
+import datetime
+import struct
+from dataclasses import dataclass
+from http import HTTPStatus
+
+from app.utils.exeptions import CustomApiException
+
+# Курсор страницы поиска: релевантность (float4, как её возвращает ts_rank_cd),
+# id последнего твита страницы, граница "горячего" окна (секунды от эпохи, UTC)
+# и признак того, что поиск перешёл к твитам старше окна
+SEARCH_CURSOR = struct.Struct("!fqq?")
+EPOCH = datetime.datetime(1970, 1, 1)
+
+
+@dataclass(slots=True)
+class SearchCursor:
+    """
+    Позиция в результатах поиска: следующая страница начинается с твитов,
+    которые в порядке (rank DESC, id DESC) идут после (rank, id) в том же окне.
+    Граница окна сохраняется, чтобы страницы не смещались со временем.
+    """
+
+    rank: float
+    tweet_id: int
+    hot_from: datetime.datetime
+    cold: bool = False
+
+    def encode(self) -> str:
+        seconds = int((self.hot_from - EPOCH).total_seconds())
+
+        return base64.urlsafe_b64encode(
+            SEARCH_CURSOR.pack(self.rank, self.tweet_id, seconds, self.cold)
+        ).decode()
+
+    @classmethod
+    def decode(cls, value: str) -> "SearchCursor":
+        try:
+            rank, tweet_id, seconds, cold = SEARCH_CURSOR.unpack(base64.urlsafe_b64decode(value))
+
+            return cls(rank, tweet_id, EPOCH + datetime.timedelta(seconds=seconds), cold)
+        except (binascii.Error, struct.error, ValueError, OverflowError):
+            raise CustomApiException(
+                status_code=HTTPStatus.UNPROCESSABLE_ENTITY,  # 422
+                detail="Invalid search cursor",
+            )
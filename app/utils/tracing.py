@@ -0,0 +1,321 @@
+import json
+import threading
+import time
+from typing import Dict, Optional, Sequence, Tuple
+
+from fastapi_cache.backends.redis import RedisBackend
+from opentelemetry import context, propagate, trace
+from opentelemetry.propagators.textmap import Getter
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SimpleSpanProcessor,
+    SpanExporter,
+    SpanExportResult,
+)
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import TRACING_EXPORTER, TRACING_FILE, TRACING_SERVICE_NAME
+
+# Трассировщик приложения. До вызова setup_tracing спаны не записываются
+# (используется провайдер OpenTelemetry по умолчанию)
+tracer = trace.get_tracer("app")
+
+# Заголовок ответа с id трассировки (для поиска трассировки по запросу)
+TRACE_ID_HEADER = b"x-trace-id"
+
+_configured_exporter: Optional[SpanExporter] = None
+
+
+class FileSpanExporter(SpanExporter):
+    """
+    Запись завершённых спанов в файл (одна JSON-строка на спан) для локальной отладки
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        with self._lock:
+            for span in spans:
+                self._file.write(json.dumps(json.loads(span.to_json()), ensure_ascii=False))
+                self._file.write("\n")
+
+            self._file.flush()
+
+        return SpanExportResult.SUCCESS
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+def create_exporter(name: str) -> Tuple[SpanExporter, bool]:
+    """
+    Создание экспортёра спанов по названию
+    :param name: console | memory | file | otlp
+    :return: экспортёр и признак пакетной отправки
+    """
+    if name == "console":
+        return ConsoleSpanExporter(), False
+
+    if name == "memory":
+        return InMemorySpanExporter(), False
+
+    if name == "file":
+        return FileSpanExporter(TRACING_FILE), True
+
+    if name == "otlp":
+        # Необязательная зависимость: opentelemetry-exporter-otlp
+        from opentelemetry.exporter.otlp.proto.grpc.trace_exporter import OTLPSpanExporter
+
+        return OTLPSpanExporter(), True
+
+    raise ValueError(f"Неизвестный экспортёр трассировки: {name}")
+
+
+def setup_tracing(exporter_name: str = TRACING_EXPORTER) -> Optional[SpanExporter]:
+    """
+    Настройка трассировки: провайдер спанов, экспортёр и спаны SQL-запросов
+    (передача контекста в задачи Celery - connect_celery_tracing).
+    Повторный вызов ничего не меняет.
+    :param exporter_name: название экспортёра (none - трассировка отключена)
+    :return: экспортёр спанов или None
+    """
+    global _configured_exporter
+
+    if exporter_name == "none" or _configured_exporter is not None:
+        return _configured_exporter
+
+    exporter, batch = create_exporter(exporter_name)
+    provider = TracerProvider(resource=Resource.create({"service.name": TRACING_SERVICE_NAME}))
+    provider.add_span_processor(
+        BatchSpanProcessor(exporter) if batch else SimpleSpanProcessor(exporter)
+    )
+    trace.set_tracer_provider(provider)
+
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+    _configured_exporter = exporter
+
+    return exporter
+
+
+def connect_celery_tracing() -> None:
+    """
+    Передача контекста трассировки в задачи Celery: спаны отправки и выполнения
+    задач. Вызывается при загрузке задач (app.services.tasks) и в процессе
+    воркера после setup_tracing: приложение API не загружает Celery до первой
+    отправки задачи. Без настроенной трассировки и при повторном вызове ничего не делает.
+    """
+    if _configured_exporter is None:
+        return
+
+    from celery.signals import (
+        after_task_publish,
+        before_task_publish,
+        task_postrun,
+        task_prerun,
+    )
+
+    # dispatch_uid исключает повторное подключение
+    before_task_publish.connect(
+        _before_task_publish, weak=False, dispatch_uid="tracing_before_task_publish"
+    )
+    after_task_publish.connect(
+        _after_task_publish, weak=False, dispatch_uid="tracing_after_task_publish"
+    )
+    task_prerun.connect(_task_prerun, weak=False, dispatch_uid="tracing_task_prerun")
+    task_postrun.connect(_task_postrun, weak=False, dispatch_uid="tracing_task_postrun")
+
+
+class TracingMiddleware:
+    """
+    Корневой спан запроса к API. Контекст берётся из заголовка traceparent
+    (если запрос пришёл от другого сервиса), id трассировки возвращается
+    в заголовке X-Trace-Id
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {
+            name.decode("latin-1"): value.decode("latin-1")
+            for name, value in scope.get("headers", ())
+        }
+
+        with tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}",
+            context=propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"http.method": scope["method"], "http.target": scope["path"]},
+        ) as span:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    span.set_attribute("http.status_code", message["status"])
+
+                    if span.is_recording():
+                        headers = list(message.get("headers", []))
+                        headers.append(
+                            (TRACE_ID_HEADER, f"{span.get_span_context().trace_id:032x}".encode())
+                        )
+                        message["headers"] = headers
+
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+            # Шаблон маршрута известен только после маршрутизации
+            route = getattr(scope.get("route"), "path", None)
+
+            if route is not None:
+                span.set_attribute("http.route", route)
+                span.update_name(f"{scope['method']} {route}")
+
+
+class TracedRedisBackend(RedisBackend):
+    """
+    Бэкенд fastapi-cache со спанами на каждое обращение к Redis
+    """
+
+    async def get_with_ttl(self, key: str):
+        with tracer.start_as_current_span(
+            "redis GET", kind=SpanKind.CLIENT, attributes={"db.system": "redis"}
+        ):
+            return await super().get_with_ttl(key)
+
+    async def get(self, key: str):
+        with tracer.start_as_current_span(
+            "redis GET", kind=SpanKind.CLIENT, attributes={"db.system": "redis"}
+        ):
+            return await super().get(key)
+
+    async def set(self, key: str, value, expire: Optional[int] = None) -> None:
+        with tracer.start_as_current_span(
+            "redis SET", kind=SpanKind.CLIENT, attributes={"db.system": "redis"}
+        ):
+            return await super().set(key, value, expire)
+
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        with tracer.start_as_current_span(
+            "redis CLEAR", kind=SpanKind.CLIENT, attributes={"db.system": "redis"}
+        ):
+            return await super().clear(namespace, key)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context_, executemany):
+    span = tracer.start_span(
+        statement.split(None, 1)[0].upper() if statement else "SQL",
+        kind=SpanKind.CLIENT,
+        attributes={"db.system": "postgresql", "db.statement": statement},
+    )
+    conn.info.setdefault("tracing_spans", []).append(span)
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context_, executemany):
+    if conn.info.get("tracing_spans"):
+        conn.info["tracing_spans"].pop().end()
+
+
+def _handle_error(exception_context) -> None:
+    conn = exception_context.connection
+
+    if conn is not None and conn.info.get("tracing_spans"):
+        span = conn.info["tracing_spans"].pop()
+        span.set_status(Status(StatusCode.ERROR, str(exception_context.original_exception)))
+        span.end()
+
+
+class _CeleryRequestGetter(Getter):
+    """
+    Чтение контекста трассировки из запроса задачи Celery: дополнительные
+    заголовки сообщения доступны как атрибуты task.request
+    """
+
+    def get(self, carrier, key: str):
+        value = getattr(carrier, key, None)
+        return [value] if isinstance(value, str) else None
+
+    def keys(self, carrier):
+        return []
+
+
+# Спаны отправки задач по id задачи (время начала, спан; в порядке начала отправки)
+# и выполнения задач (спан, токен контекста)
+_publish_spans: Dict[str, Tuple[float, trace.Span]] = {}
+_task_spans: Dict[str, Tuple[trace.Span, object]] = {}
+# Отправка, не завершившаяся за это время, считается неудавшейся
+PUBLISH_STALE_SECONDS = 60.0
+
+
+def _end_stale_publish_spans(now: float) -> None:
+    """
+    Завершение спанов неудавшихся отправок: при ошибке отправки (брокер
+    недоступен) after_task_publish не приходит, и спан остался бы в словаре навсегда
+    """
+    for task_id, (started, span) in list(_publish_spans.items()):
+        if now - started < PUBLISH_STALE_SECONDS:
+            break
+
+        del _publish_spans[task_id]
+        span.set_status(Status(StatusCode.ERROR, "Task publish did not complete"))
+        span.end()
+
+
+def _before_task_publish(sender: str = None, headers: Dict = None, **kwargs) -> None:
+    now = time.monotonic()
+    _end_stale_publish_spans(now)
+
+    if headers is None or "id" not in headers:
+        return
+
+    span = tracer.start_span(
+        f"celery publish {sender}",
+        kind=SpanKind.PRODUCER,
+        attributes={"celery.task_name": sender, "celery.task_id": headers["id"]},
+    )
+    propagate.inject(headers, context=trace.set_span_in_context(span))
+    _publish_spans[headers["id"]] = (now, span)
+
+
+def _after_task_publish(headers: Dict = None, **kwargs) -> None:
+    _, span = _publish_spans.pop((headers or {}).get("id"), (None, None))
+
+    if span is not None:
+        span.end()
+
+
+def _task_prerun(task_id: str = None, task=None, **kwargs) -> None:
+    span = tracer.start_span(
+        f"celery run {task.name}",
+        context=propagate.extract(task.request, getter=_CeleryRequestGetter()),
+        kind=SpanKind.CONSUMER,
+        attributes={"celery.task_name": task.name, "celery.task_id": task_id},
+    )
+    token = context.attach(trace.set_span_in_context(span))
+    _task_spans[task_id] = (span, token)
+
+
+def _task_postrun(task_id: str = None, state: str = None, **kwargs) -> None:
+    span, token = _task_spans.pop(task_id, (None, None))
+
+    if span is not None:
+        span.set_attribute("celery.state", state or "")
+        context.detach(token)
+        span.end()
@@ -0,0 +1,373 @@
+"""
+Потоковый подсчёт трендов (хэштеги по публикациям, твиты по лайкам) с памятью,
+ограниченной независимо от количества различных ключей.
+
+Время делится на окна по TRENDS_WINDOW_SECONDS, хранятся последние TRENDS_WINDOWS
+окон. В каждом окне - Count-Min Sketch (оценка частоты любого ключа) и
+Space-Saving (кандидаты в самые частые ключи). Вклад окна в оценку тренда
+затухает экспоненциально с его возрастом: score = sum(count * decay ** age).
+
+Каждый процесс копит события локально (TrendTracker.pending) и периодически
+сливает их в общий снимок в Redis, заодно получая из него свежее общее
+состояние; без Redis состояние хранится только в памяти процесса.
+"""
+import asyncio
+import hashlib
+import heapq
+import struct
+import time
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import orjson
+from loguru import logger
+from redis.exceptions import WatchError
+
+from app.config import (
+    CACHE_PREFIX,
+    TRENDS_DECAY,
+    TRENDS_FLUSH_INTERVAL,
+    TRENDS_SKETCH_DEPTH,
+    TRENDS_SKETCH_WIDTH,
+    TRENDS_TOP_K,
+    TRENDS_WINDOW_SECONDS,
+    TRENDS_WINDOWS,
+)
+from app.utils.cache import cache_backend
+
+# Заголовок снимка: ширина и глубина скетча, ёмкость top-k, количество окон
+SNAPSHOT_HEADER = struct.Struct("!IIII")
+# Заголовок окна: номер окна и длина списка кандидатов (JSON)
+WINDOW_HEADER = struct.Struct("!qI")
+TREND_STREAMS = ("hashtags", "tweets")
+
+
+class CountMinSketch:
+    """
+    Count-Min Sketch: depth строк по width счётчиков. Оценка частоты не меньше
+    истинной и превышает её не более чем на ~e/width от суммы всех счётчиков
+    (с вероятностью 1 - e^-depth)
+    """
+
+    __slots__ = ("width", "depth", "table")
+
+    def __init__(self, width: int, depth: int, table: Optional[array] = None) -> None:
+        self.width = width
+        self.depth = depth
+        self.table = table if table is not None else array("I", bytes(4 * width * depth))
+
+    def cells(self, key: str) -> List[int]:
+        """
+        Индексы счётчиков ключа (одинаковы для скетчей одного размера)
+        """
+        # Двойное хэширование: индексы всех строк из одного 128-битного хэша
+        # (стабильного между процессами, в отличие от hash())
+        first, second = struct.unpack(
+            "<QQ", hashlib.blake2b(key.encode(), digest_size=16).digest()
+        )
+
+        return [
+            row * self.width + (first + row * second) % self.width for row in range(self.depth)
+        ]
+
+    def add(self, key: str, count: int = 1) -> None:
+        for cell in self.cells(key):
+            self.table[cell] += count
+
+    def estimate(self, key: str, cells: Optional[List[int]] = None) -> int:
+        return min(self.table[cell] for cell in cells or self.cells(key))
+
+    def merge(self, other: "CountMinSketch") -> None:
+        for cell, count in enumerate(other.table):
+            if count:
+                self.table[cell] += count
+
+
+class SpaceSaving:
+    """
+    Space-Saving: не больше capacity счётчиков. Новый ключ при заполнении
+    вытесняет ключ с минимальным счётчиком и наследует его значение, поэтому
+    ключ с частотой больше total / capacity гарантированно остаётся в списке
+    """
+
+    __slots__ = ("capacity", "counts")
+
+    def __init__(self, capacity: int, counts: Optional[Dict[str, int]] = None) -> None:
+        self.capacity = capacity
+        self.counts = counts if counts is not None else {}
+
+    def add(self, key: str, count: int = 1) -> None:
+        if key in self.counts:
+            self.counts[key] += count
+        elif len(self.counts) < self.capacity:
+            self.counts[key] = count
+        else:
+            evicted = min(self.counts, key=self.counts.__getitem__)
+            self.counts[key] = self.counts.pop(evicted) + count
+
+    def merge(self, other: "SpaceSaving") -> None:
+        for key, count in other.counts.items():
+            self.counts[key] = self.counts.get(key, 0) + count
+
+        if len(self.counts) > self.capacity:
+            self.counts = dict(
+                heapq.nlargest(self.capacity, self.counts.items(), key=lambda item: item[1])
+            )
+
+
+class TrendCounter:
+    """
+    Скользящие окна (Count-Min Sketch + Space-Saving в каждом) с экспоненциальным
+    затуханием. Память: windows * (width * depth * 4 байт + top_k ключей)
+    """
+
+    def __init__(
+        self,
+        window_seconds: int = TRENDS_WINDOW_SECONDS,
+        windows: int = TRENDS_WINDOWS,
+        decay: float = TRENDS_DECAY,
+        width: int = TRENDS_SKETCH_WIDTH,
+        depth: int = TRENDS_SKETCH_DEPTH,
+        top_k: int = TRENDS_TOP_K,
+    ) -> None:
+        self.window_seconds = window_seconds
+        self.windows = windows
+        self.decay = decay
+        self.width = width
+        self.depth = depth
+        self.top_k = top_k
+        self.buckets: Dict[int, Tuple[CountMinSketch, SpaceSaving]] = {}
+
+    def _bucket(self, window: int) -> Optional[Tuple[CountMinSketch, SpaceSaving]]:
+        """
+        Окно по номеру (создаётся при необходимости, самые старые окна удаляются)
+        :return: скетч и кандидаты окна / None - окно уже вышло из рассмотрения
+        """
+        bucket = self.buckets.get(window)
+
+        if bucket is not None:
+            return bucket
+
+        latest = max(self.buckets, default=window)
+
+        if window <= latest - self.windows:
+            return None
+
+        bucket = self.buckets[window] = (CountMinSketch(self.width, self.depth), SpaceSaving(self.top_k))
+
+        for expired in [item for item in self.buckets if item <= window - self.windows]:
+            del self.buckets[expired]
+
+        return bucket
+
+    def add(self, key: str, now: float, count: int = 1) -> None:
+        """
+        Учёт события
+        :param key: ключ (хэштег, id твита)
+        :param now: время события (unix time)
+        :param count: вес события
+        :return: None
+        """
+        bucket = self._bucket(int(now // self.window_seconds))
+
+        if bucket is not None:
+            bucket[0].add(key, count)
+            bucket[1].add(key, count)
+
+    def merge(self, other: "TrendCounter") -> None:
+        """
+        Добавление событий другого счётчика с теми же параметрами
+        (окна выровнены по времени, поэтому сливаются по номеру)
+        """
+        for window, (sketch, top) in sorted(other.buckets.items(), reverse=True):
+            bucket = self._bucket(window)
+
+            if bucket is not None:
+                bucket[0].merge(sketch)
+                bucket[1].merge(top)
+
+    def top(self, limit: int, now: float) -> List[Tuple[str, float]]:
+        """
+        Самые популярные ключи с учётом затухания
+        :param limit: количество ключей
+        :param now: текущее время (unix time)
+        :return: список (ключ, оценка) по убыванию оценки
+        """
+        current = int(now // self.window_seconds)
+        buckets = [
+            (self.decay ** (current - window), sketch, top)
+            for window, (sketch, top) in self.buckets.items()
+            if current - self.windows < window <= current
+        ]
+        candidates = {key for _, _, top in buckets for key in top.counts}
+        scores = []
+
+        for key in candidates:
+            # Хэш ключа вычисляется один раз для всех окон
+            cells = buckets[0][1].cells(key)
+            scores.append(
+                (key, sum(weight * sketch.estimate(key, cells) for weight, sketch, _ in buckets))
+            )
+
+        return heapq.nlargest(limit, scores, key=lambda item: item[1])
+
+    def pack(self) -> bytes:
+        """
+        Снимок состояния для хранения в Redis
+        """
+        parts = [SNAPSHOT_HEADER.pack(self.width, self.depth, self.top_k, len(self.buckets))]
+
+        for window, (sketch, top) in sorted(self.buckets.items()):
+            counts = orjson.dumps(top.counts)
+            parts += [WINDOW_HEADER.pack(window, len(counts)), sketch.table.tobytes(), counts]
+
+        return b"".join(parts)
+
+    def load(self, data: bytes) -> None:
+        """
+        Восстановление состояния из снимка. Снимок с другими размерами скетча
+        или top-k (после смены настроек) пропускается.
+        """
+        width, depth, top_k, count = SNAPSHOT_HEADER.unpack_from(data)
+
+        if (width, depth, top_k) != (self.width, self.depth, self.top_k):
+            logger.warning("Снимок трендов с другими настройками пропущен")
+            return
+
+        offset = SNAPSHOT_HEADER.size
+        table_size = 4 * width * depth
+
+        for _ in range(count):
+            window, counts_size = WINDOW_HEADER.unpack_from(data, offset)
+            offset += WINDOW_HEADER.size
+            table = array("I")
+            table.frombytes(data[offset:offset + table_size])
+            offset += table_size
+            counts = orjson.loads(data[offset:offset + counts_size])
+            offset += counts_size
+
+            self.buckets[window] = (
+                CountMinSketch(width, depth, table),
+                SpaceSaving(top_k, counts),
+            )
+
+
+class TrendTracker:
+    """
+    Тренды процесса: события копятся в pending и раз в TRENDS_FLUSH_INTERVAL
+    сливаются в общий снимок (Redis, оптимистичная транзакция WATCH / MULTI),
+    после чего state - копия общего состояния
+    """
+
+    def __init__(self, flush_interval: float = TRENDS_FLUSH_INTERVAL) -> None:
+        self.flush_interval = flush_interval
+        self.pending = {stream: TrendCounter() for stream in TREND_STREAMS}
+        self.state = {stream: TrendCounter() for stream in TREND_STREAMS}
+        self._flusher: Optional[asyncio.Task] = None
+
+    def record(self, stream: str, keys: Iterable[str], now: Optional[float] = None) -> None:
+        """
+        Учёт событий (без обращений к сети)
+        :param stream: поток (hashtags / tweets)
+        :param keys: ключи событий
+        :param now: время событий (по умолчанию текущее)
+        :return: None
+        """
+        now = time.time() if now is None else now
+        counter = self.pending[stream]
+
+        for key in keys:
+            counter.add(key, now)
+
+    def top(self, stream: str, limit: int, now: Optional[float] = None) -> List[Tuple[str, float]]:
+        """
+        Тренды по последнему полученному общему состоянию
+        """
+        return self.state[stream].top(limit, time.time() if now is None else now)
+
+    async def flush(self) -> None:
+        """
+        Слияние накопленных событий с общим состоянием. При ошибке Redis
+        события остаются в pending до следующей попытки.
+        """
+        pending, self.pending = self.pending, {stream: TrendCounter() for stream in TREND_STREAMS}
+        redis = cache_backend.redis
+
+        for stream, counter in pending.items():
+            if redis is None:
+                self.state[stream].merge(counter)
+                continue
+
+            try:
+                self.state[stream] = await self._merge_remote(redis, stream, counter)
+            except Exception as exc:
+                logger.warning("Не удалось сохранить тренды {}: {}", stream, exc)
+                self.pending[stream].merge(counter)
+
+    @staticmethod
+    async def _merge_remote(redis, stream: str, counter: TrendCounter) -> TrendCounter:
+        key = f"{CACHE_PREFIX}:trends:{stream}"
+        ttl = counter.window_seconds * counter.windows
+
+        async with redis.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(key)
+                    state = TrendCounter()
+                    data = await pipe.get(key)
+
+                    if data:
+                        state.load(data)
+
+                    # Без новых событий снимок только читается
+                    if not counter.buckets:
+                        await pipe.unwatch()
+                        return state
+
+                    state.merge(counter)
+                    pipe.multi()
+                    pipe.set(key, state.pack(), ex=ttl)
+                    await pipe.execute()
+
+                    return state
+
+                except WatchError:
+                    # Снимок изменил другой процесс: повтор с новыми данными
+                    continue
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+
+            try:
+                await self.flush()
+            except Exception as exc:
+                logger.warning("Ошибка обновления трендов: {}", exc)
+
+    async def start(self) -> None:
+        """
+        Запуск периодического слияния (при запуске приложения)
+        """
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """
+        Остановка слияния с отправкой накопленных событий (при остановке приложения)
+        """
+        if self._flusher is None:
+            return
+
+        self._flusher.cancel()
+
+        try:
+            await self._flusher
+        except asyncio.CancelledError:
+            pass
+
+        self._flusher = None
+        await self.flush()
+
+
+# Тренды приложения: запускаются при старте (app.main), события записывают сервисы
+trend_tracker = TrendTracker()
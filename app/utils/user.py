@@ -1,17 +1,21 @@
-from fastapi import Security
+from fastapi import Request, Security
 from http import HTTPStatus
 from loguru import logger
 
-from app.database import async_session_maker
+from app.database import replica_router
 from app.models.users import User
 from app.services.user import UserService
 from app.utils.exeptions import CustomApiException
 from app.utils.token import TOKEN
+from app.utils.tracing import tracer
 
 
-async def get_current_user(token: str = Security(TOKEN)) -> User | None:
+async def get_current_user(
+    request: Request, token: str = Security(TOKEN)
+) -> User | None:
     """
-    Поиск и возврат пользователя из базы данных по токену из header
+    Поиск и возврат пользователя из базы данных по токену из header.
+    Для запросов на чтение пользователь может быть загружен из реплики.
     """
 
     if token is None:
@@ -22,9 +26,14 @@ async def get_current_user(token: str = Security(TOKEN)) -> User | None:
             detail="Valid api-token token is missing",
         )
 
-    async with async_session_maker() as session:
-        # Поиск пользователя
-        current_user = await UserService.get_user_for_key(token=token, session=session)
+    with tracer.start_as_current_span("get_current_user"):
+        session_maker = await replica_router.session_maker_for(request)
+
+        async with session_maker() as session:
+            # Поиск пользователя
+            current_user = await UserService.get_user_for_key(
+                token=token, session=session
+            )
 
         if current_user is None:
             raise CustomApiException(
@@ -0,0 +1,209 @@
+"""
+Генератор синтетического набора данных для нагрузочного тестирования.
+
+Граф подписок, активность авторов и популярность твитов подчиняются степенному
+закону: немногие пользователи собирают большую часть подписчиков и лайков.
+Файлы пишутся в формате, который принимает app.services.importer; с флагом
+--load данные сразу загружаются в БД.
+
+Пример запуска:
+    python -m benchmarks.dataset --out /tmp/naptwitter --users 10000 \
+        --avg-follows 50 --avg-tweets 20 --avg-likes 40 --load
+"""
+import argparse
+import asyncio
+import csv
+import datetime
+import itertools
+import random
+from pathlib import Path
+from typing import Iterator, List
+
+# Показатель степенного распределения (меньше - "тяжелее" хвост)
+PARETO_ALPHA = 1.5
+# Префикс api-key сгенерированных пользователей (api-key = префикс + id)
+API_KEY_PREFIX = "bench-"
+
+
+def pareto_count(rng: random.Random, mean: float, limit: int) -> int:
+    """
+    Случайное количество (подписок, твитов, лайков) со степенным распределением
+    и заданным средним значением
+    """
+    scale = mean * (PARETO_ALPHA - 1) / PARETO_ALPHA
+    return min(limit, int(scale * rng.paretovariate(PARETO_ALPHA)))
+
+
+def zipf_weights(size: int, rng: random.Random) -> List[float]:
+    """
+    Веса популярности по закону Ципфа, случайно распределённые между пользователями
+    """
+    weights = [1 / rank for rank in range(1, size + 1)]
+    rng.shuffle(weights)
+
+    return weights
+
+
+def write_csv(path: Path, header: List[str], rows: Iterator[tuple]) -> int:
+    """
+    Запись строк в CSV с заголовком
+    :return: количество записанных строк
+    """
+    count = 0
+
+    with path.open("w", encoding="utf-8", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+
+    return count
+
+
+def generate(
+    out: Path,
+    users: int,
+    avg_follows: float,
+    avg_tweets: float,
+    avg_likes: float,
+    days: int,
+    seed: int,
+) -> dict:
+    """
+    Генерация набора данных в CSV-файлы
+    :param out: каталог для файлов
+    :param users: количество пользователей
+    :param avg_follows: среднее количество подписок пользователя
+    :param avg_tweets: среднее количество твитов пользователя
+    :param avg_likes: среднее количество лайков пользователя
+    :param days: за сколько последних дней распределяются даты твитов
+    :param seed: зерно генератора случайных чисел
+    :return: словарь файл -> количество строк
+    """
+    rng = random.Random(seed)
+    out.mkdir(parents=True, exist_ok=True)
+    user_ids = list(range(1, users + 1))
+    weights = zipf_weights(users, rng)
+    popularity = list(itertools.accumulate(weights))
+    now = datetime.datetime.utcnow()
+    counts = {}
+
+    counts["users.csv"] = write_csv(
+        out / "users.csv",
+        ["id", "username", "email", "api_key", "is_verified"],
+        (
+            (user_id, f"user{user_id}", f"user{user_id}@example.com",
+             f"{API_KEY_PREFIX}{user_id}", "true")
+            for user_id in user_ids
+        ),
+    )
+
+    def follows() -> Iterator[tuple]:
+        for user_id in user_ids:
+            targets = set(
+                rng.choices(
+                    user_ids,
+                    cum_weights=popularity,
+                    k=pareto_count(rng, avg_follows, users - 1),
+                )
+            )
+            targets.discard(user_id)
+
+            for target in targets:
+                yield user_id, target
+
+    counts["follows.csv"] = write_csv(
+        out / "follows.csv", ["followers_id", "following_id"], follows()
+    )
+
+    # Авторы твитов: популярные пользователи пишут чаще
+    tweet_authors: List[int] = []
+
+    def tweets() -> Iterator[tuple]:
+        tweet_id = 0
+
+        for user_id in user_ids:
+            for _ in range(pareto_count(rng, avg_tweets, 10_000)):
+                tweet_id += 1
+                created_at = now - datetime.timedelta(seconds=rng.random() * days * 86400)
+                tweet_authors.append(user_id)
+
+                yield (tweet_id, f"Твит #{tweet_id} от user{user_id}",
+                       created_at.isoformat(), user_id)
+
+    counts["tweets.csv"] = write_csv(
+        out / "tweets.csv", ["id", "tweet_data", "created_at", "user_id"], tweets()
+    )
+
+    def likes() -> Iterator[tuple]:
+        if not tweet_authors:
+            return
+
+        # Популярность твита наследуется от популярности автора
+        author_weight = list(
+            itertools.accumulate(weights[author - 1] for author in tweet_authors)
+        )
+        tweet_ids = range(1, len(tweet_authors) + 1)
+
+        for user_id in user_ids:
+            liked = set(
+                rng.choices(
+                    tweet_ids,
+                    cum_weights=author_weight,
+                    k=pareto_count(rng, avg_likes, len(tweet_authors)),
+                )
+            )
+
+            for tweet_id in liked:
+                yield user_id, tweet_id
+
+    counts["likes.csv"] = write_csv(out / "likes.csv", ["user_id", "tweets_id"], likes())
+
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--out", type=Path, required=True)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--avg-follows", type=float, default=50)
+    parser.add_argument("--avg-tweets", type=float, default=20)
+    parser.add_argument("--avg-likes", type=float, default=40)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--load", action="store_true", help="Загрузить данные в БД")
+    args = parser.parse_args()
+
+    counts = generate(
+        out=args.out,
+        users=args.users,
+        avg_follows=args.avg_follows,
+        avg_tweets=args.avg_tweets,
+        avg_likes=args.avg_likes,
+        days=args.days,
+        seed=args.seed,
+    )
+
+    for name, rows in counts.items():
+        print(f"{name}: {rows} строк")
+
+    if args.load:
+        from app.services.importer import ImportService
+
+        asyncio.run(
+            ImportService.run(
+                files={
+                    "user": args.out / "users.csv",
+                    "tweets": args.out / "tweets.csv",
+                    "likes": args.out / "likes.csv",
+                    "user_to_user": args.out / "follows.csv",
+                },
+                batch_size=50_000,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
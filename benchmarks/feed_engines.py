@@ -0,0 +1,95 @@
+"""
+Сравнение движков ленты: rows (строки из БД + сериализация в приложении)
+и json (готовый документ собирается в БД одним запросом).
+
+Для случайных пользователей из набора benchmarks.dataset лента строится обоими
+способами, выводятся перцентили задержки и средний размер ответа.
+
+Пример запуска (БД заполнена через python -m benchmarks.dataset --load):
+    python -m benchmarks.feed_engines --users 10000 --samples 500
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Awaitable, Callable, Dict, List
+
+from benchmarks.pool_feed_latency import percentile
+
+
+async def measure(
+    build: Callable[..., Awaitable[bytes]], users: List, session_maker
+) -> Dict:
+    """
+    Построение ленты для каждого пользователя отдельным сеансом
+    :return: перцентили задержки (мс) и средний размер ответа (байт)
+    """
+    latencies = []
+    size = 0
+
+    for user in users:
+        async with session_maker() as session:
+            started = time.perf_counter()
+            body = await build(user=user, session=session)
+            latencies.append(time.perf_counter() - started)
+            size += len(body)
+
+    latencies.sort()
+
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "avg_bytes": size // len(users),
+    }
+
+
+async def run(users: int, samples: int, seed: int) -> Dict[str, Dict]:
+    from loguru import logger
+
+    from app.database import async_session_maker
+    from app.services.tweet import TweetsService
+    from app.services.user import UserService
+    from app.utils.feed import encode_feed
+
+    logger.remove()
+    rng = random.Random(seed)
+    sample = []
+
+    async with async_session_maker() as session:
+        for user_id in rng.sample(range(1, users + 1), samples):
+            sample.append(await UserService.get_user_for_id(user_id=user_id, session=session))
+
+    async def build_rows(user, session) -> bytes:
+        return encode_feed(await TweetsService.get_tweets(user=user, session=session))
+
+    engines = {"rows": build_rows, "json": TweetsService.get_tweets_json}
+
+    # Прогрев: кэш страниц БД и подготовленных выражений
+    for build in engines.values():
+        await measure(build, sample[:20], async_session_maker)
+
+    return {
+        name: await measure(build, sample, async_session_maker)
+        for name, build in engines.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--users", type=int, default=10_000, help="Пользователей в наборе")
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.users, args.samples, args.seed))
+
+    print(f"{'engine':<8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'bytes':>8}")
+
+    for name, stats in report.items():
+        print(f"{name:<8} {stats['p50_ms']:>8} {stats['p95_ms']:>8} "
+              f"{stats['p99_ms']:>8} {stats['avg_bytes']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Микробенчмарк сериализации ленты: путь через схему TweetListSchema (как у FastAPI
+с response_model) против DTO + orjson.
+
+Пример запуска:
+    python -m benchmarks.feed_serialization --tweets 100 --likes 20 --repeat 200
+"""
+import argparse
+import timeit
+
+from fastapi.responses import JSONResponse
+
+from app.models.likes import Like
+from app.models.tweets import Tweet
+from app.models.users import User
+from app.schemas.tweet import TweetListSchema
+from app.utils.feed import FeedAuthor, FeedLike, FeedTweet, encode_feed
+
+
+def build_orm_feed(tweets: int, likes: int) -> list:
+    """
+    Лента из ORM-объектов (без БД)
+    """
+    users = [User(id=number, username=f"user{number}") for number in range(likes + 1)]
+
+    return [
+        Tweet(
+            id=number,
+            tweet_data=f"Твит №{number}",
+            user=users[0],
+            likes=[Like(user_id=user.id, user=user) for user in users[1:]],
+        )
+        for number in range(tweets)
+    ]
+
+
+def build_dto_feed(tweets: int, likes: int) -> list:
+    """
+    Та же лента из DTO
+    """
+    return [
+        FeedTweet(
+            id=number,
+            content=f"Твит №{number}",
+            author=FeedAuthor(id=0, name="user0"),
+            likes=[FeedLike(user_id=user, name=f"user{user}") for user in range(1, likes + 1)],
+        )
+        for number in range(tweets)
+    ]
+
+
+def serialize_schema(tweets: list) -> bytes:
+    """
+    Сериализация через схему: валидация, дамп по псевдонимам, JSONResponse
+    """
+    return JSONResponse(
+        TweetListSchema(tweets=tweets).model_dump(mode="json", by_alias=True)
+    ).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--tweets", type=int, default=100)
+    parser.add_argument("--likes", type=int, default=20, help="Лайков на твит")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    orm_feed = build_orm_feed(args.tweets, args.likes)
+    dto_feed = build_dto_feed(args.tweets, args.likes)
+
+    assert serialize_schema(orm_feed) == encode_feed(dto_feed)
+
+    for name, func in (
+        ("pydantic + json", lambda: serialize_schema(orm_feed)),
+        ("dto + orjson", lambda: encode_feed(dto_feed)),
+    ):
+        best = min(timeit.repeat(func, number=args.repeat, repeat=5)) / args.repeat
+        print(f"{name:<16} {best * 1000:8.3f} мс на ленту")
+
+
+if __name__ == "__main__":
+    main()
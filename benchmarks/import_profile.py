@@ -0,0 +1,122 @@
+"""
+Профиль холодного старта: время импорта модулей приложения в новом процессе
+(минимум из нескольких запусков), сборка приложения, запуск (lifespan) и время
+первого запроса к БД, а также самые тяжёлые модули по данным -X importtime.
+
+Первый запрос без прогрева пулов включает подключение к БД; для сравнения
+запустите с DB_POOL_WARMUP=0.
+
+Пример запуска:
+    python -m benchmarks.import_profile --repeat 5 --top 15
+"""
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Модули в порядке "вложенности": каждый следующий включает предыдущие
+MODULES = (
+    "fastapi",
+    "app.database",
+    "app.urls",
+    "app.main",
+)
+# Время сборки приложения, запуска (lifespan) до готовности принимать запросы
+# и первого запроса, читающего из БД
+STARTUP_CODE = """
+import asyncio, time
+import httpx
+started = time.perf_counter()
+from app.main import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+
+async def startup():
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app), base_url="http://test") as client:
+            await client.get("/api/users/1")
+
+        print(imported - started, created - imported, ready - created, time.perf_counter() - ready)
+
+asyncio.run(startup())
+"""
+
+
+def run_python(code: str, *options: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-W", "ignore", *options, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=os.environ.copy(),
+    )
+
+
+def import_time(module: str, repeat: int) -> float:
+    """
+    Время импорта модуля в новом процессе, мс (минимум из repeat запусков)
+    """
+    code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+    return min(float(run_python(code).stdout) for _ in range(repeat)) * 1000
+
+
+def startup_time(repeat: int) -> Tuple[float, ...]:
+    """
+    Импорт, create_app(), lifespan (прогрев пулов) и первый запрос, мс
+    (лучший из repeat запусков)
+    """
+    runs = [
+        tuple(float(value) * 1000 for value in run_python(STARTUP_CODE).stdout.split())
+        for _ in range(repeat)
+    ]
+
+    return min(runs, key=lambda run: run[-1])
+
+
+def heaviest_modules(module: str, top: int) -> List[Tuple[str, int]]:
+    """
+    Модули с наибольшим собственным временем импорта по -X importtime, мкс
+    """
+    stderr = run_python(f"import {module}", "-X", "importtime").stderr
+    modules: Dict[str, int] = {}
+
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+
+        self_us, _, name = line[len("import time:"):].split("|")
+        modules[name.strip()] = int(self_us)
+
+    return sorted(modules.items(), key=lambda item: item[1], reverse=True)[:top]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--no-startup", action="store_true", help="Без запуска lifespan (нет БД)")
+    args = parser.parse_args()
+
+    for module in MODULES:
+        print(f"import {module:<14} {import_time(module, args.repeat):8.1f} мс")
+
+    if not args.no_startup:
+        imported, created, started, first = startup_time(args.repeat)
+        print(f"\nimport app.main {imported:8.1f} мс")
+        print(f"create_app()    {created:8.1f} мс")
+        print(f"lifespan        {started:8.1f} мс")
+        print(f"первый запрос   {first:8.1f} мс")
+
+    print("\nСамые тяжёлые модули (собственное время):")
+
+    for name, self_us in heaviest_modules("app.main", args.top):
+        print(f"{self_us / 1000:8.1f} мс  {name}")
+
+
+if __name__ == "__main__":
+    main()
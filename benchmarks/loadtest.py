@@ -0,0 +1,160 @@
+"""
+Нагрузочный тест приложения смешанной нагрузкой: чтение ленты, публикация твитов,
+лайки и подписки от лица пользователей из benchmarks.dataset.
+
+По умолчанию приложение запускается в том же процессе (httpx + ASGITransport),
+с --url запросы отправляются на запущенный uvicorn.
+Выводит пропускную способность и перцентили p50/p95/p99 по каждому эндпоинту;
+с --json результаты сохраняются для сравнения между прогонами.
+
+Пример запуска:
+    python -m benchmarks.loadtest --users 10000 --duration 60 --concurrency 100 \
+        --mix feed=70,tweet=10,like=15,follow=5 --json /tmp/loadtest.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from httpx import ASGITransport, AsyncClient
+
+from benchmarks.dataset import API_KEY_PREFIX
+from benchmarks.pool_feed_latency import percentile
+
+DEFAULT_MIX = "feed=70,tweet=10,like=15,follow=5"
+
+
+class Workload:
+    """
+    Генератор запросов смешанной нагрузки
+    """
+
+    def __init__(self, users: int, tweets: int, mix: Dict[str, int], seed: int) -> None:
+        self.users = users
+        self.tweets = tweets
+        self.operations = list(mix)
+        self.weights = list(mix.values())
+        self.rng = random.Random(seed)
+
+    async def run_one(self, client: AsyncClient) -> tuple:
+        """
+        Выполнение одной случайной операции
+        :return: (название эндпоинта, код ответа)
+        """
+        operation = self.rng.choices(self.operations, weights=self.weights)[0]
+        headers = {"api-key": f"{API_KEY_PREFIX}{self.rng.randint(1, self.users)}"}
+
+        if operation == "feed":
+            resp = await client.get("/api/tweets", headers=headers)
+            return "GET /api/tweets", resp.status_code
+
+        if operation == "tweet":
+            resp = await client.post(
+                "/api/tweets", json={"tweet_data": "Нагрузочный твит"}, headers=headers
+            )
+            return "POST /api/tweets", resp.status_code
+
+        if operation == "like":
+            tweet_id = self.rng.randint(1, self.tweets)
+            resp = await client.post(f"/api/tweets/{tweet_id}/likes", headers=headers)
+            return "POST /api/tweets/{tweet_id}/likes", resp.status_code
+
+        if operation == "follow":
+            user_id = self.rng.randint(1, self.users)
+            resp = await client.post(f"/api/users/{user_id}/follow", headers=headers)
+            return "POST /api/users/{user_id}/follow", resp.status_code
+
+        raise ValueError(f"Неизвестная операция: {operation}")
+
+
+async def run(
+    workload: Workload, url: str | None, duration: float, concurrency: int
+) -> Dict[str, Dict]:
+    """
+    Прогон нагрузки в течение duration секунд
+    :return: статистика по эндпоинтам
+    """
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+
+    if url is None:
+        from app.main import app
+
+        client = AsyncClient(transport=ASGITransport(app=app), base_url="http://test")
+    else:
+        client = AsyncClient(base_url=url, timeout=30)
+
+    deadline = time.perf_counter() + duration
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            endpoint, status = await workload.run_one(client)
+            latencies[endpoint].append(time.perf_counter() - started)
+
+            # 4xx от бизнес-проверок (повторный лайк, подписка на себя) ожидаемы
+            if status >= 500:
+                errors[endpoint] += 1
+
+    async with client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    report = {}
+
+    for endpoint, values in sorted(latencies.items()):
+        values.sort()
+        report[endpoint] = {
+            "requests": len(values),
+            "rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(percentile(values, 50) * 1000, 2),
+            "p95_ms": round(percentile(values, 95) * 1000, 2),
+            "p99_ms": round(percentile(values, 99) * 1000, 2),
+            "errors": errors[endpoint],
+        }
+
+    return report
+
+
+def print_report(report: Dict[str, Dict]) -> None:
+    print(f"{'endpoint':<36} {'requests':>8} {'rps':>8} {'p50 ms':>8} "
+          f"{'p95 ms':>8} {'p99 ms':>8} {'5xx':>5}")
+
+    for endpoint, stats in report.items():
+        print(f"{endpoint:<36} {stats['requests']:>8} {stats['rps']:>8} "
+              f"{stats['p50_ms']:>8} {stats['p95_ms']:>8} {stats['p99_ms']:>8} "
+              f"{stats['errors']:>5}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--url", help="Адрес запущенного сервера (по умолчанию - in-process)")
+    parser.add_argument("--users", type=int, default=10_000, help="Пользователей в наборе")
+    parser.add_argument("--tweets", type=int, default=200_000, help="Твитов в наборе")
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Файл для сохранения результатов")
+    args = parser.parse_args()
+
+    mix = {
+        name: int(weight)
+        for name, weight in (item.split("=") for item in args.mix.split(","))
+    }
+    workload = Workload(users=args.users, tweets=args.tweets, mix=mix, seed=args.seed)
+    report = asyncio.run(run(workload, args.url, args.duration, args.concurrency))
+
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Стоимость логирования на горячем пути: пропускная способность цикла событий,
+в котором обработчики пишут сообщения так же, как сервисы при лайке и подписке.
+
+Сценарии:
+    none          - логирование отключено (верхняя граница)
+    sync-debug    - как было: синхронный файловый приёмник, уровень DEBUG, f-строки
+    queue-debug   - неблокирующий приёмник, DEBUG с выборкой LOG_SAMPLING, ленивое форматирование
+    queue-info    - неблокирующий приёмник, уровень INFO (по умолчанию)
+
+Пример запуска:
+    python -m benchmarks.logging_overhead --requests 50000 --concurrency 100
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict
+
+from loguru import logger
+
+from app.utils.log import QueueSink, make_sampler, parse_sampling, redact_secrets
+
+
+async def handler_fstring(number: int) -> None:
+    """
+    Обработчик с логированием через f-строки (форматирование выполняется всегда)
+    """
+    logger.debug(f"Поиск пользователя по api-key: key-{number}")
+    logger.debug(f"Лайк твита №{number}")
+    logger.debug(f"Поиск твита по id: {number}")
+    logger.info(f"Подписка оформлена")
+    await asyncio.sleep(0)
+
+
+async def handler_lazy(number: int) -> None:
+    """
+    Тот же обработчик с ленивым форматированием
+    """
+    logger.debug("Поиск пользователя по api-key")
+    logger.debug("Лайк твита №{}", number)
+    logger.debug("Поиск твита по id: {}", number)
+    logger.info("Подписка оформлена")
+    await asyncio.sleep(0)
+
+
+async def run(handler: Callable, requests: int, concurrency: int) -> float:
+    """
+    Выполнение requests обработчиков пачками по concurrency
+    :return: обработчиков в секунду
+    """
+    started = time.perf_counter()
+
+    for offset in range(0, requests, concurrency):
+        await asyncio.gather(*(handler(number) for number in range(offset, offset + concurrency)))
+
+    return requests / (time.perf_counter() - started)
+
+
+def scenario(name: str, path: Path, sampling: str) -> Callable:
+    """
+    Настройка loguru для сценария
+    :return: обработчик для сценария
+    """
+    logger.remove()
+    logger.configure(patcher=None)
+
+    if name == "none":
+        return handler_lazy
+
+    if name == "sync-debug":
+        logger.add(path, level="DEBUG")
+        return handler_fstring
+
+    logger.configure(patcher=redact_secrets)
+    logger.add(
+        QueueSink(path.open("a", encoding="utf-8")),
+        level="DEBUG" if name == "queue-debug" else "INFO",
+        filter=make_sampler(parse_sampling(sampling)),
+        colorize=False,
+    )
+
+    return handler_lazy
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=50_000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--sampling", default="DEBUG=0.1")
+    args = parser.parse_args()
+
+    report: Dict[str, float] = {}
+
+    with tempfile.TemporaryDirectory() as directory:
+        for name in ("none", "sync-debug", "queue-debug", "queue-info"):
+            handler = scenario(name, Path(directory) / f"{name}.log", args.sampling)
+            report[name] = asyncio.run(run(handler, args.requests, args.concurrency))
+            # Остановка приёмника: оставшиеся сообщения записываются вне замера
+            logger.remove()
+
+    for name, rate in report.items():
+        print(f"{name:<12} {rate:>10.0f} обработчиков/с  ({rate / report['none'] * 100:5.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Нагрузочный тест: влияние настроек пула соединений на задержку ленты твитов.
+
+Для каждой конфигурации пула "pool_size:max_overflow[:timeout]" запускается
+отдельный процесс (настройки читаются из окружения при импорте app.config),
+который прогоняет GET /api/tweets через приложение in-process и выводит
+перцентили задержки и метрики пула.
+
+Пример запуска (БД должна быть заполнена, см. app.services.importer):
+    python -m benchmarks.pool_feed_latency --api-key test-user1 \
+        --requests 2000 --concurrency 100 --settings 5:0 10:10 20:20 50:0
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    Перцентиль по отсортированному списку (метод ближайшего ранга)
+    """
+    if not values:
+        return 0.0
+
+    index = min(len(values) - 1, max(0, round(q / 100 * len(values)) - 1))
+    return values[index]
+
+
+async def run_worker(api_key: str, requests: int, concurrency: int) -> Dict:
+    """
+    Прогон запросов к ленте в текущем процессе
+    """
+    from httpx import ASGITransport, AsyncClient
+
+    from app.database import engine
+    from app.main import app
+    from app.utils.pool import pool_snapshot
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as client:
+
+        async def one_request() -> None:
+            nonlocal errors
+
+            async with semaphore:
+                started = time.perf_counter()
+                resp = await client.get("/api/tweets", headers={"api-key": api_key})
+                latencies.append(time.perf_counter() - started)
+
+                if resp.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one_request() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+
+    return {
+        "rps": round(requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "errors": errors,
+        "pool": pool_snapshot(engine.sync_engine),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--api-key", required=True)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--settings", nargs="+", default=["5:0", "10:10", "20:20"])
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = asyncio.run(run_worker(args.api_key, args.requests, args.concurrency))
+        print(json.dumps(result))
+        return
+
+    print(f"{'pool':>12} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'timeouts':>8} {'errors':>6}")
+
+    for setting in args.settings:
+        size, overflow, *timeout = setting.split(":")
+        env = dict(
+            os.environ,
+            DB_POOL_SIZE=size,
+            DB_MAX_OVERFLOW=overflow,
+            DB_POOL_TIMEOUT=timeout[0] if timeout else os.environ.get("DB_POOL_TIMEOUT", "30"),
+        )
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.pool_feed_latency", "--worker",
+             "--api-key", args.api_key, "--requests", str(args.requests),
+             "--concurrency", str(args.concurrency)],
+            env=env, capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+
+        print(f"{setting:>12} {result['rps']:>8} {result['p50_ms']:>8} "
+              f"{result['p95_ms']:>8} {result['p99_ms']:>8} "
+              f"{result['pool']['timeouts']:>8} {result['errors']:>6}")
+
+
+if __name__ == "__main__":
+    main()
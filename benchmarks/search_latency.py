@@ -0,0 +1,215 @@
+"""
+Задержка полнотекстового поиска твитов (TweetsService.search_tweets) на большой
+таблице: первая и последующие страницы для слов разной частоты, поиск среди
+подписок и для сравнения - наивный ILIKE (последовательное сканирование).
+
+Твиты генерируются в БД (--load): текст из --words слов словаря "w1".."wN",
+частота слова убывает с номером примерно как 1/номер (как у слов
+естественного языка), даты равномерно распределены по --days дням
+с помесячными секциями. Триггеры (версии ленты, внешние ключи) при загрузке
+отключаются через session_replication_role (нужны права суперпользователя).
+
+Пример запуска:
+    python -m benchmarks.search_latency --load --tweets 10000000 --repeat 20
+"""
+import argparse
+import asyncio
+import datetime
+import time
+from typing import Dict, List
+
+from sqlalchemy import select, text
+from sqlalchemy.orm import selectinload
+
+from app.database import async_session_maker, get_sync_engine
+from app.models.users import User
+from app.services.partition import TweetPartitionService, add_months, month_start
+from app.services.tweet import TweetsService
+from app.utils.log import setup_logging
+from benchmarks.pool_feed_latency import percentile
+
+# Запросы от редкого слова к частому и сочетания слов (синтаксис веб-поиска)
+QUERIES = (
+    "w40000",
+    "w500",
+    "w20",
+    "w20 w500",
+    '"w3 w7"',
+    "w20 -w3",
+)
+SEARCH_USER_KEY = "search-1"
+LOAD_BATCH = 1_000_000
+
+
+def load(tweets: int, users: int, vocabulary: int, words: int, days: int, following: int) -> None:
+    """
+    Генерация пользователей и твитов в БД
+    """
+    now = datetime.datetime.utcnow()
+
+    with get_sync_engine().begin() as connection:
+        connection.execute(
+            text(
+                'INSERT INTO "user" (username, email, hashed_password, api_key, '
+                "email_code, is_active, is_superuser, is_verified, registered_at) "
+                "SELECT 'search-' || n, 'search-' || n || '@example.com', '', 'search-' || n, "
+                "'empty', true, false, true, now() FROM generate_series(1, :users) n "
+                "ON CONFLICT DO NOTHING"
+            ),
+            {"users": users},
+        )
+        user_ids = connection.execute(
+            text("SELECT id FROM \"user\" WHERE api_key LIKE 'search-%' ORDER BY id")
+        ).scalars().all()
+        # Пользователь для поиска среди подписок
+        connection.execute(
+            text(
+                "INSERT INTO user_to_user (followers_id, following_id) "
+                "SELECT :user_id, unnest(CAST(:following AS integer[])) ON CONFLICT DO NOTHING"
+            ),
+            {"user_id": user_ids[0], "following": user_ids[1:following + 1]},
+        )
+
+        month = month_start(now - datetime.timedelta(days=days))
+
+        while month <= month_start(now):
+            if month not in TweetPartitionService.get_partitions(connection):
+                TweetPartitionService.create_partition(connection, month)
+            month = add_months(month, 1)
+
+    for offset in range(0, tweets, LOAD_BATCH):
+        started = time.perf_counter()
+
+        with get_sync_engine().begin() as connection:
+            connection.execute(text("SET LOCAL session_replication_role = replica"))
+            # Номер слова exp(random * ln(vocabulary)) распределён логарифмически
+            # равномерно: частота слова ~ 1/номер
+            connection.execute(
+                text(
+                    "INSERT INTO tweets (tweet_data, created_at, user_id) "
+                    "SELECT (SELECT string_agg('w' || floor(exp(random() * ln(:vocabulary)))::int, ' ') "
+                    "        FROM generate_series(1, :words + 0 * n)), "
+                    "       :now - random() * make_interval(days => :days), "
+                    "       (CAST(:user_ids AS integer[]))[1 + floor(random() * :users_count)::int] "
+                    "FROM generate_series(1, :batch) n"
+                ),
+                {
+                    "vocabulary": vocabulary,
+                    "words": words,
+                    "now": now,
+                    "days": days,
+                    "user_ids": user_ids,
+                    "users_count": len(user_ids),
+                    "batch": min(LOAD_BATCH, tweets - offset),
+                },
+            )
+
+        print(f"Загружено твитов: {min(offset + LOAD_BATCH, tweets)} "
+              f"({time.perf_counter() - started:.1f} с)")
+
+    with get_sync_engine().begin() as connection:
+        connection.execute(text("ANALYZE tweets"))
+
+
+async def measure(query: str, user: User, repeat: int, pages: int, following_only: bool) -> Dict:
+    """
+    Задержка первой и последующих страниц поиска
+    :return: перцентили по страницам, мс
+    """
+    first: List[float] = []
+    next_pages: List[float] = []
+
+    for _ in range(repeat):
+        cursor = None
+
+        for page in range(pages):
+            async with async_session_maker() as session:
+                started = time.perf_counter()
+                _, cursor = await TweetsService.search_tweets(
+                    query=query, user=user, session=session, cursor=cursor,
+                    following_only=following_only,
+                )
+                (first if page == 0 else next_pages).append(time.perf_counter() - started)
+
+            if cursor is None:
+                break
+
+    report = {}
+
+    for name, values in (("first", first), ("next", next_pages)):
+        values.sort()
+        report[f"{name}_p50"] = percentile(values, 50) * 1000 if values else 0
+        report[f"{name}_p95"] = percentile(values, 95) * 1000 if values else 0
+
+    async with async_session_maker() as session:
+        report["matches"] = (
+            await session.execute(
+                text("SELECT count(*) FROM tweets "
+                     "WHERE search_vector @@ websearch_to_tsquery('russian', :query)"),
+                {"query": query},
+            )
+        ).scalar_one()
+
+    return report
+
+
+async def ilike_baseline(term: str) -> float:
+    """
+    Наивный поиск подстроки (одна попытка), мс
+    """
+    async with async_session_maker() as session:
+        started = time.perf_counter()
+        await session.execute(
+            text("SELECT id FROM tweets WHERE tweet_data ILIKE :pattern ORDER BY id DESC LIMIT 20"),
+            {"pattern": f"%{term}%"},
+        )
+
+        return (time.perf_counter() - started) * 1000
+
+
+async def run(args: argparse.Namespace) -> None:
+    async with async_session_maker() as session:
+        user = (
+            await session.execute(
+                select(User).options(selectinload(User.following))
+                .where(User.api_key == SEARCH_USER_KEY)
+            )
+        ).scalar_one()
+        total = (await session.execute(text("SELECT count(*) FROM tweets"))).scalar_one()
+
+    print(f"Твитов в таблице: {total}\n")
+    print(f"{'query':<14} {'scope':<9} {'matches':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'next p50':>9} {'next p95':>9}")
+
+    for following_only in (False, True):
+        for query in QUERIES:
+            report = await measure(query, user, args.repeat, args.pages, following_only)
+            print(f"{query:<14} {'following' if following_only else 'all':<9} "
+                  f"{report['matches']:>9} {report['first_p50']:>8.1f} {report['first_p95']:>8.1f} "
+                  f"{report['next_p50']:>9.1f} {report['next_p95']:>9.1f}")
+
+    print(f"\nILIKE '%w40000%' (последовательное сканирование): {await ilike_baseline('w40000'):.0f} мс")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--load", action="store_true", help="Сгенерировать данные")
+    parser.add_argument("--tweets", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--vocabulary", type=int, default=50_000)
+    parser.add_argument("--words", type=int, default=8, help="Слов в твите")
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--following", type=int, default=500, help="Подписок у пользователя поиска")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--pages", type=int, default=5, help="Страниц на запрос (по курсору)")
+    args = parser.parse_args()
+    setup_logging()
+
+    if args.load:
+        load(args.tweets, args.users, args.vocabulary, args.words, args.days, args.following)
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+Пропускная способность сервера: один процесс uvicorn как раньше (asyncio, h11)
+против production-режима python -m app.server (воркеры по числу ядер, uvloop,
+httptools). Сервер запускается отдельным процессом, нагрузку создают несколько
+процессов-клиентов с keep-alive соединениями.
+
+Кроме запросов в секунду выводится процессорное время сервера (всех воркеров)
+на запрос: если ядер мало и клиенты конкурируют с сервером за процессор,
+пропускная способность ограничена клиентами, а время на запрос - нет (Linux).
+
+Эндпоинты:
+    static   - GET /unprotected-route (накладные расходы сервера и фреймворка)
+    profile  - GET /api/users/{id} (профиль из кэша, после первого чтения - без БД)
+
+Пример запуска:
+    python -m benchmarks.server_throughput --duration 10 --clients 2 --concurrency 50
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import httpx
+
+PORT = 8765
+SCENARIOS = {
+    "single": [
+        sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(PORT),
+        "--loop", "asyncio", "--http", "h11", "--no-access-log",
+    ],
+    "production": [sys.executable, "-m", "app.server"],
+}
+ENDPOINTS = ("static", "profile")
+
+
+def start_server(name: str, workers: int) -> subprocess.Popen:
+    """
+    Запуск сервера и ожидание готовности (ответа на запрос)
+    """
+    env = {**os.environ, "SERVER_PORT": str(PORT), "SERVER_WORKERS": str(workers)}
+    process = subprocess.Popen(
+        SCENARIOS[name], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.monotonic() + 60
+
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{PORT}/unprotected-route", timeout=1)
+            return process
+        except httpx.TransportError:
+            time.sleep(0.2)
+
+    process.kill()
+    raise RuntimeError(f"Сервер {name} не запустился")
+
+
+def process_tree_cpu(pid: int) -> float:
+    """
+    Процессорное время процесса и его потомков (воркеров), секунд
+    """
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            fields = stat.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{pid}/task/{pid}/children") as children:
+            child_pids = [int(child) for child in children.read().split()]
+    except FileNotFoundError:
+        return 0.0
+
+    # utime и stime - 14 и 15 поля /proc/<pid>/stat
+    cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+    return cpu + sum(process_tree_cpu(child) for child in child_pids)
+
+
+def stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    process.wait(timeout=60)
+
+
+async def load(endpoint: str, duration: float, concurrency: int, users: int) -> int:
+    """
+    Запросы к эндпоинту в течение duration секунд
+    :return: количество успешных ответов
+    """
+    completed = 0
+    deadline = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=limits) as client:
+
+        async def worker() -> None:
+            nonlocal completed
+
+            while time.monotonic() < deadline:
+                if endpoint == "static":
+                    path = "/unprotected-route"
+                else:
+                    path = f"/api/users/{random.randint(1, users)}"
+
+                resp = await client.get(path)
+
+                if resp.status_code < 500:
+                    completed += 1
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    return completed
+
+
+def client_process(args: tuple) -> int:
+    return asyncio.run(load(*args))
+
+
+def measure(
+    server: subprocess.Popen, endpoint: str, duration: float, clients: int, concurrency: int, users: int
+) -> Tuple[float, float]:
+    """
+    Нагрузка из clients процессов
+    :return: запросов в секунду, процессорное время сервера на запрос (мкс)
+    """
+    with multiprocessing.Pool(clients) as pool:
+        cpu = process_tree_cpu(server.pid)
+        started = time.monotonic()
+        completed = sum(
+            pool.map(client_process, [(endpoint, duration, concurrency, users)] * clients)
+        )
+        elapsed = time.monotonic() - started
+        cpu = process_tree_cpu(server.pid) - cpu
+
+    return completed / elapsed, cpu / max(completed, 1) * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--clients", type=int, default=2, help="Процессов, создающих нагрузку")
+    parser.add_argument("--concurrency", type=int, default=50, help="Соединений на процесс")
+    parser.add_argument("--workers", type=int, default=0, help="Воркеров production (0 - по ядрам)")
+    parser.add_argument("--users", type=int, default=1000, help="Диапазон id профилей")
+    args = parser.parse_args()
+
+    report: Dict[str, List[Tuple[float, float]]] = {}
+
+    for name in SCENARIOS:
+        process = start_server(name, args.workers)
+
+        try:
+            # Прогрев: кэш профилей и соединения клиентов
+            measure(process, "profile", 1, args.clients, args.concurrency, args.users)
+            report[name] = [
+                measure(process, endpoint, args.duration, args.clients, args.concurrency, args.users)
+                for endpoint in ENDPOINTS
+            ]
+        finally:
+            stop_server(process)
+
+    print(f"{'scenario':<12}" + "".join(
+        f"{endpoint + ' rps':>14}{'cpu мкс/запрос':>16}" for endpoint in ENDPOINTS
+    ))
+
+    for name, results in report.items():
+        print(f"{name:<12}" + "".join(f"{rate:>14.0f}{cpu:>16.0f}" for rate, cpu in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Потоковый подсчёт трендов (app.utils.trends): стоимость учёта события,
+точность top-N по сравнению с точным подсчётом (Counter по окнам с тем же
+затуханием), размер снимка и время слияния / восстановления снимка.
+
+События - ключи с распределением Ципфа (как хэштеги) из --keys различных
+значений, равномерно распределённые по --minutes минутам.
+
+Пример запуска:
+    python -m benchmarks.trends_engine --events 1000000 --keys 1000000
+"""
+import argparse
+import random
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+from app.utils.trends import TrendCounter
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=1_000_000)
+    parser.add_argument("--keys", type=int, default=1_000_000, help="Различных ключей")
+    parser.add_argument("--zipf", type=float, default=1.1, help="Показатель распределения Ципфа")
+    parser.add_argument("--minutes", type=int, default=60)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    weights = [1 / rank ** args.zipf for rank in range(1, args.keys + 1)]
+    keys = [f"tag{rank}" for rank in rng.choices(range(args.keys), weights, k=args.events)]
+    start = 1_700_000_000.0
+    times = sorted(start + rng.random() * args.minutes * 60 for _ in range(args.events))
+    now = times[-1]
+
+    counter = TrendCounter()
+    started = time.perf_counter()
+
+    for key, moment in zip(keys, times):
+        counter.add(key, moment)
+
+    elapsed = time.perf_counter() - started
+
+    # Память - отдельным проходом: tracemalloc замедляет учёт в разы
+    tracemalloc.start()
+    measured = TrendCounter()
+
+    for key, moment in zip(keys, times):
+        measured.add(key, moment)
+
+    memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # Точный подсчёт с теми же окнами и затуханием
+    exact = defaultdict(Counter)
+
+    for key, moment in zip(keys, times):
+        exact[int(moment // counter.window_seconds)][key] += 1
+
+    current = int(now // counter.window_seconds)
+    scores = Counter()
+
+    for window, counts in exact.items():
+        if current - counter.windows < window:
+            for key, count in counts.items():
+                scores[key] += count * counter.decay ** (current - window)
+
+    expected = [key for key, _ in scores.most_common(args.top)]
+    started = time.perf_counter()
+    found = counter.top(args.top, now)
+    top_time = time.perf_counter() - started
+    recall = len({key for key, _ in found} & set(expected)) / args.top
+    error = max(abs(score - scores[key]) / scores[key] for key, score in found)
+
+    started = time.perf_counter()
+    snapshot = counter.pack()
+    pack_time = time.perf_counter() - started
+    restored = TrendCounter()
+    started = time.perf_counter()
+    restored.load(snapshot)
+    restored.merge(counter)
+    merge_time = time.perf_counter() - started
+
+    print(f"Событий: {args.events}, различных ключей в потоке: {len(set(keys))}")
+    print(f"Учёт события: {elapsed / args.events * 1e6:.1f} мкс ({args.events / elapsed:.0f} событий/с)")
+    print(f"Пик памяти при учёте: {memory / 1024:.0f} КБ, размер снимка: {len(snapshot) / 1024:.0f} КБ")
+    print(f"top-{args.top}: {top_time * 1000:.1f} мс, совпадение с точным {recall:.0%}, "
+          f"макс. ошибка оценки {error:.1%}")
+    print(f"Снимок: pack {pack_time * 1000:.1f} мс, load + merge {merge_time * 1000:.1f} мс")
+    print(f"Точный подсчёт: {sum(len(counts) for counts in exact.values())} счётчиков")
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,9 @@ from app.config import DB_USER, DB_HOST, DB_PORT, DB_NAME, DB_PASS
 from app.database import Base, metadata
 from app.models.users import User
 from app.models.tweets import Tweet
+from app.models.versions import ContentVersion
+from app.models.hashtags import Hashtag, Mention, TweetHashtag
+from app.models.engagement import AuthorAffinity, TweetEngagement
 from app.models.likes import Like
 
 # this is the Alembic Config object, which provides
@@ -0,0 +1,41 @@
+"""content versions
+
+Revision ID: 5b9e0c7f3a21
+Revises: d41e7b2c6a90
+Create Date: 2026-10-19 17:40:03.512876
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.models.versions import BUMP_CONTENT_VERSION_FUNCTION, CONTENT_VERSION_TRIGGERS
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b9e0c7f3a21'
+down_revision: Union[str, None] = 'd41e7b2c6a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'content_versions',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id')
+    )
+    op.execute(BUMP_CONTENT_VERSION_FUNCTION)
+
+    for statement in CONTENT_VERSION_TRIGGERS:
+        op.execute(statement)
+
+
+def downgrade() -> None:
+    op.execute("DROP TRIGGER IF EXISTS bump_content_version ON likes")
+    op.execute("DROP TRIGGER IF EXISTS bump_content_version ON tweets")
+    op.execute("DROP FUNCTION IF EXISTS bump_content_version()")
+    op.drop_table('content_versions')
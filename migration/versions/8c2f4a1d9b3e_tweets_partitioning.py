@@ -0,0 +1,111 @@
+"""tweets partitioning
+
+Revision ID: 8c2f4a1d9b3e
+Revises: 3a7051a0f7f9
+Create Date: 2026-10-19 14:05:12.418230
+
+"""
+import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c2f4a1d9b3e'
+down_revision: Union[str, None] = '3a7051a0f7f9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Количество месяцев, для которых секции создаются заранее
+MONTHS_AHEAD = 3
+
+
+def _add_months(value: datetime.date, months: int) -> datetime.date:
+    index = value.year * 12 + value.month - 1 + months
+    return datetime.date(index // 12, index % 12 + 1, 1)
+
+
+def upgrade() -> None:
+    # Внешний ключ на секционированную таблицу по одному id невозможен
+    op.execute("ALTER TABLE likes DROP CONSTRAINT IF EXISTS likes_tweets_id_fkey")
+    op.create_index(op.f('ix_likes_tweets_id'), 'likes', ['tweets_id'], unique=False)
+
+    # Старая таблица переименовывается, последовательность id переходит к новой
+    op.execute("ALTER SEQUENCE tweets_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE tweets RENAME TO tweets_legacy")
+    op.execute("ALTER TABLE tweets_legacy DROP CONSTRAINT tweets_pkey")
+    op.execute("DROP INDEX IF EXISTS ix_tweets_id")
+    op.execute("ALTER TABLE tweets_legacy DROP CONSTRAINT IF EXISTS tweets_user_id_fkey")
+
+    op.execute(
+        """
+        CREATE TABLE tweets (
+            id INTEGER NOT NULL DEFAULT nextval('tweets_id_seq'),
+            tweet_data VARCHAR(280) NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL,
+            user_id INTEGER NOT NULL REFERENCES "user" (id),
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+        """
+    )
+    op.execute("ALTER SEQUENCE tweets_id_seq OWNED BY tweets.id")
+    op.execute("CREATE TABLE tweets_default PARTITION OF tweets DEFAULT")
+
+    # Секции для всех месяцев с данными и на несколько месяцев вперёд
+    first = op.get_bind().execute(
+        sa.text("SELECT min(created_at) FROM tweets_legacy")
+    ).scalar()
+    today = datetime.date.today()
+    month = datetime.date((first or today).year, (first or today).month, 1)
+    last = _add_months(datetime.date(today.year, today.month, 1), MONTHS_AHEAD)
+
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE tweets_p{month:%Y_%m} PARTITION OF tweets "
+            f"FOR VALUES FROM ('{month}') TO ('{_add_months(month, 1)}') "
+            f"WITH (autovacuum_vacuum_scale_factor = 0.02, "
+            f"autovacuum_analyze_scale_factor = 0.01)"
+        )
+        month = _add_months(month, 1)
+
+    op.execute(
+        "INSERT INTO tweets (id, tweet_data, created_at, user_id) "
+        "SELECT id, tweet_data, coalesce(created_at, now()), user_id FROM tweets_legacy"
+    )
+    op.execute("DROP TABLE tweets_legacy")
+
+    op.create_index(op.f('ix_tweets_id'), 'tweets', ['id'], unique=False)
+    op.create_index(
+        'ix_tweets_user_id_created_at', 'tweets', ['user_id', 'created_at'], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.execute("ALTER SEQUENCE tweets_id_seq OWNED BY NONE")
+    op.execute("ALTER TABLE tweets RENAME TO tweets_partitioned")
+    op.execute("ALTER INDEX ix_tweets_id RENAME TO ix_tweets_id_partitioned")
+    op.execute(
+        "ALTER INDEX ix_tweets_user_id_created_at "
+        "RENAME TO ix_tweets_user_id_created_at_partitioned"
+    )
+    op.execute("ALTER TABLE tweets_partitioned RENAME CONSTRAINT tweets_pkey TO tweets_partitioned_pkey")
+
+    op.execute(
+        """
+        CREATE TABLE tweets (
+            id INTEGER NOT NULL DEFAULT nextval('tweets_id_seq') PRIMARY KEY,
+            tweet_data VARCHAR(280) NOT NULL,
+            created_at TIMESTAMP WITHOUT TIME ZONE,
+            user_id INTEGER NOT NULL REFERENCES "user" (id)
+        )
+        """
+    )
+    op.execute("ALTER SEQUENCE tweets_id_seq OWNED BY tweets.id")
+    op.execute("INSERT INTO tweets SELECT id, tweet_data, created_at, user_id FROM tweets_partitioned")
+    op.execute("DROP TABLE tweets_partitioned")
+    op.create_index(op.f('ix_tweets_id'), 'tweets', ['id'], unique=False)
+
+    op.drop_index(op.f('ix_likes_tweets_id'), table_name='likes')
+    op.create_foreign_key('likes_tweets_id_fkey', 'likes', 'tweets', ['tweets_id'], ['id'])
@@ -0,0 +1,56 @@
+"""hashtags and mentions
+
+Revision ID: a93c5d1e7f42
+Revises: e6f1a9c47b28
+Create Date: 2026-10-19 21:05:47.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93c5d1e7f42'
+down_revision: Union[str, None] = 'e6f1a9c47b28'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Индексы заполняются для существующих твитов отдельно:
+    # python -m app.services.hashtag
+    op.create_table(
+        'hashtags',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('tag', sa.String(length=100), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('tag')
+    )
+    op.create_table(
+        'tweet_hashtags',
+        sa.Column('hashtag_id', sa.Integer(), nullable=False),
+        sa.Column('tweet_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['hashtag_id'], ['hashtags.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('hashtag_id', 'tweet_id')
+    )
+    op.create_index('ix_tweet_hashtags_tweet_id', 'tweet_hashtags', ['tweet_id'], unique=False)
+    op.create_table(
+        'mentions',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('tweet_id', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'tweet_id')
+    )
+    op.create_index('ix_mentions_tweet_id', 'mentions', ['tweet_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_mentions_tweet_id', table_name='mentions')
+    op.drop_table('mentions')
+    op.drop_index('ix_tweet_hashtags_tweet_id', table_name='tweet_hashtags')
+    op.drop_table('tweet_hashtags')
+    op.drop_table('hashtags')
@@ -0,0 +1,47 @@
+"""tweet engagement and author affinity
+
+Revision ID: c17d2e8b5f63
+Revises: a93c5d1e7f42
+Create Date: 2026-10-19 23:12:08.514377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c17d2e8b5f63'
+down_revision: Union[str, None] = 'a93c5d1e7f42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Показатели накапливаются с момента миграции. Скорость набора лайков до неё
+    # не восстанавливается (период полураспада - часы), близость к авторам
+    # (период полураспада - недели) заполняется по существующим лайкам:
+    #     python -m app.services.engagement --until-id <max(likes.id) до запуска новой версии>
+    op.create_table(
+        'tweet_engagement',
+        sa.Column('tweet_id', sa.Integer(), nullable=False),
+        sa.Column('velocity', sa.Double(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('tweet_id')
+    )
+    op.create_table(
+        'author_affinity',
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('author_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Double(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['author_id'], ['user.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['user.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('user_id', 'author_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('author_affinity')
+    op.drop_table('tweet_engagement')
@@ -0,0 +1,52 @@
+"""tweets search
+
+Revision ID: e6f1a9c47b28
+Revises: 5b9e0c7f3a21
+Create Date: 2026-10-19 19:20:41.903512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e6f1a9c47b28'
+down_revision: Union[str, None] = '5b9e0c7f3a21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Генерируемая колонка заполняется при добавлении (перезапись таблицы)
+    op.execute(
+        "ALTER TABLE tweets ADD COLUMN search_vector tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('russian'::regconfig, tweet_data)) STORED"
+    )
+
+    # Индекс строится без блокировки записи: на секционированной таблице
+    # создаётся пустой индекс, индексы секций строятся CONCURRENTLY и присоединяются к нему
+    op.execute("CREATE INDEX ix_tweets_search_vector ON ONLY tweets USING gin (search_vector)")
+
+    partitions = op.get_bind().execute(
+        sa.text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'tweets'::regclass"
+        )
+    ).scalars().all()
+
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition}_search_vector_idx "
+                f"ON {partition} USING gin (search_vector)"
+            )
+            op.execute(
+                f"ALTER INDEX ix_tweets_search_vector ATTACH PARTITION {partition}_search_vector_idx"
+            )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_tweets_search_vector")
+    op.execute("ALTER TABLE tweets DROP COLUMN IF EXISTS search_vector")
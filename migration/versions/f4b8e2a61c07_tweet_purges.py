@@ -0,0 +1,31 @@
+"""tweet purge queue
+
+Revision ID: f4b8e2a61c07
+Revises: c17d2e8b5f63
+Create Date: 2026-10-20 00:41:26.903518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4b8e2a61c07'
+down_revision: Union[str, None] = 'c17d2e8b5f63'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'tweet_purges',
+        sa.Column('tweet_id', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('deleted_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('tweet_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('tweet_purges')
@@ -6,6 +6,7 @@ from httpx import AsyncClient
 
 from app.main import app
 from app.models.users import User
+from app.utils.queries import assert_max_queries
 from test.database import engine_test, async_session_maker, Base
 
 
@@ -38,15 +39,40 @@ async def client() -> AsyncGenerator[AsyncClient, None]:
         yield ac
 
 
+@pytest.fixture(scope="session")
+def query_budget():
+    """
+    Проверка бюджета SQL-запросов эндпоинта:
+        with query_budget(5):
+            resp = await client.get(...)
+    """
+    return assert_max_queries
+
+
 @pytest.fixture(scope="session")
 async def users():
     """
     Пользователи для тестирования
     """
     async with async_session_maker() as session:
-        user_1 = User(username="test-user1", api_key="test-user1")
-        user_2 = User(username="test-user2", api_key="test-user2")
-        user_3 = User(username="test-user3", api_key="test-user3")
+        user_1 = User(
+            username="test-user1",
+            email="test-user1@example.com",
+            hashed_password="",
+            api_key="test-user1",
+        )
+        user_2 = User(
+            username="test-user2",
+            email="test-user2@example.com",
+            hashed_password="",
+            api_key="test-user2",
+        )
+        user_3 = User(
+            username="test-user3",
+            email="test-user3@example.com",
+            hashed_password="",
+            api_key="test-user3",
+        )
 
         user_1.following.append(user_2)
         user_2.following.append(user_1)
@@ -3,7 +3,8 @@ from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sess
 from sqlalchemy.pool import NullPool
 
 from app.main import app
-from app.database import Base, get_async_session
+from app.database import Base, get_async_session, get_async_session_read, replica_router
+from app.utils.cache import cache_backend
 from app.config import DB_HOST, DB_NAME, DB_PASS, DB_USER, DB_PORT
 
 DATABASE_URL_TEST = (
@@ -25,3 +26,8 @@ async def override_get_async_session() -> AsyncGenerator[AsyncSession, None]:
 
 
 app.dependency_overrides[get_async_session] = override_get_async_session
+app.dependency_overrides[get_async_session_read] = override_get_async_session
+# Текущий пользователь загружается через роутер реплик, минуя зависимости
+replica_router.primary = async_session_maker
+# Кэш только в памяти процесса: в Redis могли остаться данные прошлых запусков
+cache_backend.l2 = cache_backend.redis = None
@@ -5,7 +5,7 @@ from http import HTTPStatus
 
 from app.models.tweets import Tweet
 from app.models.users import User
-from app.database import async_session_maker
+from test.database import async_session_maker
 
 
 @pytest.fixture(scope="session")
@@ -49,12 +49,13 @@ class TestFollowers:
 
     @pytest.mark.asyncio
     async def test_create_follower(
-        self, client: AsyncClient, headers: Dict, good_response: Dict
+        self, client: AsyncClient, headers: Dict, good_response: Dict, query_budget
     ) -> None:
         """
         Тестирование подписки на пользователя
         """
-        resp = await client.post("/api/users/3/follow", headers=headers)
+        with query_budget(10):
+            resp = await client.post("/api/users/3/follow", headers=headers)
 
         assert resp
         assert resp.status_code == HTTPStatus.CREATED
@@ -8,6 +8,7 @@ from test.database import async_session_maker
 from app.models.users import User
 from app.models.tweets import Tweet
 from app.models.tweets import Like
+from app.utils.rate_limit import LocalBuckets, RatePolicy
 
 
 @pytest.mark.like
@@ -30,11 +31,14 @@ class TestLikes:
             client: AsyncClient,
             headers: Dict,
             good_response: Dict,
+            query_budget,
     ) -> None:
         """
-        Тестирование добавления лайка к твиту
+        Тестирование добавления лайка к твиту (лайк и обновление показателей
+        ранжированной ленты - одним запросом)
         """
-        resp = await client.post("/api/tweets/2/likes", headers=headers)
+        with query_budget(6):
+            resp = await client.post("/api/tweets/2/likes", headers=headers)
 
         assert resp
         assert resp.status_code == HTTPStatus.CREATED
@@ -81,6 +85,17 @@ class TestLikes:
         assert resp.status_code == HTTPStatus.OK
         assert resp.json() == good_response
 
+    async def test_like_cached_tweet(self, client: AsyncClient, headers: Dict, query_budget) -> None:
+        """
+        Тестирование повторного лайка: автор и наличие твита берутся из кэша
+        """
+        with query_budget(5):
+            resp = await client.post("/api/tweets/1/likes", headers=headers)
+
+        assert resp.status_code == HTTPStatus.CREATED
+
+        await client.delete("/api/tweets/1/likes", headers=headers)
+
     async def test_delete_like_not_found(
             self, client: AsyncClient, headers: Dict, response_tweet_not_found: Dict
     ) -> None:
@@ -105,3 +120,29 @@ class TestLikes:
         assert resp
         assert resp.status_code == HTTPStatus.LOCKED
         assert resp.json() == response_locked
+
+    async def test_like_rate_limit(
+            self, client: AsyncClient, headers: Dict, monkeypatch
+    ) -> None:
+        """
+        Тестирование ограничения частоты лайков (корзины в памяти процесса -
+        Redis в тестах не используется): сверх ёмкости корзины - 429 с Retry-After
+        """
+        monkeypatch.setattr("app.utils.rate_limit.local_buckets", LocalBuckets())
+        monkeypatch.setattr("app.routes.tweet.like_rate_limit.user", RatePolicy(capacity=2, period=60))
+
+        for _ in range(2):
+            resp = await client.post("/api/tweets/1000/likes", headers=headers)
+
+            assert resp.status_code == HTTPStatus.NOT_FOUND
+
+        resp = await client.post("/api/tweets/1000/likes", headers=headers)
+
+        assert resp.status_code == HTTPStatus.TOO_MANY_REQUESTS
+        assert resp.headers["retry-after"] == "30"
+        assert resp.json()["error_message"] == "Too many requests"
+
+        # Другой пользователь ограничен своей корзиной
+        resp = await client.post("/api/tweets/1000/likes", headers={"api-key": "test-user2"})
+
+        assert resp.status_code == HTTPStatus.NOT_FOUND
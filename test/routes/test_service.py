@@ -0,0 +1,33 @@
+import pytest
+
+from http import HTTPStatus
+from httpx import AsyncClient
+
+
+@pytest.mark.service
+class TestService:
+    async def test_pool_stats(self, client: AsyncClient) -> None:
+        """
+        Тестирование вывода метрик пула соединений
+        """
+        resp = await client.get("/api/service/pool")
+        data = resp.json()
+
+        assert resp.status_code == HTTPStatus.OK
+        assert data["result"] is True
+        assert {"size", "checked_out", "overflow", "timeouts", "wait_histogram"} <= set(
+            data["pool"]
+        )
+
+    @pytest.mark.usefixtures("users")
+    async def test_metrics(self, client: AsyncClient) -> None:
+        """
+        Тестирование вывода метрик Prometheus
+        """
+        await client.get("/api/users/1", headers={"api-key": "test-user1"})
+        resp = await client.get("/metrics")
+
+        assert resp.status_code == HTTPStatus.OK
+        assert 'route="/api/users/{user_id}"' in resp.text
+        assert 'method="get_user_for_id",service="UserService"' in resp.text
+        assert 'db_pool_checked_out{pool="primary"}' in resp.text
@@ -1,9 +1,17 @@
+import asyncio
+import datetime
 import json
 from http import HTTPStatus
 from typing import Dict
 
 from httpx import AsyncClient
 import pytest
+from sqlalchemy import select, update
+
+from app.config import SEARCH_HOT_DAYS
+from app.models.tweets import Tweet
+from app.utils.trends import trend_tracker
+from test.database import async_session_maker
 
 
 @pytest.mark.tweet
@@ -59,6 +67,151 @@ class TestTweets:
 
         return resp
 
+    async def test_get_tweets(
+        self, client: AsyncClient, headers: Dict, query_budget
+    ) -> None:
+        """
+        Тестирование вывода ленты твитов (с проверкой количества SQL-запросов)
+        """
+        with query_budget(7):
+            resp = await client.get("/api/tweets", headers=headers)
+
+        tweets = resp.json()["tweets"]
+
+        assert resp
+        assert resp.status_code == HTTPStatus.OK
+        assert resp.json()["result"] is True
+        assert tweets and set(tweets[0]) == {"id", "content", "author", "likes"}
+        assert set(tweets[0]["author"]) == {"id", "name"}
+
+    async def test_get_tweets_json_engine(
+        self, client: AsyncClient, headers: Dict, query_budget, monkeypatch
+    ) -> None:
+        """
+        Тестирование сборки ленты в БД: тот же документ одним SQL-запросом
+        """
+        expected = (await client.get("/api/tweets", headers=headers)).json()
+        monkeypatch.setattr("app.routes.tweet.FEED_ENGINE", "json")
+
+        with query_budget(5):
+            resp = await client.get("/api/tweets", headers=headers)
+
+        assert resp.status_code == HTTPStatus.OK
+        assert resp.headers["content-type"] == "application/json"
+        assert resp.json() == expected
+
+    async def test_get_tweets_not_modified(
+        self, client: AsyncClient, headers: Dict, query_budget
+    ) -> None:
+        """
+        Тестирование условного запроса ленты: 304 без построения ленты, пока
+        не изменились твиты или лайки авторов
+        """
+        etag = (await client.get("/api/tweets", headers=headers)).headers["etag"]
+
+        with query_budget(4):
+            resp = await client.get(
+                "/api/tweets", headers={**headers, "If-None-Match": etag}
+            )
+
+        assert resp.status_code == HTTPStatus.NOT_MODIFIED
+        assert resp.headers["etag"] == etag
+        assert resp.content == b""
+
+        # Лайк твиту автора, на которого подписан пользователь, меняет версию ленты
+        await client.post("/api/tweets/2/likes", headers={"api-key": "test-user3"})
+        resp = await client.get("/api/tweets", headers={**headers, "If-None-Match": etag})
+
+        assert resp.status_code == HTTPStatus.OK
+        assert resp.headers["etag"] != etag
+
+    async def test_search_tweets(
+        self, client: AsyncClient, headers: Dict, query_budget
+    ) -> None:
+        """
+        Тестирование поиска: словоформы запроса находят все твиты, страницы
+        выбираются по курсору без повторов
+        """
+        params = {"q": "тестовые твиты", "limit": 2}
+
+        with query_budget(5):
+            resp = await client.get("/api/tweets/search", params=params, headers=headers)
+
+        first_page = resp.json()
+
+        assert resp.status_code == HTTPStatus.OK
+        assert len(first_page["tweets"]) == 2
+        assert set(first_page["tweets"][0]) == {"id", "content", "author", "likes"}
+        assert first_page["next_cursor"]
+
+        resp = await client.get(
+            "/api/tweets/search",
+            params={**params, "cursor": first_page["next_cursor"]},
+            headers=headers,
+        )
+        second_page = resp.json()
+        ids = [tweet["id"] for tweet in first_page["tweets"] + second_page["tweets"]]
+
+        assert second_page["next_cursor"] is None
+        assert sorted(ids) == [1, 2, 3]
+
+    async def test_search_tweets_following(
+        self, client: AsyncClient, headers: Dict
+    ) -> None:
+        """
+        Тестирование поиска только среди твитов подписок
+        """
+        resp = await client.get(
+            "/api/tweets/search", params={"q": "твит", "following": True}, headers=headers
+        )
+
+        assert resp.status_code == HTTPStatus.OK
+        assert [tweet["author"]["name"] for tweet in resp.json()["tweets"]] == ["test-user2"]
+
+    async def test_search_tweets_invalid_cursor(
+        self, client: AsyncClient, headers: Dict
+    ) -> None:
+        """
+        Тестирование вывода ошибки при повреждённом курсоре
+        """
+        resp = await client.get(
+            "/api/tweets/search", params={"q": "твит", "cursor": "broken"}, headers=headers
+        )
+
+        assert resp.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+    async def test_search_tweets_cold_window(
+        self, client: AsyncClient, headers: Dict
+    ) -> None:
+        """
+        Тестирование поиска за пределами "горячего" окна: старые твиты
+        выводятся после всех совпадений из окна, курсор переходит между окнами
+        """
+        old_date = datetime.datetime.utcnow() - datetime.timedelta(days=SEARCH_HOT_DAYS + 1)
+        stmt = update(Tweet).where(Tweet.id == 1)
+
+        async with async_session_maker() as session:
+            created_at = await session.scalar(select(Tweet.created_at).where(Tweet.id == 1))
+            await session.execute(stmt.values(created_at=old_date))
+            await session.commit()
+
+        try:
+            ids = []
+            params = {"q": "твит", "limit": 1}
+
+            while params:
+                resp = await client.get("/api/tweets/search", params=params, headers=headers)
+                page = resp.json()
+                ids += [tweet["id"] for tweet in page["tweets"]]
+                params = page["next_cursor"] and {**params, "cursor": page["next_cursor"]}
+        finally:
+            async with async_session_maker() as session:
+                await session.execute(stmt.values(created_at=created_at))
+                await session.commit()
+
+        assert sorted(ids[:2]) == [2, 3]
+        assert ids[2:] == [1]
+
     async def test_create_tweet(
         self,
         client: AsyncClient,
@@ -145,6 +298,19 @@ class TestTweets:
         assert resp.status_code == HTTPStatus.OK
         assert resp.json() == good_response
 
+    async def test_like_deleted_tweet(
+        self, client: AsyncClient, headers: Dict, query_budget, response_tweet_not_found: Dict
+    ) -> None:
+        """
+        Тестирование кэша метаданных твитов: удаление записывается в кэш,
+        и лайк удалённого твита отклоняется без запроса твита из БД
+        """
+        with query_budget(3):
+            resp = await client.post("/api/tweets/1/likes", headers=headers)
+
+        assert resp.status_code == HTTPStatus.NOT_FOUND
+        assert resp.json() == response_tweet_not_found
+
     async def test_delete_tweet_not_found(
         self, client: AsyncClient, headers: Dict, response_tweet_not_found: Dict
     ) -> None:
@@ -168,3 +334,166 @@ class TestTweets:
         assert resp
         assert resp.status_code == HTTPStatus.LOCKED
         assert resp.json() == response_tweet_locked
+
+    async def test_hashtag_and_mention_timelines(
+        self, client: AsyncClient, headers_with_content_type: Dict, query_budget
+    ) -> None:
+        """
+        Тестирование хэштегов и упоминаний: извлекаются при публикации,
+        твиты выводятся от новых к старым страницами по max_id, удалённый
+        твит пропадает из индексов
+        """
+        tweet_ids = []
+
+        for text in ("Релиз #Python для @test-user2 и @nobody", "Снова #python #1"):
+            resp = await self.send_request(
+                client=client,
+                headers=headers_with_content_type,
+                new_tweet_data={"tweet_data": text, "tweet_media_ids": []},
+            )
+            tweet_ids.append(resp.json()["tweet_id"])
+
+        with query_budget(5):
+            resp = await client.get(
+                "/api/hashtags/PYTHON/tweets", params={"limit": 1}, headers=headers_with_content_type
+            )
+
+        first_page = resp.json()["tweets"]
+        resp = await client.get(
+            "/api/hashtags/python/tweets",
+            params={"max_id": first_page[0]["id"]},
+            headers=headers_with_content_type,
+        )
+
+        assert [tweet["id"] for tweet in first_page + resp.json()["tweets"]] == tweet_ids[::-1]
+
+        resp = await client.get("/api/users/me/mentions", headers={"api-key": "test-user2"})
+
+        assert [tweet["id"] for tweet in resp.json()["tweets"]] == tweet_ids[:1]
+        assert resp.json()["tweets"][0]["author"]["name"] == "test-user1"
+
+        await client.delete(f"/api/tweets/{tweet_ids[0]}", headers=headers_with_content_type)
+        resp = await client.get("/api/users/me/mentions", headers={"api-key": "test-user2"})
+
+        assert resp.json()["tweets"] == []
+
+    async def test_trends(
+        self, client: AsyncClient, headers_with_content_type: Dict
+    ) -> None:
+        """
+        Тестирование трендов: хэштеги новых твитов и лайкнутые твиты
+        попадают в тренды после слияния событий
+        """
+        resp = await self.send_request(
+            client=client,
+            headers=headers_with_content_type,
+            new_tweet_data={"tweet_data": "#Тренды дня", "tweet_media_ids": []},
+        )
+        tweet_id = resp.json()["tweet_id"]
+
+        for api_key in ("test-user2", "test-user3"):
+            await client.post(f"/api/tweets/{tweet_id}/likes", headers={"api-key": api_key})
+
+        await trend_tracker.flush()
+        resp = await client.get("/api/trends", params={"limit": 3}, headers=headers_with_content_type)
+        trends = resp.json()
+
+        assert resp.status_code == HTTPStatus.OK
+        assert "тренды" in [hashtag["tag"] for hashtag in trends["hashtags"]]
+        assert {tweet["id"]: len(tweet["likes"]) for tweet in trends["tweets"]}[tweet_id] == 2
+
+    async def test_get_ranked_tweets(
+        self, client: AsyncClient, headers_with_content_type: Dict, query_budget
+    ) -> None:
+        """
+        Тестирование ранжированной ленты: лайкнутый твит выше более нового,
+        в хронологической ленте порядок прежний
+        """
+        tweet_ids = []
+
+        for tweet_data in ("Твит с лайками", "Новый твит без лайков"):
+            resp = await self.send_request(
+                client=client,
+                headers=headers_with_content_type,
+                new_tweet_data={"tweet_data": tweet_data, "tweet_media_ids": []},
+            )
+            tweet_ids.append(resp.json()["tweet_id"])
+
+        liked, newer = tweet_ids
+        headers = {"api-key": "test-user2"}
+
+        for api_key in ("test-user2", "test-user3"):
+            await client.post(f"/api/tweets/{liked}/likes", headers={"api-key": api_key})
+
+        with query_budget(8):
+            resp = await client.get("/api/tweets", params={"ranked": True}, headers=headers)
+
+        ranked = [tweet["id"] for tweet in resp.json()["tweets"]]
+        chronological = [
+            tweet["id"] for tweet in (await client.get("/api/tweets", headers=headers)).json()["tweets"]
+        ]
+
+        assert resp.status_code == HTTPStatus.OK
+        assert resp.headers["etag"]
+        assert ranked.index(liked) < ranked.index(newer)
+        assert chronological.index(newer) < chronological.index(liked)
+        assert sorted(ranked) == sorted(chronological)
+
+    async def test_create_tweet_idempotency_key(
+        self, client: AsyncClient, headers_with_content_type: Dict, query_budget
+    ) -> None:
+        """
+        Тестирование повтора создания твита с тем же Idempotency-Key: ответ
+        первого запроса без обращения к БД, тот же ключ с другим твитом - 422
+        """
+        headers = {**headers_with_content_type, "Idempotency-Key": "retry-1"}
+        new_tweet_data = {"tweet_data": "Твит через нестабильную сеть", "tweet_media_ids": []}
+        created = await self.send_request(client=client, headers=headers, new_tweet_data=new_tweet_data)
+
+        with query_budget(0):
+            replayed = await self.send_request(client=client, headers=headers, new_tweet_data=new_tweet_data)
+
+        assert created.status_code == replayed.status_code == HTTPStatus.CREATED
+        assert replayed.json() == created.json()
+        assert replayed.headers["idempotent-replayed"] == "true"
+        assert "idempotent-replayed" not in created.headers
+
+        resp = await self.send_request(
+            client=client,
+            headers=headers,
+            new_tweet_data={"tweet_data": "Другой твит", "tweet_media_ids": []},
+        )
+
+        assert resp.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+        # Ключи разных пользователей не пересекаются
+        resp = await self.send_request(
+            client=client,
+            headers={**headers, "api-key": "test-user2"},
+            new_tweet_data=new_tweet_data,
+        )
+
+        assert "idempotent-replayed" not in resp.headers
+        assert resp.json()["tweet_id"] != created.json()["tweet_id"]
+
+    async def test_create_tweet_idempotency_key_concurrent(
+        self, client: AsyncClient, headers_with_content_type: Dict
+    ) -> None:
+        """
+        Тестирование одновременных запросов с одним Idempotency-Key: твит
+        создаётся один раз, остальные запросы получают его ответ
+        """
+        headers = {**headers_with_content_type, "Idempotency-Key": "retry-2"}
+        responses = await asyncio.gather(
+            *(
+                self.send_request(
+                    client=client,
+                    headers=headers,
+                    new_tweet_data={"tweet_data": "Одновременные повторы", "tweet_media_ids": []},
+                )
+                for _ in range(3)
+            )
+        )
+
+        assert {resp.json()["tweet_id"] for resp in responses} == {responses[0].json()["tweet_id"]}
+        assert sum("idempotent-replayed" not in resp.headers for resp in responses) == 1
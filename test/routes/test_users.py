@@ -1,3 +1,4 @@
+import json
 import pytest
 
 from typing import Dict
@@ -48,6 +49,29 @@ class TestUsers:
         assert resp.status_code == HTTPStatus.OK
         assert resp.json() == response_data
 
+    async def test_user_me_not_modified(self, client: AsyncClient, headers: Dict) -> None:
+        """
+        Тестирование условного запроса данных о текущем пользователе (304 по ETag)
+        """
+        etag = (await client.get("/api/users/me", headers=headers)).headers["etag"]
+        resp = await client.get("/api/users/me", headers={**headers, "If-None-Match": etag})
+
+        assert resp.status_code == HTTPStatus.NOT_MODIFIED
+        assert resp.headers["etag"] == etag
+
+    async def test_user_me_export(self, client: AsyncClient, headers: Dict) -> None:
+        """
+        Тестирование потоковой выгрузки данных текущего пользователя в NDJSON
+        """
+        resp = await client.get("/api/users/me/export", headers=headers)
+        records = [json.loads(line) for line in resp.text.splitlines()]
+
+        assert resp.status_code == HTTPStatus.OK
+        assert resp.headers["content-type"] == "application/x-ndjson"
+        assert records[0]["type"] == "user"
+        assert records[0]["username"] == "test-user1"
+        assert {record["type"] for record in records[1:]} <= {"tweet", "like"}
+
     async def test_user_data_for_id(
         self, client: AsyncClient, response_data: Dict, headers: Dict
     ) -> None:
@@ -71,3 +95,37 @@ class TestUsers:
         assert resp
         assert resp.status_code == HTTPStatus.NOT_FOUND
         assert resp.json() == response_error
+
+    async def test_user_profile_cache(
+        self, client: AsyncClient, headers: Dict, query_budget
+    ) -> None:
+        """
+        Тестирование кэша профилей: повторный запрос не обращается к БД,
+        подписка сбрасывает профили обоих пользователей
+        """
+        await client.get("/api/users/3", headers=headers)
+
+        with query_budget(0):
+            cached = await client.get("/api/users/3", headers=headers)
+
+        assert cached.json()["user"]["followers"] == []
+
+        await client.post("/api/users/3/follow", headers=headers)
+        followed = await client.get("/api/users/3", headers=headers)
+        await client.delete("/api/users/3/follow", headers=headers)
+        unfollowed = await client.get("/api/users/3", headers=headers)
+
+        assert followed.json()["user"]["followers"] == [{"id": 1, "name": "test-user1"}]
+        assert unfollowed.json()["user"]["followers"] == []
+
+    async def test_user_not_found_cached(self, client: AsyncClient, headers: Dict, query_budget) -> None:
+        """
+        Тестирование отрицательной записи кэша профилей: повторный запрос
+        несуществующего id не обращается к БД
+        """
+        await client.get("/api/users/2000", headers=headers)
+
+        with query_budget(0):
+            resp = await client.get("/api/users/2000", headers=headers)
+
+        assert resp.status_code == HTTPStatus.NOT_FOUND
@@ -0,0 +1,66 @@
+import asyncio
+import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app.config import FEED_RANK_AFFINITY_HALF_LIFE
+from app.database import get_sync_engine
+from app.models.engagement import AuthorAffinity
+from app.models.likes import Like
+from app.models.tweets import Tweet
+from app.models.users import User
+from app.services.engagement import EngagementService
+from test.database import async_session_maker
+
+
+@pytest.mark.engagement
+class TestAffinityBackfill:
+    async def test_backfill_affinity(self) -> None:
+        """
+        Тестирование заполнения близости к авторам по лайкам до миграции:
+        вклад лайка затухает от даты твита, лайки вне диапазона id не учитываются
+        """
+        async with async_session_maker() as session:
+            after_id = await session.scalar(select(func.coalesce(func.max(Like.id), 0)))
+
+            reader = User(username="affinity-reader", email="affinity-reader@test.ru", hashed_password="")
+            author = User(username="affinity-author", email="affinity-author@test.ru", hashed_password="")
+            session.add_all([reader, author])
+            await session.flush()
+
+            fresh = Tweet(tweet_data="Свежий твит", user_id=author.id)
+            old = Tweet(
+                tweet_data="Старый твит",
+                user_id=author.id,
+                created_at=datetime.datetime.utcnow()
+                - datetime.timedelta(seconds=FEED_RANK_AFFINITY_HALF_LIFE),
+            )
+            session.add_all([fresh, old])
+            await session.flush()
+
+            session.add_all([Like(user_id=reader.id, tweets_id=tweet.id) for tweet in (fresh, old)])
+            await session.commit()
+
+            until_id = await session.scalar(select(func.max(Like.id)))
+            reader_id, author_id, fresh_id = reader.id, author.id, fresh.id
+
+        # Лайк после миграции уже учтён record_like и не входит в диапазон
+        async with async_session_maker() as session:
+            session.add(Like(user_id=reader_id, tweets_id=fresh_id))
+            await session.commit()
+
+        updated = await asyncio.to_thread(
+            EngagementService.backfill_affinity,
+            get_sync_engine(),
+            1,
+            after_id=after_id,
+            until_id=until_id,
+        )
+
+        async with async_session_maker() as session:
+            affinity = await session.get(AuthorAffinity, (reader_id, author_id))
+
+            assert updated == 2
+            # Свежий лайк - 1, лайк твита возрастом в период полураспада - 0.5
+            assert affinity.score == pytest.approx(1.5, abs=0.01)
@@ -0,0 +1,60 @@
+import datetime
+
+import orjson
+import pytest
+
+from app.models.likes import Like
+from app.models.tweets import Tweet
+from app.models.users import User
+from app.services.export import ExportService
+from test.database import async_session_maker
+
+
+@pytest.mark.export
+class TestExport:
+    async def test_iter_export(self) -> None:
+        """
+        Тестирование выгрузки: профиль, твиты по возрастанию даты и лайки,
+        строки из курсора отдаются порциями по chunk_size
+        """
+        async with async_session_maker() as session:
+            user = User(username="export-user", email="export@test.ru", hashed_password="")
+            session.add(user)
+            await session.flush()
+
+            created = datetime.datetime(2024, 1, 1)
+            tweets = [
+                Tweet(
+                    tweet_data=f"Твит {number}",
+                    user_id=user.id,
+                    created_at=created + datetime.timedelta(days=number),
+                )
+                for number in (2, 0, 1)
+            ]
+            session.add_all(tweets)
+            await session.flush()
+
+            session.add(Like(user_id=user.id, tweets_id=tweets[0].id))
+            await session.commit()
+
+            chunks = [
+                chunk
+                async for chunk in ExportService.iter_export(
+                    user=user, session=session, chunk_size=2
+                )
+            ]
+
+        records = [orjson.loads(line) for line in b"".join(chunks).splitlines()]
+
+        # Профиль + 2 порции твитов + 1 порция лайков
+        assert len(chunks) == 4
+        assert records[0] == {
+            "type": "user",
+            "id": user.id,
+            "username": "export-user",
+            "email": "export@test.ru",
+            "registered_at": user.registered_at.isoformat(),
+        }
+        assert [record["tweet_data"] for record in records[1:4]] == ["Твит 0", "Твит 1", "Твит 2"]
+        assert records[1]["created_at"] == "2024-01-01T00:00:00"
+        assert records[4] == {"type": "like", "id": records[4]["id"], "tweets_id": tweets[0].id}
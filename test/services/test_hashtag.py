@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select, text
+
+from app.database import get_sync_engine
+from app.models.hashtags import Hashtag, Mention, TweetHashtag
+from app.models.users import User
+from app.services.hashtag import HashtagService
+from test.database import async_session_maker
+
+
+@pytest.mark.hashtag
+class TestHashtagBackfill:
+    async def test_backfill(self) -> None:
+        """
+        Тестирование заполнения индексов для твитов, добавленных в обход
+        сервиса (например, импортом): порции по id, повторный запуск ничего не дублирует
+        """
+        async with async_session_maker() as session:
+            await session.execute(
+                text(
+                    "INSERT INTO \"user\" (username, email, hashed_password, email_code, "
+                    "is_active, is_superuser, is_verified) "
+                    "VALUES ('backfill-user', 'backfill@test.ru', '', '', true, false, false)"
+                )
+            )
+            await session.execute(
+                text(
+                    "INSERT INTO tweets (tweet_data, created_at, user_id) "
+                    "SELECT data, now(), id FROM \"user\", unnest(CAST(:texts AS text[])) data "
+                    "WHERE username = 'backfill-user'"
+                ),
+                {"texts": ["#Импорт для @backfill-user", "Снова #импорт", "Без тегов"]},
+            )
+            await session.commit()
+
+        for _ in range(2):
+            await asyncio.to_thread(HashtagService.backfill, get_sync_engine(), 2)
+
+        async with async_session_maker() as session:
+            tagged = await session.scalars(
+                select(TweetHashtag.tweet_id)
+                .join(Hashtag, Hashtag.id == TweetHashtag.hashtag_id)
+                .where(Hashtag.tag == "импорт")
+            )
+            mentioned = await session.scalars(
+                select(Mention.tweet_id)
+                .join(User, User.id == Mention.user_id)
+                .where(User.username == "backfill-user")
+            )
+
+            assert len(tagged.all()) == 2
+            assert len(mentioned.all()) == 1
+
+            await session.execute(
+                text(
+                    "DELETE FROM tweet_hashtags WHERE tweet_id IN (SELECT id FROM tweets "
+                    "WHERE user_id = (SELECT id FROM \"user\" WHERE username = 'backfill-user'))"
+                )
+            )
+            await session.execute(
+                text(
+                    "DELETE FROM tweets "
+                    "WHERE user_id = (SELECT id FROM \"user\" WHERE username = 'backfill-user')"
+                )
+            )
+            await session.execute(text("DELETE FROM \"user\" WHERE username = 'backfill-user'"))
+            await session.commit()
@@ -0,0 +1,79 @@
+import datetime
+from pathlib import Path
+
+import pytest
+
+from app.services.importer import (
+    batched,
+    prepare_record,
+    read_records,
+    resolve_columns,
+)
+
+
+@pytest.mark.importer
+class TestImporter:
+    def test_read_csv_and_ndjson(self, tmp_path: Path) -> None:
+        """
+        Тестирование потокового чтения CSV и NDJSON
+        """
+        csv_file = tmp_path / "users.csv"
+        csv_file.write_text("id,username,email\n1,user,user@test.ru\n", encoding="utf-8")
+
+        ndjson_file = tmp_path / "users.ndjson"
+        ndjson_file.write_text(
+            '{"id": 1, "username": "user", "email": "user@test.ru"}\n\n',
+            encoding="utf-8",
+        )
+
+        assert list(read_records(csv_file)) == [
+            {"id": "1", "username": "user", "email": "user@test.ru"}
+        ]
+        assert list(read_records(ndjson_file)) == [
+            {"id": 1, "username": "user", "email": "user@test.ru"}
+        ]
+
+    def test_resolve_columns(self) -> None:
+        """
+        Тестирование выбора колонок: колонки с дефолтом из БД не загружаются,
+        если их нет в файле, остальные дополняются значениями по умолчанию
+        """
+        columns = resolve_columns("tweets", {"tweet_data": "Твит", "user_id": "1"})
+
+        assert columns == ["tweet_data", "created_at", "user_id"]
+
+    def test_resolve_columns_errors(self) -> None:
+        """
+        Тестирование ошибок при неизвестной или отсутствующей обязательной колонке
+        """
+        with pytest.raises(ValueError):
+            resolve_columns("likes", {"user_id": 1, "tweets_id": 1, "extra": 1})
+
+        with pytest.raises(ValueError):
+            resolve_columns("likes", {"user_id": 1})
+
+    def test_prepare_record(self) -> None:
+        """
+        Тестирование приведения типов значений из CSV
+        """
+        columns = resolve_columns(
+            "user",
+            {"id": "5", "username": "user", "email": "user@test.ru", "is_verified": "true"},
+        )
+        record = prepare_record(
+            "user",
+            columns,
+            {"id": "5", "username": "user", "email": "user@test.ru", "is_verified": "true"},
+        )
+        values = dict(zip(columns, record))
+
+        assert values["id"] == 5
+        assert values["is_verified"] is True
+        assert values["is_superuser"] is False
+        assert isinstance(values["registered_at"], datetime.datetime)
+
+    def test_batched(self) -> None:
+        """
+        Тестирование разбиения потока записей на пачки
+        """
+        assert list(batched(iter(range(5)), 2)) == [[0, 1], [2, 3], [4]]
@@ -0,0 +1,64 @@
+import datetime
+
+import pytest
+from sqlalchemy import text
+
+from app.config import TWEETS_ARCHIVE_SCHEMA
+from app.services.partition import TweetPartitionService, add_months, partition_name
+from test.database import engine_test
+
+
+@pytest.mark.partition
+class TestTweetPartitions:
+    today = datetime.date(2031, 11, 15)
+
+    def test_month_helpers(self) -> None:
+        """
+        Тестирование расчёта месяцев и названий секций
+        """
+        assert add_months(datetime.date(2031, 11, 1), 2) == datetime.date(2032, 1, 1)
+        assert add_months(datetime.date(2031, 1, 1), -1) == datetime.date(2030, 12, 1)
+        assert partition_name(datetime.date(2031, 3, 1)) == "tweets_p2031_03"
+
+    async def test_ensure_and_archive_partitions(self) -> None:
+        """
+        Тестирование создания секций (с переносом строк из секции по умолчанию)
+        и архивации старых секций
+        """
+        async with engine_test.begin() as conn:
+            await conn.execute(
+                text(
+                    "INSERT INTO \"user\" (username, email, hashed_password, email_code, "
+                    "is_active, is_superuser, is_verified) "
+                    "VALUES ('partition-user', 'partition@test.ru', '', '', true, false, false)"
+                )
+            )
+            await conn.execute(
+                text(
+                    "INSERT INTO tweets (tweet_data, created_at, user_id) "
+                    "SELECT 'Твит из будущего', '2031-12-10', id FROM \"user\" "
+                    "WHERE username = 'partition-user'"
+                )
+            )
+
+            created = await conn.run_sync(
+                TweetPartitionService.ensure_partitions, 2, self.today
+            )
+            location = await conn.execute(
+                text("SELECT tableoid::regclass::text FROM tweets WHERE created_at = '2031-12-10'")
+            )
+
+            assert created == ["tweets_p2031_11", "tweets_p2031_12", "tweets_p2032_01"]
+            assert location.scalar() == "tweets_p2031_12"
+
+            archived = await conn.run_sync(
+                TweetPartitionService.archive_partitions, 1, datetime.date(2032, 1, 15)
+            )
+            remaining = await conn.run_sync(TweetPartitionService.get_partitions)
+
+            assert archived == ["tweets_p2031_11"]
+            assert datetime.date(2031, 11, 1) not in remaining
+
+            await conn.execute(text("DELETE FROM tweets WHERE created_at = '2031-12-10'"))
+            await conn.execute(text("DELETE FROM \"user\" WHERE username = 'partition-user'"))
+            await conn.execute(text(f"DROP SCHEMA {TWEETS_ARCHIVE_SCHEMA} CASCADE"))
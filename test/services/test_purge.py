@@ -0,0 +1,79 @@
+import asyncio
+from http import HTTPStatus
+
+import pytest
+from sqlalchemy import func, select
+
+from app.database import get_sync_engine
+from app.models.likes import Like
+from app.models.tweets import Tweet, TweetPurge
+from app.models.users import User
+from app.services.purge import TweetPurgeService
+from app.services.tweet import TweetsService
+from app.utils.exeptions import CustomApiException
+from test.database import async_session_maker
+
+
+@pytest.mark.purge
+class TestTweetPurge:
+    async def test_purge(self) -> None:
+        """
+        Тестирование удаления твита: твит удаляется сразу, его лайки остаются
+        в очереди и удаляются очисткой пачками
+        """
+        async with async_session_maker() as session:
+            user = User(username="purge-user", email="purge@test.ru", hashed_password="")
+            session.add(user)
+            await session.flush()
+            tweet = Tweet(tweet_data="Популярный твит", user_id=user.id)
+            session.add(tweet)
+            await session.flush()
+            session.add_all([Like(user_id=user.id, tweets_id=tweet.id) for _ in range(5)])
+            await session.commit()
+            user_id, tweet_id = user.id, tweet.id
+
+        async with async_session_maker() as session:
+            user = await session.get(User, user_id)
+            await TweetsService.delete_tweet(user=user, tweet_id=tweet_id, session=session)
+
+            likes = select(func.count()).select_from(Like).where(Like.tweets_id == tweet_id)
+
+            assert await session.get(TweetPurge, tweet_id) is not None
+            assert await session.scalar(likes) == 5
+            assert await session.scalar(select(Tweet.id).where(Tweet.id == tweet_id)) is None
+
+        deleted = await asyncio.to_thread(TweetPurgeService.purge, get_sync_engine(), 2)
+
+        async with async_session_maker() as session:
+            assert deleted == 5
+            assert await session.scalar(likes) == 0
+            assert await session.get(TweetPurge, tweet_id) is None
+
+    async def test_concurrent_delete(self) -> None:
+        """
+        Тестирование двух одновременных удалений твита: второе ждёт блокировку
+        строки, ничего не удаляет и возвращает 404, а не ошибку очереди очистки
+        """
+        async with async_session_maker() as session:
+            user = User(username="purge-race", email="purge-race@test.ru", hashed_password="")
+            session.add(user)
+            await session.flush()
+            tweet = Tweet(tweet_data="Удаляемый дважды твит", user_id=user.id)
+            session.add(tweet)
+            await session.commit()
+            user_id, tweet_id = user.id, tweet.id
+
+        async def delete_tweet() -> None:
+            async with async_session_maker() as session:
+                user = await session.get(User, user_id)
+                await TweetsService.delete_tweet(user=user, tweet_id=tweet_id, session=session)
+
+        results = await asyncio.gather(delete_tweet(), delete_tweet(), return_exceptions=True)
+        errors = [result for result in results if result is not None]
+
+        assert len(errors) == 1
+        assert isinstance(errors[0], CustomApiException)
+        assert errors[0].status_code == HTTPStatus.NOT_FOUND
+
+        async with async_session_maker() as session:
+            assert await session.get(TweetPurge, tweet_id) is not None
@@ -0,0 +1,209 @@
+import asyncio
+import math
+import time
+
+import orjson
+import pytest
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.decorator import cache
+
+from app.utils.cache import CacheEntry, LocalCache, TieredBackend
+
+
+@pytest.mark.cache
+class TestTieredCache:
+    @pytest.fixture
+    def l2(self) -> InMemoryBackend:
+        """
+        Общий для "процессов" L2 (InMemoryBackend хранит данные на уровне класса)
+        """
+        InMemoryBackend._store.clear()
+
+        return InMemoryBackend()
+
+    def test_local_cache_lru_and_ttl(self) -> None:
+        """
+        Тестирование вытеснения давно не использованных записей и срока жизни L1
+        """
+        local = LocalCache(max_items=2, ttl=60)
+
+        for key in ("a", "b"):
+            local.set(key, CacheEntry(value=key.encode(), expires_at=math.inf))
+
+        local.get("a")
+        local.set("c", CacheEntry(value=b"c", expires_at=math.inf))
+
+        assert local.get("b") is None
+        assert local.get("a").value == b"a"
+
+        local.set("old", CacheEntry(value=b"old", expires_at=time.monotonic() - 1))
+
+        assert local.get("old") is None
+
+    async def test_l1_in_front_of_l2(self, l2: InMemoryBackend) -> None:
+        """
+        Тестирование уровней: значение читается из L1, другой процесс получает его
+        из L2 вместе со временем вычисления
+        """
+        first = TieredBackend(l2=l2)
+        second = TieredBackend(l2=l2)
+
+        await first.get_with_ttl("key")
+        await first.set("key", b"value", expire=60)
+        l2._store.clear()
+
+        assert await first.get_with_ttl("key") == (59, b"value")
+
+        await first.set("key", b"value", expire=60)
+        ttl, value = await second.get_with_ttl("key")
+
+        assert value == b"value"
+        assert len(second.l1) == 1
+
+    async def test_coalescing(self, l2: InMemoryBackend) -> None:
+        """
+        Тестирование объединения запросов: при промахе значение вычисляется один раз
+        """
+        calls = 0
+
+        @cache(expire=60, namespace="coalescing")
+        async def compute() -> dict:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+
+            return {"calls": calls}
+
+        FastAPICache.reset()
+        FastAPICache.init(TieredBackend(l2=l2), prefix="test")
+
+        try:
+            results = await asyncio.gather(*(compute() for _ in range(5)))
+        finally:
+            FastAPICache.reset()
+
+        assert calls == 1
+        assert results == [{"calls": 1}] * 5
+
+    async def test_early_refresh(self) -> None:
+        """
+        Тестирование досрочного обновления: у истекающего значения с долгим
+        вычислением промах получает только один запрос
+        """
+        backend = TieredBackend(beta=1)
+        backend.l1.set(
+            "key",
+            CacheEntry(value=b"old", expires_at=time.monotonic() + 0.01, delta=1000),
+        )
+
+        results = [await backend.get_with_ttl("key") for _ in range(3)]
+
+        assert results[0] == (0, None)
+        assert [value for _, value in results[1:]] == [b"old", b"old"]
+
+        await backend.set("key", b"new", expire=60)
+
+        assert (await backend.get_with_ttl("key"))[1] == b"new"
+
+    async def test_invalidation_message(self) -> None:
+        """
+        Тестирование сброса L1 по сообщению другого процесса (свои сообщения пропускаются)
+        """
+        backend = TieredBackend()
+        await backend.set("test:feed:1", b"1", expire=60)
+        await backend.set("test:feed:2", b"2", expire=60)
+        await backend.set("test:user:1", b"3", expire=60)
+
+        backend.handle_invalidation(orjson.dumps({"origin": backend.origin, "key": "test:user:1"}))
+        backend.handle_invalidation(orjson.dumps({"origin": "other", "namespace": "test:feed"}))
+
+        assert await backend.get("test:feed:1") is None
+        assert await backend.get("test:feed:2") is None
+        assert await backend.get("test:user:1") == b"3"
+
+        backend.handle_invalidation(orjson.dumps({"origin": "other", "key": "test:user:1"}))
+
+        assert await backend.get("test:user:1") is None
+
+    async def test_failed_leader(self) -> None:
+        """
+        Тестирование ошибки запроса, вычисляющего значение: ожидающие запросы
+        сразу получают промах, а не ждут coalesce_timeout
+        """
+        backend = TieredBackend(coalesce_timeout=5)
+
+        async def failing_leader() -> None:
+            await backend.get_with_ttl("key")
+            await asyncio.sleep(0.01)
+            raise RuntimeError("БД недоступна")
+
+        leader = asyncio.create_task(failing_leader())
+        await asyncio.sleep(0)
+        started = time.monotonic()
+
+        assert await backend.get_with_ttl("key") == (0, None)
+        assert time.monotonic() - started < 1
+
+        with pytest.raises(RuntimeError):
+            await leader
+
+        assert backend._inflight == {}
+
+        # Явный отказ от вычисления внутри запроса
+        assert await backend.get_with_ttl("key") == (0, None)
+
+        backend.release("key")
+
+        assert backend._inflight == {}
+
+    async def test_l2_value_without_header(self, l2: InMemoryBackend) -> None:
+        """
+        Тестирование значений L2 без заголовка кэша (короткое, чужое): промах, а не ошибка
+        """
+        backend = TieredBackend(l2=l2)
+        await l2.set("short", b"abc", expire=60)
+        await l2.set("foreign", b'{"result": true, "id": 1}', expire=60)
+
+        assert await backend.get("short") is None
+        assert await backend.get("foreign") is None
+
+        await backend.set("own", b"value", expire=60)
+        backend.l1.clear()
+
+        assert await backend.get("own") == b"value"
+
+    async def test_clear_during_computation(self) -> None:
+        """
+        Тестирование сброса ключа, пока значение вычисляется: ожидающие получают
+        промах, значение, прочитанное до сброса, не сохраняется
+        """
+        backend = TieredBackend(coalesce_timeout=5)
+        read_done = asyncio.Event()
+        cleared = asyncio.Event()
+
+        async def stale_leader() -> None:
+            await backend.get_with_ttl("profile:1")
+            read_done.set()
+            await cleared.wait()
+            await backend.set("profile:1", b"before follow", expire=60)
+
+        leader = asyncio.create_task(stale_leader())
+        await read_done.wait()
+        waiter = asyncio.create_task(backend.get_with_ttl("profile:1"))
+        await asyncio.sleep(0)
+
+        await backend.clear(key="profile:1")
+        cleared.set()
+        await leader
+
+        assert await waiter == (0, None)
+        assert await backend.get("profile:1") is None
+        assert backend._inflight == {}
+
+        # Следующее вычисление сохраняется как обычно
+        assert await backend.get_with_ttl("profile:1") == (0, None)
+
+        await backend.set("profile:1", b"after follow", expire=60)
+
+        assert await backend.get("profile:1") == b"after follow"
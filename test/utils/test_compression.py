@@ -0,0 +1,72 @@
+
+import pytest
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from httpx import ASGITransport, AsyncClient
+
+from app.utils.compression import CompressionMiddleware, choose_encoding
+
+
+@pytest.mark.compression
+class TestCompression:
+    @pytest.fixture(scope="class")
+    def app(self) -> FastAPI:
+        """
+        Приложение со сжатием ответов от 100 байт
+        """
+        app = FastAPI()
+        app.add_middleware(CompressionMiddleware, minimum_size=100)
+
+        @app.get("/large")
+        async def large():
+            return PlainTextResponse("x" * 1000, headers={"ETag": '"v1"'})
+
+        @app.get("/small")
+        async def small():
+            return PlainTextResponse("x" * 10)
+
+        @app.get("/stream")
+        async def stream():
+            return StreamingResponse(iter([b"x" * 1000, b"y" * 1000]))
+
+        return app
+
+    async def request(self, app: FastAPI, path: str, encoding: str = "gzip"):
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            return await client.get(path, headers={"Accept-Encoding": encoding})
+
+    def test_choose_encoding(self) -> None:
+        """
+        Тестирование выбора алгоритма сжатия по Accept-Encoding
+        """
+        assert choose_encoding("gzip, deflate") == "gzip"
+        assert choose_encoding("gzip;q=0, deflate") is None
+        assert choose_encoding("identity") is None
+
+    async def test_large_response(self, app: FastAPI) -> None:
+        """
+        Тестирование сжатия большого ответа (ETag становится слабым)
+        """
+        resp = await self.request(app, "/large")
+
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.headers["vary"] == "Accept-Encoding"
+        assert resp.headers["etag"] == 'W/"v1"'
+        assert int(resp.headers["content-length"]) < 1000
+        assert resp.text == "x" * 1000
+
+    async def test_small_and_streaming_responses(self, app: FastAPI) -> None:
+        """
+        Тестирование передачи маленьких и потоковых ответов без сжатия
+        """
+        small = await self.request(app, "/small")
+        stream = await self.request(app, "/stream")
+        identity = await self.request(app, "/large", encoding="identity")
+
+        assert "content-encoding" not in small.headers
+        assert "content-encoding" not in stream.headers
+        assert stream.content == b"x" * 1000 + b"y" * 1000
+        assert "content-encoding" not in identity.headers
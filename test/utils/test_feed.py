@@ -0,0 +1,46 @@
+import pytest
+
+from fastapi.responses import JSONResponse
+
+from app.models.likes import Like
+from app.models.tweets import Tweet
+from app.models.users import User
+from app.schemas.tweet import TweetListSchema
+from app.utils.feed import FeedAuthor, FeedLike, FeedTweet, encode_feed
+
+
+@pytest.mark.feed
+class TestFeedSerialization:
+    def test_compatible_with_schema(self) -> None:
+        """
+        Тестирование побайтного совпадения быстрой сериализации ленты
+        с ответом по схеме TweetListSchema
+        """
+        author = User(id=1, username="Автор")
+        fan = User(id=2, username='fan "2"')
+        tweets = [
+            Tweet(
+                id=10,
+                tweet_data="Твит с лайком\n",
+                user=author,
+                likes=[Like(user_id=fan.id, user=fan)],
+            ),
+            Tweet(id=9, tweet_data="Без лайков", user=fan, likes=[]),
+        ]
+        feed = [
+            FeedTweet(
+                id=10,
+                content="Твит с лайком\n",
+                author=FeedAuthor(id=1, name="Автор"),
+                likes=[FeedLike(user_id=2, name='fan "2"')],
+            ),
+            FeedTweet(id=9, content="Без лайков", author=FeedAuthor(id=2, name='fan "2"')),
+        ]
+
+        # Так ответ формирует FastAPI: валидация схемы, дамп по псевдонимам, JSONResponse
+        expected = JSONResponse(
+            TweetListSchema(tweets=tweets).model_dump(mode="json", by_alias=True)
+        ).body
+
+        assert encode_feed(feed) == expected
+        assert encode_feed([]) == JSONResponse({"result": True, "tweets": []}).body
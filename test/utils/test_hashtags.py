@@ -0,0 +1,24 @@
+import pytest
+
+from app.utils.hashtags import extract_hashtags, extract_mentions
+
+
+@pytest.mark.hashtag
+class TestHashtags:
+    def test_extract_hashtags(self) -> None:
+        """
+        Тестирование извлечения хэштегов: нижний регистр, без повторов,
+        без "#" внутри слова и хэштегов только из цифр
+        """
+        text = "#FastAPI и #Питон: #fastapi, a#b, &#39; #1 #2024год"
+
+        assert extract_hashtags(text) == ["fastapi", "питон", "2024год"]
+
+    def test_extract_mentions(self) -> None:
+        """
+        Тестирование извлечения упоминаний: знаки препинания после имени
+        и адреса электронной почты не считаются упоминаниями
+        """
+        text = "Привет, @test-user2. Пиши на mail@example.com или @user_3, @test-user2!"
+
+        assert extract_mentions(text) == ["test-user2", "user_3"]
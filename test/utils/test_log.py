@@ -0,0 +1,51 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils.log import QueueSink, make_sampler, parse_sampling, redact_secrets
+
+
+@pytest.mark.logging
+class TestLogging:
+    def test_queue_sink(self) -> None:
+        """
+        Тестирование неблокирующего приёмника: при переполнении очереди сообщения
+        отбрасываются, накопившиеся записываются при остановке
+        """
+        stream = io.StringIO()
+        sink = QueueSink(stream, maxsize=2, flush_interval=60)
+
+        for message in ("1\n", "2\n", "3\n"):
+            sink.write(message)
+
+        assert sink.dropped == 1
+        assert stream.getvalue() == ""
+
+        sink.stop()
+
+        assert stream.getvalue() == "1\n2\nОчередь логов переполнена, отброшено сообщений: 1\n"
+
+    def test_redact_secrets(self) -> None:
+        """
+        Тестирование маскирования секретов в тексте сообщения и в полях extra
+        """
+        record = {
+            "message": "Поиск пользователя по api-key: test-user1, token=abc; id: 1",
+            "extra": {"api_key": "test-user1", "user_id": 1},
+        }
+
+        redact_secrets(record)
+
+        assert record["message"] == "Поиск пользователя по api-key: ***, token=***; id: 1"
+        assert record["extra"] == {"api_key": "***", "user_id": 1}
+
+    def test_sampling(self) -> None:
+        """
+        Тестирование выборочной записи сообщений по уровням
+        """
+        sample = make_sampler(parse_sampling("DEBUG=0, info = 0.5"))
+
+        assert parse_sampling("DEBUG=0, info = 0.5") == {"DEBUG": 0.0, "INFO": 0.5}
+        assert not any(sample({"level": SimpleNamespace(name="DEBUG")}) for _ in range(100))
+        assert all(sample({"level": SimpleNamespace(name="ERROR")}) for _ in range(100))
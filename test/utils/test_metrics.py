@@ -0,0 +1,91 @@
+import os
+
+import pytest
+
+from prometheus_client import Counter, Gauge, values
+
+from app.server import prepare_metrics_dir
+from app.utils import metrics
+from app.utils.metrics import mark_process_dead, scrape_registry
+
+
+@pytest.mark.metrics
+class TestMultiprocessMetrics:
+    @staticmethod
+    def worker_metrics(monkeypatch, pid: int):
+        """
+        Метрики так, как их создаёт воркер с заданным pid в режиме нескольких процессов
+        """
+        monkeypatch.setattr(values, "ValueClass", values.MultiProcessValue(lambda: pid))
+        monkeypatch.setattr("os.getpid", lambda: pid)
+
+        counter = Counter("demo_requests", "Запросы", registry=None)
+        gauge = Gauge("demo_in_progress", "В обработке", registry=None, multiprocess_mode="livesum")
+
+        return counter, gauge
+
+    def test_scrape_registry(self, tmp_path, monkeypatch) -> None:
+        """
+        Тестирование сбора метрик нескольких воркеров: счётчики суммируются,
+        live-метрики остановленного воркера не учитываются
+        """
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path))
+
+        first_counter, first_gauge = self.worker_metrics(monkeypatch, 101)
+        first_counter.inc(2)
+        first_gauge.inc()
+
+        second_counter, second_gauge = self.worker_metrics(monkeypatch, 102)
+        second_counter.inc(3)
+        second_gauge.inc()
+
+        registry = scrape_registry(str(tmp_path))
+
+        assert registry.get_sample_value("demo_requests_total") == 5
+        assert registry.get_sample_value("demo_in_progress") == 2
+
+        # Воркер 102 остановлен (lifespan)
+        mark_process_dead(str(tmp_path))
+
+        assert registry.get_sample_value("demo_requests_total") == 5
+        assert registry.get_sample_value("demo_in_progress") == 1
+
+    def test_prepare_metrics_dir(self, tmp_path, monkeypatch) -> None:
+        """
+        Тестирование каталога метрик: файлы прошлого запуска удаляются, каталог
+        передаётся воркерам через окружение; один воркер обходится без каталога
+        """
+        monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", "")
+        stale = tmp_path / "counter_100.db"
+        stale.write_bytes(b"")
+
+        assert prepare_metrics_dir(workers=1, path="") is None
+        assert prepare_metrics_dir(workers=1, path=str(tmp_path)) == str(tmp_path)
+        assert not stale.exists()
+
+        path = prepare_metrics_dir(workers=2, path="")
+
+        assert path
+        assert os.environ["PROMETHEUS_MULTIPROC_DIR"] == path
+
+        os.rmdir(path)
+
+
+@pytest.mark.metrics
+class TestCeleryPublishMetrics:
+    def test_failed_publish_forgotten(self, monkeypatch) -> None:
+        """
+        Тестирование отправки задачи без after_task_publish (ошибка брокера):
+        запись удаляется при следующей отправке, а не хранится бесконечно
+        """
+        monkeypatch.setattr(metrics, "_publish_started", {})
+        metrics._before_task_publish(headers={"id": "failed"})
+
+        monkeypatch.setattr(metrics, "PUBLISH_STALE_SECONDS", 0)
+        metrics._before_task_publish(headers={"id": "sent"})
+
+        assert list(metrics._publish_started) == ["sent"]
+
+        metrics._after_task_publish(headers={"id": "sent"}, sender="app.services.tasks.demo")
+
+        assert metrics._publish_started == {}
@@ -0,0 +1,40 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.database import DATABASE_URL, engine_options, warm_up_engine
+from app.utils.pool import PoolStats
+
+
+@pytest.mark.pool
+class TestPoolStats:
+    def test_histogram(self) -> None:
+        """
+        Тестирование кумулятивной гистограммы времени ожидания соединения
+        """
+        stats = PoolStats()
+
+        for seconds in (0.0005, 0.003, 0.003, 0.2, 10):
+            stats.observe_wait(seconds)
+
+        histogram = stats.histogram()
+
+        assert stats.wait_count == 5
+        assert histogram["0.001"] == 1
+        assert histogram["0.005"] == 3
+        assert histogram["0.25"] == 4
+        assert histogram["5.0"] == 4
+        assert histogram["inf"] == 5
+
+    async def test_warm_up_engine(self) -> None:
+        """
+        Тестирование прогрева пула: соединения открыты и возвращены в пул,
+        их не больше размера пула
+        """
+        warm_engine = create_async_engine(DATABASE_URL, **{**engine_options, "pool_size": 3})
+
+        try:
+            assert await warm_up_engine(warm_engine, 5) == 3
+            assert warm_engine.pool.checkedin() == 3
+            assert warm_engine.pool.checkedout() == 0
+        finally:
+            await warm_engine.dispose()
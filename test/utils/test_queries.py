@@ -0,0 +1,61 @@
+import pytest
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from sqlalchemy import text
+
+from app.utils.queries import QueryCountMiddleware, assert_max_queries, track_queries
+from test.database import async_session_maker
+
+
+async def run_queries(count: int) -> None:
+    """
+    Выполнение count простых SQL-запросов
+    """
+    async with async_session_maker() as session:
+        for _ in range(count):
+            await session.execute(text("SELECT 1"))
+
+
+@pytest.mark.queries
+class TestQueryCounter:
+    async def test_track_queries(self) -> None:
+        """
+        Тестирование подсчёта SQL-запросов внутри блока
+        """
+        with track_queries() as stats:
+            await run_queries(3)
+
+        await run_queries(1)
+
+        assert stats.count == 3
+        assert stats.duration > 0
+        assert stats.statements == ["SELECT 1"] * 3
+
+    async def test_budget_exceeded(self) -> None:
+        """
+        Тестирование ошибки при превышении бюджета SQL-запросов
+        """
+        with pytest.raises(AssertionError, match="3 > 2"):
+            with assert_max_queries(2):
+                await run_queries(3)
+
+    async def test_middleware_headers(self) -> None:
+        """
+        Тестирование заголовков с количеством SQL-запросов в ответе
+        """
+        app = FastAPI()
+        app.add_middleware(QueryCountMiddleware)
+
+        @app.get("/")
+        async def index():
+            await run_queries(2)
+            return {"result": True}
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            resp = await client.get("/")
+
+        assert resp.headers["x-db-query-count"] == "2"
+        assert float(resp.headers["x-db-query-time"]) > 0
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from app.utils.ranking import RankingWeights, rank_candidates, score_candidates
+
+NOW = 1_700_000_000.0
+HOUR = 3600.0
+
+
+@pytest.mark.ranking
+class TestRanking:
+    def test_recency(self) -> None:
+        """
+        Тестирование оценки без лайков: более новые твиты выше,
+        при равных оценках сохраняется исходный порядок
+        """
+        candidates = np.array(
+            [
+                [1, 10, NOW - 5 * HOUR, 0, 0, 0, 0],
+                [2, 10, NOW - HOUR, 0, 0, 0, 0],
+                [3, 11, NOW - HOUR, 0, 0, 0, 0],
+            ]
+        )
+
+        assert rank_candidates(candidates, NOW, limit=3).tolist() == [1, 2, 0]
+
+    def test_engagement(self) -> None:
+        """
+        Тестирование оценки с лайками: твит, быстро набирающий лайки, и твит
+        близкого автора выше более нового, старые лайки затухают
+        """
+        weights = RankingWeights()
+        candidates = np.array(
+            [
+                [1, 10, NOW, 0, 0, 0, 0],
+                [2, 11, NOW - HOUR, 5, NOW, 0, 0],
+                [3, 12, NOW - HOUR, 0, 0, 20, NOW],
+                [4, 12, NOW - HOUR, 5, NOW - 30 * weights.velocity_half_life, 0, 0],
+            ]
+        )
+        scores = score_candidates(candidates, NOW, weights)
+
+        assert sorted(rank_candidates(candidates, NOW, limit=2).tolist()) == [1, 2]
+        assert scores[3] == pytest.approx(scores[2] - weights.affinity * np.log1p(20))
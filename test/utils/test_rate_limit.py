@@ -0,0 +1,49 @@
+import pytest
+
+from app.utils.rate_limit import LocalBuckets, RatePolicy
+
+
+@pytest.mark.rate_limit
+class TestRateLimit:
+    def test_policy_parse(self) -> None:
+        """
+        Тестирование разбора политики из настройки
+        """
+        assert RatePolicy.parse("30/60") == RatePolicy(capacity=30, period=60)
+        assert RatePolicy.parse("30/60").rate == 0.5
+        assert RatePolicy.parse("") is None
+
+    def test_local_buckets(self) -> None:
+        """
+        Тестирование корзин в памяти: запросы сверх ёмкости отклоняются
+        до пополнения, токены списываются только если их хватает во всех корзинах
+        """
+        buckets = LocalBuckets(max_keys=10)
+        user = ("user", RatePolicy(capacity=2, period=10))
+        ip = ("ip", RatePolicy(capacity=3, period=30))
+
+        assert buckets.acquire([user, ip], now=0) == 0
+        assert buckets.acquire([user, ip], now=0) == 0
+        assert buckets.acquire([user, ip], now=0) == pytest.approx(5)
+
+        assert buckets.acquire([user, ip], now=10) == 0
+        assert buckets.acquire([user, ip], now=10) == 0
+        assert buckets.acquire([user, ip], now=20) == 0
+
+        # Токен пользователя есть, но корзина IP пуста: запрос отклонён, токен пользователя сохранён
+        assert buckets.acquire([user, ip], now=20) == pytest.approx(10)
+        assert buckets.acquire([user], now=20) == 0
+        assert buckets.acquire([user], now=20) > 0
+
+    def test_local_buckets_eviction(self) -> None:
+        """
+        Тестирование ограничения количества корзин: вытесняются давно неиспользуемые
+        """
+        buckets = LocalBuckets(max_keys=2)
+        policy = RatePolicy(capacity=1, period=60)
+
+        for key in ("a", "b", "c"):
+            assert buckets.acquire([(key, policy)], now=0) == 0
+
+        assert buckets.acquire([("c", policy)], now=0) > 0
+        assert buckets.acquire([("a", policy)], now=0) == 0
@@ -0,0 +1,127 @@
+import time
+from typing import Dict
+
+import pytest
+
+from starlette.requests import Request
+
+from app.utils.replica import Replica, ReplicaRouter
+
+
+def make_request(method: str = "GET", api_key: str = "test-user1") -> Request:
+    """
+    Запрос с api-key в header для проверки маршрутизации
+    """
+    return Request(
+        {
+            "type": "http",
+            "method": method,
+            "path": "/api/tweets",
+            "headers": [(b"api-key", api_key.encode())],
+        }
+    )
+
+
+class SharedRedis:
+    """
+    Общее для нескольких маршрутизаторов хранилище с командами Redis SET PX / EXISTS
+    """
+
+    def __init__(self) -> None:
+        self.keys: Dict[str, float] = {}
+
+    async def set(self, key: str, value: bytes, px: int) -> bool:
+        self.keys[key] = time.monotonic() + px / 1000
+        return True
+
+    async def exists(self, key: str) -> int:
+        return int(self.keys.get(key, 0) > time.monotonic())
+
+
+@pytest.mark.replica
+class TestReplicaRouter:
+    @pytest.fixture
+    def router(self) -> ReplicaRouter:
+        """
+        Маршрутизатор с двумя "репликами" (вместо фабрик сессий - строки)
+        """
+        return ReplicaRouter(
+            primary="primary",
+            replicas=[
+                Replica(session_maker="replica-1", load=lambda: 3),
+                Replica(session_maker="replica-2", load=lambda: 1),
+            ],
+            read_your_writes_seconds=60,
+        )
+
+    async def test_without_replicas(self) -> None:
+        """
+        Тестирование работы без реплик: все запросы идут в основную БД
+        """
+        router = ReplicaRouter(primary="primary")
+
+        assert await router.session_maker_for(make_request()) == "primary"
+
+    async def test_round_robin(self, router: ReplicaRouter) -> None:
+        """
+        Тестирование поочерёдного выбора реплик для чтений
+        """
+        chosen = [await router.session_maker_for(make_request()) for _ in range(4)]
+
+        assert chosen == ["replica-1", "replica-2", "replica-1", "replica-2"]
+
+    async def test_least_loaded(self, router: ReplicaRouter) -> None:
+        """
+        Тестирование выбора наименее загруженной реплики
+        """
+        router.strategy = "least_loaded"
+
+        assert await router.session_maker_for(make_request()) == "replica-2"
+
+    async def test_writes_go_to_primary(self, router: ReplicaRouter) -> None:
+        """
+        Тестирование маршрутизации изменяющих запросов в основную БД
+        """
+        assert await router.session_maker_for(make_request(method="POST")) == "primary"
+
+    async def test_read_your_writes(self, router: ReplicaRouter) -> None:
+        """
+        Тестирование окна read-your-writes после изменения данных
+        """
+        await router.mark_write("test-user1")
+
+        assert await router.session_maker_for(make_request()) == "primary"
+        assert await router.session_maker_for(make_request(api_key="test-user2")) != "primary"
+
+        router.read_your_writes_seconds = 0
+        await router.mark_write("test-user1")
+
+        assert await router.session_maker_for(make_request()) != "primary"
+
+    async def test_read_your_writes_shared(self) -> None:
+        """
+        Тестирование окна read-your-writes между воркерами: запись отмечена
+        одним маршрутизатором, чтение выполняется через другой
+        """
+        redis = SharedRedis()
+        writer, reader = (
+            ReplicaRouter(
+                primary="primary",
+                replicas=[Replica(session_maker="replica-1", load=lambda: 0)],
+                read_your_writes_seconds=60,
+                redis=lambda: redis,
+            )
+            for _ in range(2)
+        )
+
+        await writer.mark_write("test-user1")
+
+        assert await reader.session_maker_for(make_request()) == "primary"
+        assert await reader.session_maker_for(make_request(api_key="test-user2")) == "replica-1"
+        # api-key не попадает в Redis в открытом виде
+        assert all("test-user1" not in key for key in redis.keys)
+
+        # Без Redis окно видно только процессу, выполнившему запись
+        reader.redis = lambda: None
+
+        assert await reader.session_maker_for(make_request()) == "replica-1"
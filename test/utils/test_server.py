@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+import pytest
+
+from app.server import available_cpus, server_options, worker_count
+
+
+@pytest.mark.server
+class TestServerOptions:
+    def test_worker_count(self) -> None:
+        """
+        Тестирование количества воркеров: заданное значение или по числу ядер
+        """
+        assert worker_count(3) == 3
+        assert worker_count(0) == available_cpus() >= 1
+
+    def test_server_options(self) -> None:
+        """
+        Тестирование параметров uvicorn: приложение собирается фабрикой в каждом воркере
+        """
+        options = server_options(workers=2)
+
+        assert options["factory"] is True
+        assert options["workers"] == 2
+        assert options["loop"] in ("uvloop", "asyncio")
+        assert options["http"] in ("httptools", "h11")
+        # IP клиента для ограничения частоты запросов - из заголовков доверенных прокси
+        assert options["proxy_headers"] is True
+        assert options["forwarded_allow_ips"]
+
+    def test_celery_not_imported(self) -> None:
+        """
+        Тестирование сборки приложения без загрузки Celery: Celery и kombu
+        загружаются только при первой отправке задачи (в отдельном процессе,
+        т.к. в процессе тестов Celery уже загружен)
+        """
+        code = (
+            "import sys, app.main; app.main.create_app(); "
+            "print(sorted({m.split('.')[0] for m in sys.modules} & {'celery', 'kombu'}))"
+        )
+        result = subprocess.run(
+            [sys.executable, "-W", "ignore", "-c", code], capture_output=True, text=True, check=True
+        )
+
+        assert result.stdout.strip() == "[]"
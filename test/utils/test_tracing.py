@@ -0,0 +1,121 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.trace import StatusCode
+from sqlalchemy import text
+
+from app.utils.metrics import instrument_service
+from app.utils import tracing
+from test.database import async_session_maker
+
+
+@instrument_service
+class DemoService:
+    @classmethod
+    async def ping(cls) -> int:
+        async with async_session_maker() as session:
+            return (await session.execute(text("SELECT 1"))).scalar()
+
+
+@pytest.mark.tracing
+class TestTracing:
+    @pytest.fixture(scope="class")
+    def exporter(self):
+        """
+        Трассировка с экспортом спанов в память
+        """
+        exporter = tracing.setup_tracing("memory")
+        exporter.clear()
+
+        return exporter
+
+    async def test_request_spans(self, exporter) -> None:
+        """
+        Тестирование вложенности спанов запроса, метода сервиса и SQL-запроса
+        """
+        app = FastAPI()
+        app.add_middleware(tracing.TracingMiddleware)
+
+        @app.get("/items/{item_id}")
+        async def get_item(item_id: int):
+            return {"result": await DemoService.ping()}
+
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://test"
+        ) as client:
+            resp = await client.get("/items/1")
+
+        spans = {span.name: span for span in exporter.get_finished_spans()}
+        root = spans["GET /items/{item_id}"]
+
+        assert resp.headers["x-trace-id"] == f"{root.context.trace_id:032x}"
+        assert spans["DemoService.ping"].parent.span_id == root.context.span_id
+        assert spans["SELECT"].parent.span_id == spans["DemoService.ping"].context.span_id
+        assert spans["SELECT"].attributes["db.statement"] == "SELECT 1"
+
+        exporter.clear()
+
+    def test_celery_propagation(self, exporter) -> None:
+        """
+        Тестирование передачи контекста трассировки в задачу Celery
+        """
+        headers = {"id": "task-1"}
+        tracing._before_task_publish(sender="app.services.tasks.demo", headers=headers)
+        tracing._after_task_publish(headers=headers)
+
+        # Дополнительные заголовки сообщения Celery доступны как атрибуты запроса
+        task = SimpleNamespace(name="demo", request=SimpleNamespace(**headers))
+        tracing._task_prerun(task_id="task-1", task=task)
+        tracing._task_postrun(task_id="task-1", state="SUCCESS")
+
+        publish, run = exporter.get_finished_spans()
+
+        assert run.parent.span_id == publish.context.span_id
+        assert run.context.trace_id == publish.context.trace_id
+        assert run.attributes["celery.state"] == "SUCCESS"
+
+        exporter.clear()
+
+    def test_failed_publish_span(self, exporter, monkeypatch) -> None:
+        """
+        Тестирование отправки задачи без after_task_publish (ошибка брокера):
+        спан завершается с ошибкой при следующей отправке и удаляется
+        """
+        tracing._before_task_publish(sender="app.services.tasks.demo", headers={"id": "failed"})
+
+        monkeypatch.setattr(tracing, "PUBLISH_STALE_SECONDS", 0)
+        tracing._before_task_publish(sender="app.services.tasks.demo", headers={"id": "sent"})
+        tracing._after_task_publish(headers={"id": "sent"})
+
+        failed, sent = exporter.get_finished_spans()
+
+        assert failed.attributes["celery.task_id"] == "failed"
+        assert failed.status.status_code == StatusCode.ERROR
+        assert sent.status.status_code == StatusCode.UNSET
+        assert tracing._publish_spans == {}
+
+        exporter.clear()
+
+    def test_file_exporter(self, tmp_path) -> None:
+        """
+        Тестирование записи спанов в файл
+        """
+        path = tmp_path / "traces.jsonl"
+        exporter = tracing.FileSpanExporter(str(path))
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+
+        with provider.get_tracer("test").start_as_current_span("outer"):
+            with provider.get_tracer("test").start_as_current_span("inner"):
+                pass
+
+        exporter.shutdown()
+        names = [json.loads(line)["name"] for line in path.read_text().splitlines()]
+
+        assert names == ["inner", "outer"]
@@ -0,0 +1,66 @@
+import random
+from collections import Counter
+
+import pytest
+
+from app.utils.trends import CountMinSketch, SpaceSaving, TrendCounter
+
+
+@pytest.mark.trends
+class TestTrends:
+    def test_count_min_sketch(self) -> None:
+        """
+        Тестирование Count-Min Sketch: оценка не меньше истинной частоты
+        и близка к ней при числе ключей намного больше ширины
+        """
+        sketch = CountMinSketch(width=512, depth=4)
+        counts = Counter({f"key-{number}": number % 7 + 1 for number in range(5000)})
+        counts["hot"] = 1000
+
+        for key, count in counts.items():
+            sketch.add(key, count)
+
+        total = sum(counts.values())
+
+        assert all(sketch.estimate(key) >= count for key, count in counts.items())
+        assert sketch.estimate("hot") <= 1000 + total * 2.72 / 512
+
+    def test_space_saving(self) -> None:
+        """
+        Тестирование Space-Saving: частые ключи остаются среди кандидатов
+        при любом количестве редких, размер ограничен ёмкостью
+        """
+        top = SpaceSaving(capacity=20)
+        rng = random.Random(1)
+        events = [f"hot-{number}" for number in range(5) for _ in range(500)]
+        events += [f"rare-{rng.randrange(100_000)}" for _ in range(5000)]
+        rng.shuffle(events)
+
+        for key in events:
+            top.add(key)
+
+        assert len(top.counts) == 20
+        assert {f"hot-{number}" for number in range(5)} <= set(top.counts)
+
+    def test_trend_counter_decay_and_snapshot(self) -> None:
+        """
+        Тестирование окон: старые события весят меньше и выпадают из окон,
+        снимок и слияние счётчиков разных процессов сохраняют оценки
+        """
+        counter = TrendCounter(window_seconds=60, windows=3, decay=0.5, width=256, depth=3, top_k=10)
+        now = 6000.0
+
+        for _ in range(4):
+            counter.add("old", now - 120)
+        for _ in range(3):
+            counter.add("new", now)
+        counter.add("expired", now - 180)
+
+        assert counter.top(3, now) == [("new", 3), ("old", 1)]
+
+        restored = TrendCounter(window_seconds=60, windows=3, decay=0.5, width=256, depth=3, top_k=10)
+        restored.load(counter.pack())
+        restored.merge(counter)
+
+        assert restored.top(3, now) == [("new", 6), ("old", 2)]
+        assert len(counter.buckets) == 2